@@ -0,0 +1 @@
+"""スニペット登録処理のベンチマークパッケージ."""
@@ -0,0 +1,139 @@
+"""ベンチマーク用の合成データを生成するモジュール."""
+
+import json
+import random
+from pathlib import Path
+
+from snippet.setting import FILE_ENCODING
+from snippet.setting import VSCODE_SNIPPET_KEY_BODY
+from snippet.setting import VSCODE_SNIPPET_KEY_DESC
+from snippet.setting import VSCODE_SNIPPET_KEY_PREFIX
+
+
+def create_lib_setting(relative_path: str, language: str = "python") -> dict:
+    """ベンチマーク用のライブラリ設定辞書を作成する.
+
+    Args:
+        relative_path (str): ライブラリディレクトリのパス
+        language (str): 言語名
+
+    Returns:
+        dict: setting.ymlのlibraries要素と同じ形式のライブラリ設定辞書
+    """
+    return {
+        "enable": True,
+        "description": "benchmark library",
+        "relative_path": relative_path,
+        "language": {"name": language, "extensions": [".py"], "excludes": ["__pycache__"]},
+        "library_code_block": {"begin": "lib:begin", "end": "lib:end"},
+        "library_description_prefix": {
+            "snippet_key": "[snippet_key]",
+            "snippet_prefix": "[snippet_prefix]",
+            "description": "[description]",
+        },
+    }
+
+
+def generate_library(
+    lib_dirpath: Path,
+    file_count: int,
+    block_count: int,
+    block_lines: int = 20,
+    filler_lines: int = 20,
+    seed: int = 0,
+    plain_file_count: int = 0,
+) -> int:
+    """N個のファイル × M個のコードブロックを持つライブラリを生成する.
+
+    Args:
+        lib_dirpath (Path): 生成先のライブラリディレクトリ
+        file_count (int): 生成するファイル数
+        block_count (int): 1ファイルあたりのコードブロック数
+        block_lines (int): 1ブロックあたりのコード行数
+        filler_lines (int): コードブロックの間に挿入するブロック外の行数
+        seed (int): 乱数シード
+        plain_file_count (int): 追加で生成する、コードブロックを含まないファイル数
+
+    Returns:
+        int: 生成したファイルの合計バイト数
+    """
+    rand = random.Random(seed)
+    total_bytes = 0
+
+    for file_idx in range(file_count):
+        # 1ディレクトリあたりのファイル数を抑えるため、サブディレクトリに分散する
+        code_path = lib_dirpath / f"pkg_{file_idx % 16:02d}" / f"module_{file_idx:05d}.py"
+        code_path.parent.mkdir(parents=True, exist_ok=True)
+
+        lines: list[str] = []
+        for block_idx in range(block_count):
+            lines += [f"value_{block_idx} = {rand.randint(0, 1 << 16)}" for _ in range(filler_lines)]
+            lines += [
+                "# lib:begin",
+                f"# [snippet_key] func_{file_idx}_{block_idx}",
+                f"# [snippet_prefix] bench:func_{file_idx}_{block_idx}",
+                f"# [description] benchmark function {file_idx}-{block_idx}",
+                f"def func_{file_idx}_{block_idx}(x):",
+            ]
+            lines += [f"    x = x * {rand.randint(1, 9)} + {rand.randint(0, 99)}" for _ in range(block_lines)]
+            lines += ["    return x", "# lib:end"]
+
+        text = "\n".join(lines) + "\n"
+        code_path.write_text(text, encoding=FILE_ENCODING)
+        total_bytes += len(text.encode(FILE_ENCODING))
+
+    # plain_file_countによってコードブロックを含むファイルの内容が変わらないよう、後から生成する
+    for file_idx in range(plain_file_count):
+        code_path = lib_dirpath / f"pkg_{file_idx % 16:02d}" / f"plain_{file_idx:05d}.py"
+        code_path.parent.mkdir(parents=True, exist_ok=True)
+        plain_lines = [
+            f"value_{line_idx} = {rand.randint(0, 1 << 16)}" for line_idx in range(filler_lines * (block_count + 1))
+        ]
+        text = "\n".join(plain_lines) + "\n"
+        code_path.write_text(text, encoding=FILE_ENCODING)
+        total_bytes += len(text.encode(FILE_ENCODING))
+
+    return total_bytes
+
+
+def generate_snippet_data(entry_count: int, library_count: int, body_lines: int = 20, seed: int = 0) -> dict:
+    """K個のエントリを持つスニペットデータを生成する.
+
+    Args:
+        entry_count (int): エントリ数
+        library_count (int): エントリを分配するライブラリ数
+        body_lines (int): 1エントリあたりのbodyの行数
+        seed (int): 乱数シード
+
+    Returns:
+        dict: スニペットjsonと同じ形式の辞書 ({ライブラリ名}@{スニペットキー}: {...})
+    """
+    rand = random.Random(seed)
+    return {
+        f"lib_{entry_idx % library_count:03d}@snippet_{entry_idx:06d}": {
+            VSCODE_SNIPPET_KEY_PREFIX: f"bench:snippet_{entry_idx}",
+            VSCODE_SNIPPET_KEY_DESC: f"benchmark snippet {entry_idx}",
+            VSCODE_SNIPPET_KEY_BODY: [f"x = x * {rand.randint(1, 9)}" for _ in range(body_lines)],
+        }
+        for entry_idx in range(entry_count)
+    }
+
+
+def generate_snippet_json(json_path: Path, entry_count: int, library_count: int, body_lines: int = 20) -> int:
+    """K個のエントリを持つスニペットjsonファイルを生成する.
+
+    エディタが出力するスニペットファイルと同様に、先頭にコメント行を含めます。
+
+    Args:
+        json_path (Path): 生成先のjsonファイルパス
+        entry_count (int): エントリ数
+        library_count (int): エントリを分配するライブラリ数
+        body_lines (int): 1エントリあたりのbodyの行数
+
+    Returns:
+        int: 生成したファイルのバイト数
+    """
+    snippet_data = generate_snippet_data(entry_count, library_count, body_lines)
+    text = "// benchmark snippet file\n/* generated by benchmarks.generators */\n" + json.dumps(snippet_data, indent=2)
+    json_path.write_text(text, encoding=FILE_ENCODING)
+    return len(text.encode(FILE_ENCODING))
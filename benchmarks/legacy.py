@@ -0,0 +1,131 @@
+"""ベンチマークで比較するための、置き換え前の実装を保持するモジュール."""
+
+import json
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+from typing import Iterator
+from typing import Optional
+
+from snippet.setting import FILE_ENCODING
+from snippet.src.lib_loader.dataclass import LibraryCode
+from snippet.src.lib_loader.dataclass import LibrarySettingData
+from snippet.src.lib_loader.load import CodeBlockPlacementError
+from snippet.src.lib_loader.load import extract_library_code
+from snippet.src.lib_loader.load import iter_library_code
+
+
+def read_jsonc_legacy(json_path: Path) -> dict[Any, Any]:
+    """行リストと正規表現によってコメントを除去するjsoncファイルの読み込み (置き換え前の実装).
+
+    Args:
+        json_path (Path): jsonファイルパス
+
+    Returns:
+        dict: 読み込んだjsonデータ
+    """
+    if not json_path.exists():
+        return {}
+
+    with open(json_path, "r", encoding=FILE_ENCODING) as f:
+        lines = f.readlines()
+
+    # 先頭行が // で始まるコメント行のみを削除
+    lines = [line for line in lines if not line.lstrip().startswith("//")]
+    text = "".join(lines)
+
+    # ブロックコメント /* ... */ を削除
+    text = re.sub(r"/\*[\s\S]*?\*/", "", text)
+    result: dict[Any, Any] = json.loads(text)
+    return result
+
+
+def iter_text(file_path: Path) -> Iterator[str]:
+    """テキストを1行ずつ読み込む (置き換え前の実装のファイル読み込み).
+
+    Args:
+        file_path (Path): テキストファイルパス
+
+    Yields:
+        str: 読み込んだ行 (末尾の改行は除去)
+    """
+    with open(file_path, "r", encoding=FILE_ENCODING) as f:
+        for line in f:
+            yield line.rstrip("\n")
+
+
+def extract_library_code_legacy(code_path: str, setting_data: LibrarySettingData) -> Optional[list[LibraryCode]]:
+    """すべての行をデコードして走査するコードブロック抽出 (置き換え前の実装).
+
+    Args:
+        code_path (str): ライブラリコードファイルのパス
+        setting_data (LibrarySettingData): ライブラリ設定データ
+
+    Returns:
+        Optional[list[LibraryCode]]: 抽出されたコードブロックのリスト。マーク配置が不正な場合はNone
+    """
+    try:
+        lib_code_results = list(iter_library_code(iter_text(Path(code_path)), setting_data))
+    except CodeBlockPlacementError:
+        return None
+    return [lib_code for lib_code in lib_code_results if lib_code is not None]
+
+
+@dataclass
+class LibraryCodeLegacy:
+    """ライブラリの情報とコード行のリストをインスタンスごとに保持するライブラリコード (置き換え前の実装).
+
+    Attributes:
+        snippet_key (str): スニペットキー
+        snippet_prefix (str): スニペットプレフィックス
+        description (str): スニペット説明
+        code_lines (list[str]): コード行のリスト
+    """
+
+    enable: bool
+    library_name: str
+    relative_path: str
+    language: str
+    snippet_key: str
+    snippet_prefix: str
+    description: str
+    code_lines: list[str]
+
+    @classmethod
+    def from_library_code(cls, lib_code: LibraryCode) -> "LibraryCodeLegacy":
+        """LibraryCodeから置き換え前の表現に変換する.
+
+        Args:
+            lib_code (LibraryCode): 変換するライブラリコード
+
+        Returns:
+            LibraryCodeLegacy: 変換したライブラリコード
+        """
+        return cls(
+            enable=lib_code.enable,
+            library_name=lib_code.library_name,
+            relative_path=lib_code.relative_path,
+            language=lib_code.language,
+            snippet_key=lib_code.snippet_key,
+            snippet_prefix=lib_code.snippet_prefix,
+            description=lib_code.description,
+            code_lines=lib_code.code_lines,
+        )
+
+
+def hold_library_code_legacy(code_path_list: list[str], setting_data: LibrarySettingData) -> list[LibraryCodeLegacy]:
+    """すべてのファイルからコードブロックを抽出し、置き換え前の表現で保持する.
+
+    Args:
+        code_path_list (list[str]): ライブラリコードファイルのパスのリスト
+        setting_data (LibrarySettingData): ライブラリ設定データ
+
+    Returns:
+        list[LibraryCodeLegacy]: 抽出されたコードブロックのリスト
+    """
+    return [
+        LibraryCodeLegacy.from_library_code(lib_code)
+        for code_path in code_path_list
+        for lib_code in extract_library_code(code_path, setting_data) or []
+    ]
@@ -0,0 +1,237 @@
+"""スニペット登録処理の各段階の処理時間とピークメモリを計測するベンチマーク.
+
+Examples:
+    $ poetry run python -m benchmarks.run_benchmark --files 500 --blocks 5 --entries 20000
+    $ poetry run python -m benchmarks.run_benchmark --output bench_output.json
+"""
+
+import argparse
+import json
+import statistics
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+from dataclasses import asdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+from typing import Callable
+from typing import Optional
+
+from benchmarks.generators import create_lib_setting
+from benchmarks.generators import generate_library
+from benchmarks.generators import generate_snippet_json
+from benchmarks.legacy import extract_library_code_legacy
+from benchmarks.legacy import hold_library_code_legacy
+from benchmarks.legacy import read_jsonc_legacy
+from snippet.src.common.file_helper import read_jsonc
+from snippet.src.common.file_helper import write_json
+from snippet.src.common.json_serializer import JSON_BACKEND_STDLIB
+from snippet.src.common.json_serializer import JSON_FORMAT_COMPACT
+from snippet.src.common.json_serializer import JsonSerializer
+from snippet.src.lib_loader.dataclass import LibraryCode
+from snippet.src.lib_loader.dataclass import LibrarySettingData
+from snippet.src.lib_loader.load import extract_library_code
+from snippet.src.lib_loader.load import get_library_code_path
+from snippet.src.lib_loader.load import load_library
+from snippet.src.update_snippet.update import update_language_snippet
+
+BENCH_LIBRARY_NAME = "lib_000"
+STDLIB_SERIALIZER = JsonSerializer(backend=JSON_BACKEND_STDLIB)
+COMPACT_SERIALIZER = JsonSerializer(format=JSON_FORMAT_COMPACT)
+
+
+@dataclass
+class BenchmarkResult:
+    """1段階分のベンチマーク結果
+
+    Attributes:
+        stage (str): 計測した段階の名前
+        repeat (int): 計測回数
+        min_seconds (float): 最小処理時間[秒]
+        mean_seconds (float): 平均処理時間[秒]
+        peak_memory_bytes (int): 処理中のピークメモリ[byte] (tracemallocで計測)
+        retained_memory_bytes (int): 処理後に戻り値が保持しているメモリ[byte] (tracemallocで計測)
+    """
+
+    stage: str
+    repeat: int
+    min_seconds: float
+    mean_seconds: float
+    peak_memory_bytes: int
+    retained_memory_bytes: int
+
+
+def hold_library_code(code_path_list: list[str], setting_data: LibrarySettingData) -> list[LibraryCode]:
+    """すべてのファイルからコードブロックを抽出し、1つのリストで保持する.
+
+    Args:
+        code_path_list (list[str]): ライブラリコードファイルのパスのリスト
+        setting_data (LibrarySettingData): ライブラリ設定データ
+
+    Returns:
+        list[LibraryCode]: 抽出されたコードブロックのリスト
+    """
+    return [
+        lib_code for code_path in code_path_list for lib_code in extract_library_code(code_path, setting_data) or []
+    ]
+
+
+def measure(stage: str, func: Callable[[], Any], repeat: int) -> BenchmarkResult:
+    """関数の処理時間とピークメモリ、戻り値が保持するメモリを計測する.
+
+    処理時間はtracemallocのオーバーヘッドを含まないよう、ピークメモリとは別に計測します。
+
+    Args:
+        stage (str): 計測する段階の名前
+        func (Callable[[], Any]): 計測対象の関数
+        repeat (int): 処理時間の計測回数
+
+    Returns:
+        BenchmarkResult: 計測結果
+    """
+    elapsed_list = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed_list.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        result = func()
+        retained_memory_bytes, peak_memory_bytes = tracemalloc.get_traced_memory()
+        del result
+    finally:
+        tracemalloc.stop()
+
+    return BenchmarkResult(
+        stage=stage,
+        repeat=repeat,
+        min_seconds=min(elapsed_list),
+        mean_seconds=statistics.mean(elapsed_list),
+        peak_memory_bytes=peak_memory_bytes,
+        retained_memory_bytes=retained_memory_bytes,
+    )
+
+
+def run_benchmark(
+    work_dirpath: Path,
+    file_count: int,
+    block_count: int,
+    entry_count: int,
+    library_count: int,
+    repeat: int,
+    plain_file_count: int = 0,
+) -> list[BenchmarkResult]:
+    """合成データを生成し、登録処理の各段階を計測する.
+
+    Args:
+        work_dirpath (Path): 合成データを生成する作業ディレクトリ
+        file_count (int): ライブラリのファイル数
+        block_count (int): 1ファイルあたりのコードブロック数
+        entry_count (int): 既存スニペットjsonのエントリ数
+        library_count (int): 既存スニペットjsonのエントリを分配するライブラリ数
+        repeat (int): 各段階の計測回数
+        plain_file_count (int): ライブラリに追加する、コードブロックを含まないファイル数
+
+    Returns:
+        list[BenchmarkResult]: 段階ごとの計測結果
+    """
+    lib_dirpath = work_dirpath / "lib"
+    generate_library(lib_dirpath, file_count, block_count, plain_file_count=plain_file_count)
+    snippet_path = work_dirpath / "python.json"
+    generate_snippet_json(snippet_path, entry_count, library_count)
+
+    lib_setting = create_lib_setting(str(lib_dirpath))
+    setting_data = LibrarySettingData.from_setting(BENCH_LIBRARY_NAME, lib_setting)
+    code_path_list = list(get_library_code_path(setting_data.relative_path, setting_data.language))
+    lib_codes = load_library({BENCH_LIBRARY_NAME: lib_setting})
+    snippet_data = defaultdict(dict, read_jsonc(snippet_path))
+    merged_snippet_data = update_language_snippet(snippet_data, lib_codes)
+    output_path = work_dirpath / "output.json"
+
+    return [
+        measure(
+            "get_library_code_path",
+            lambda: list(get_library_code_path(setting_data.relative_path, setting_data.language)),
+            repeat,
+        ),
+        measure(
+            "extract_library_code",
+            lambda: [extract_library_code(code_path, setting_data) for code_path in code_path_list],
+            repeat,
+        ),
+        measure(
+            "extract_library_code_legacy",
+            lambda: [extract_library_code_legacy(code_path, setting_data) for code_path in code_path_list],
+            repeat,
+        ),
+        measure("hold_library_code", lambda: hold_library_code(code_path_list, setting_data), repeat),
+        measure("hold_library_code_legacy", lambda: hold_library_code_legacy(code_path_list, setting_data), repeat),
+        measure("load_library", lambda: load_library({BENCH_LIBRARY_NAME: lib_setting}), repeat),
+        measure("read_jsonc", lambda: read_jsonc(snippet_path), repeat),
+        measure("read_jsonc_legacy", lambda: read_jsonc_legacy(snippet_path), repeat),
+        measure("update_language_snippet", lambda: update_language_snippet(snippet_data, lib_codes), repeat),
+        measure("write_json", lambda: write_json(output_path, merged_snippet_data), repeat),
+        measure("write_json_stdlib", lambda: write_json(output_path, merged_snippet_data, STDLIB_SERIALIZER), repeat),
+        measure("write_json_compact", lambda: write_json(output_path, merged_snippet_data, COMPACT_SERIALIZER), repeat),
+    ]
+
+
+def format_results(results: list[BenchmarkResult]) -> str:
+    """計測結果を表形式の文字列に変換する.
+
+    Args:
+        results (list[BenchmarkResult]): 計測結果
+
+    Returns:
+        str: 表形式の文字列
+    """
+    lines = [f"{'stage':<28}{'min[ms]':>12}{'mean[ms]':>12}{'peak[MiB]':>12}{'retained[MiB]':>15}"]
+    for result in results:
+        lines.append(
+            f"{result.stage:<28}"
+            f"{result.min_seconds * 1000:>12.2f}"
+            f"{result.mean_seconds * 1000:>12.2f}"
+            f"{result.peak_memory_bytes / (1 << 20):>12.2f}"
+            f"{result.retained_memory_bytes / (1 << 20):>15.2f}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[list[str]] = None) -> list[BenchmarkResult]:
+    """ベンチマークを実行して結果を出力する.
+
+    Args:
+        argv (Optional[list[str]]): コマンドライン引数。Noneの場合はsys.argvを使用する
+
+    Returns:
+        list[BenchmarkResult]: 段階ごとの計測結果
+    """
+    parser = argparse.ArgumentParser(description="library-snippet-registration benchmark")
+    parser.add_argument("--files", type=int, default=200, help="ライブラリのファイル数")
+    parser.add_argument("--plain-files", type=int, default=0, help="コードブロックを含まないファイル数")
+    parser.add_argument("--blocks", type=int, default=5, help="1ファイルあたりのコードブロック数")
+    parser.add_argument("--entries", type=int, default=5000, help="既存スニペットjsonのエントリ数")
+    parser.add_argument("--libraries", type=int, default=50, help="既存スニペットjsonのライブラリ数")
+    parser.add_argument("--repeat", type=int, default=3, help="各段階の計測回数")
+    parser.add_argument("--output", type=Path, default=None, help="計測結果を書き込むjsonファイルパス")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        results = run_benchmark(
+            Path(tmpdir), args.files, args.blocks, args.entries, args.libraries, args.repeat, args.plain_files
+        )
+
+    print(format_results(results))
+    if args.output:
+        conditions = {key: value for key, value in vars(args).items() if key != "output"}
+        args.output.write_text(
+            json.dumps({"conditions": conditions, "results": [asdict(result) for result in results]}, indent=2)
+        )
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""`python -X importtime`でCLIの起動時にインポートされるモジュールと時間を計測するベンチマーク.
+
+Examples:
+    $ poetry run python -m benchmarks.startup
+    $ poetry run python -m benchmarks.startup --repeat 10 -- client status
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from dataclasses import dataclass
+from typing import Optional
+
+# -X importtimeの出力行 ("import time: self [us] | cumulative | imported package")
+_IMPORTTIME_PREFIX = "import time:"
+
+
+@dataclass
+class StartupResult:
+    """1回分の起動計測結果
+
+    Attributes:
+        returncode (int): 終了コード
+        imported_modules (dict[str, int]): インポートされたモジュール名と累積インポート時間[us]
+        top_level_modules (tuple[str, ...]): 他のモジュールを経由せずにインポートされたモジュール名
+    """
+
+    returncode: int
+    imported_modules: dict[str, int]
+    top_level_modules: tuple[str, ...]
+
+    @property
+    def total_import_us(self) -> int:
+        """トップレベルでインポートされたモジュールの累積インポート時間の合計[us]."""
+        return sum(self.imported_modules[name] for name in self.top_level_modules)
+
+
+def parse_importtime(stderr: str) -> tuple[dict[str, int], tuple[str, ...]]:
+    """-X importtimeの出力を解析する.
+
+    Args:
+        stderr (str): 標準エラー出力
+
+    Returns:
+        tuple[dict[str, int], tuple[str, ...]]: ({モジュール名: 累積インポート時間[us]}, トップレベルのモジュール名)
+    """
+    imported_modules: dict[str, int] = {}
+    top_level_modules: list[str] = []
+    for line in stderr.splitlines():
+        if not line.startswith(_IMPORTTIME_PREFIX):
+            continue
+        fields = line[len(_IMPORTTIME_PREFIX) :].split("|")
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            # ヘッダ行
+            continue
+        name = fields[2].rstrip()
+        module_name = name.strip()
+        imported_modules[module_name] = int(fields[1])
+        if name == f" {module_name}":
+            top_level_modules.append(module_name)
+    return imported_modules, tuple(top_level_modules)
+
+
+def measure_startup(cli_args: list[str], env: Optional[dict[str, str]] = None) -> StartupResult:
+    """`python -X importtime -m snippet <cli_args>`を実行し、インポートされたモジュールを計測する.
+
+    Args:
+        cli_args (list[str]): snippetに渡すコマンドライン引数
+        env (Optional[dict[str, str]]): 追加する環境変数
+
+    Returns:
+        StartupResult: 計測結果
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "snippet", *cli_args],
+        capture_output=True,
+        text=True,
+        env={**os.environ, **(env or {})},
+        stdin=subprocess.DEVNULL,
+        check=False,
+    )
+    imported_modules, top_level_modules = parse_importtime(completed.stderr)
+    return StartupResult(completed.returncode, imported_modules, top_level_modules)
+
+
+def main(argv: Optional[list[str]] = None) -> list[StartupResult]:
+    """起動時間を計測して結果を出力する.
+
+    Args:
+        argv (Optional[list[str]]): コマンドライン引数。Noneの場合はsys.argvを使用する
+
+    Returns:
+        list[StartupResult]: 計測結果
+    """
+    parser = argparse.ArgumentParser(description="library-snippet-registration startup benchmark")
+    parser.add_argument("--repeat", type=int, default=5, help="計測回数")
+    parser.add_argument("--top", type=int, default=15, help="表示する累積インポート時間の上位モジュール数")
+    parser.add_argument("cli_args", nargs="*", help="snippetに渡すコマンドライン引数 (省略時は使用方法の表示)")
+    args = parser.parse_args(argv)
+
+    results = [measure_startup(args.cli_args) for _ in range(args.repeat)]
+    totals = [result.total_import_us / 1000 for result in results]
+    print(f"command: python -m snippet {' '.join(args.cli_args)}".rstrip())
+    print(f"import time [ms]: min {min(totals):.2f}, mean {statistics.mean(totals):.2f}")
+    print(f"imported modules: {len(results[-1].imported_modules)}")
+    slowest = sorted(results[-1].imported_modules.items(), key=lambda item: item[1], reverse=True)[: args.top]
+    for module_name, cumulative_us in slowest:
+        print(f"  {cumulative_us / 1000:>8.2f} ms  {module_name}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -15,3 +15,6 @@ TEMPLATE_SETTING_PATH = PACKAGE_PATH / Path("config_template/setting.yml")
 WORKSPACE_DIRPATH = Path("./.library-snippet-registration")
 BACKUP_DIRPATH = WORKSPACE_DIRPATH / Path(".backup_snippet")
 SETTING_PATH = WORKSPACE_DIRPATH / Path("setting.yml")
+SCAN_CACHE_PATH = WORKSPACE_DIRPATH / Path(".scan_cache.json")
+METRICS_PATH = WORKSPACE_DIRPATH / Path("metrics.json")
+DAEMON_SOCKET_PATH = WORKSPACE_DIRPATH / Path("daemon.sock")
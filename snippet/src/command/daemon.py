@@ -0,0 +1,30 @@
+"""daemonモードの処理を行うモジュール."""
+
+from logging import getLogger
+from typing import Optional
+
+from snippet.src.command.register import read_device_setting
+from snippet.src.common.metrics import Metrics
+from snippet.src.daemon.protocol import get_daemon_socket_path
+from snippet.src.daemon.server import SnippetDaemon
+from snippet.src.daemon.server import serve_daemon
+
+logger = getLogger("snippet")
+
+
+def run_daemon(device_name: Optional[str] = None) -> None:
+    """設定とライブラリコードをメモリ上に保持し、クライアントからのリクエストを処理するデーモンを起動する
+
+    Args:
+        device_name (Optional[str]): 使用するデバイス名。Noneの場合は自動またはターミナルで選択する
+    """
+    device_setting_result = read_device_setting(Metrics(), device_name)
+    if device_setting_result is None:
+        return
+    setting_data, device_name = device_setting_result
+
+    daemon = SnippetDaemon(setting_data, device_name)
+    try:
+        serve_daemon(daemon, get_daemon_socket_path())
+    except KeyboardInterrupt:
+        logger.info("Stop daemon")
@@ -0,0 +1,118 @@
+"""registerモードの処理を行うモジュール."""
+
+from logging import getLogger
+from typing import Optional
+
+from snippet.setting import METRICS_PATH
+from snippet.setting import SCAN_CACHE_PATH
+from snippet.src.common.metrics import Metrics
+from snippet.src.common.metrics import measure_stage
+from snippet.src.io import read_setting
+from snippet.src.lib_loader.cache import ScanCache
+from snippet.src.lib_loader.dataclass import LibraryCode
+from snippet.src.lib_loader.discovery import FileDiscoveryData
+from snippet.src.lib_loader.load import EXECUTOR_PROCESS
+from snippet.src.lib_loader.load import load_library
+from snippet.src.update_snippet.backup import backup_snippet_files
+from snippet.src.update_snippet.update import update_device_snippet
+
+logger = getLogger("snippet")
+
+
+def load_library_codes(tool_setting: dict, library_settings: dict, metrics: Optional[Metrics]) -> list[LibraryCode]:
+    """ツール設定に従ってライブラリコードを読み込む
+
+    Args:
+        tool_setting (dict): ツール設定辞書
+        library_settings (dict): ライブラリ設定辞書
+        metrics (Optional[Metrics]): 処理時間とカウンタの記録先。Noneの場合は計測しない
+
+    Returns:
+        list[LibraryCode]: 読み込んだライブラリコードのリスト
+    """
+    # インクリメンタルモードの場合、前回の走査結果を再利用する
+    scan_cache = None
+    if tool_setting.get("scan_cache", False):
+        scan_cache = ScanCache.load(SCAN_CACHE_PATH, use_hash=tool_setting.get("scan_cache_use_hash", False))
+
+    lib_codes = load_library(
+        library_settings,
+        scan_cache,
+        max_workers=tool_setting.get("load_workers", 1),
+        executor_type=tool_setting.get("load_executor", EXECUTOR_PROCESS),
+        metrics=metrics,
+        discovery=FileDiscoveryData.from_setting(tool_setting),
+    )
+    if scan_cache is not None:
+        scan_cache.save(SCAN_CACHE_PATH)
+    return lib_codes
+
+
+def report_metrics(metrics: Metrics) -> None:
+    """計測結果をログとjsonファイルに出力する
+
+    Args:
+        metrics (Metrics): 計測結果
+    """
+    metrics.log_summary(logger)
+    metrics.write_json(METRICS_PATH)
+    logger.info(f"metrics file: {METRICS_PATH}")
+
+
+def read_device_setting(metrics: Metrics, device_name: Optional[str] = None) -> Optional[tuple[dict, str]]:
+    """設定ファイルを読み込み、使用するデバイスを選択する
+
+    Args:
+        metrics (Metrics): 設定読み込みの処理時間の記録先
+        device_name (Optional[str]): 使用するデバイス名。Noneの場合は環境変数、ホスト名、ターミナルでの選択で決定する
+
+    Returns:
+        Optional[tuple[dict, str]]: (設定データ, 選択したデバイス名)。失敗した場合はNone
+    """
+    with metrics.stage("setting"):
+        setting_data = read_setting.read_setting_yaml()
+    if not setting_data:
+        logger.error("設定ファイルの読み込みに失敗しました。設定ファイルの内容を確認してください。")
+        return None
+
+    device_name = read_setting.resolve_device(setting_data, device_name)
+    if not device_name:
+        logger.error("デバイスの選択に失敗しました。設定ファイルのdevices項目を確認してください。")
+        return None
+
+    logger.info(f"choose device: {device_name}")
+    return setting_data, device_name
+
+
+def resist_snippet(profile: bool = False, device_name: Optional[str] = None) -> bool:
+    """スニペットへの登録処理
+
+    Args:
+        profile (bool): 段階ごとの処理時間とカウンタを出力するか (tool_configのmetricsでも有効化可能)
+        device_name (Optional[str]): 使用するデバイス名。Noneの場合は自動またはターミナルで選択する
+
+    Returns:
+        bool: 設定の読み込みと、すべてのスニペットファイルの更新に成功した場合True
+    """
+    metrics = Metrics()
+    device_setting_result = read_device_setting(metrics, device_name)
+    if device_setting_result is None:
+        return False
+    setting_data, device_name = device_setting_result
+    device_setting = setting_data["devices"][device_name]
+
+    tool_setting = setting_data["tool_config"]
+    library_settings = setting_data.get("libraries", [])
+
+    # 計測が無効な場合、以降の段階では計測しない
+    stage_metrics = metrics if profile or tool_setting.get("metrics", False) else None
+
+    lib_codes = load_library_codes(tool_setting, library_settings, stage_metrics)
+
+    with measure_stage(stage_metrics, "backup"):
+        backup_snippet_files(tool_setting, device_setting, {code.language for code in lib_codes})
+    update_result = update_device_snippet(tool_setting, device_setting, lib_codes, stage_metrics)
+
+    if stage_metrics is not None:
+        report_metrics(stage_metrics)
+    return update_result.is_success
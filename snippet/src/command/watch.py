@@ -0,0 +1,69 @@
+"""watchモードの処理を行うモジュール."""
+
+import threading
+from logging import getLogger
+from typing import Optional
+
+from snippet.src.command.register import read_device_setting
+from snippet.src.common.metrics import Metrics
+from snippet.src.lib_loader.discovery import FileDiscoveryData
+from snippet.src.update_snippet.backup import backup_snippet_files
+from snippet.src.update_snippet.update import update_device_snippet
+from snippet.src.watch.session import LibraryWatchSession
+from snippet.src.watch.watcher import DEFAULT_WATCH_DEBOUNCE
+from snippet.src.watch.watcher import DEFAULT_WATCH_INTERVAL
+from snippet.src.watch.watcher import WATCH_BACKEND_AUTO
+from snippet.src.watch.watcher import create_watcher
+from snippet.src.watch.watcher import run_watch_loop
+
+logger = getLogger("snippet")
+
+
+def watch_snippet(device_name: Optional[str] = None) -> None:
+    """ライブラリファイルの変更を監視し、変更されたライブラリの言語のスニペットを再登録する
+
+    起動時にすべてのライブラリを登録した後は、変更されたライブラリのみ再探索し、
+    変更されたファイルのみ再抽出して、コードブロックが変化した言語の<言語名>.jsonのみ更新します。
+
+    Args:
+        device_name (Optional[str]): 使用するデバイス名。Noneの場合は自動またはターミナルで選択する
+    """
+    device_setting_result = read_device_setting(Metrics(), device_name)
+    if device_setting_result is None:
+        return
+    setting_data, device_name = device_setting_result
+    device_setting = setting_data["devices"][device_name]
+
+    tool_setting = setting_data["tool_config"]
+    session = LibraryWatchSession(setting_data.get("libraries", {}), FileDiscoveryData.from_setting(tool_setting))
+
+    lib_codes = session.get_library_codes()
+    backup_snippet_files(tool_setting, device_setting, {code.language for code in lib_codes})
+    update_device_snippet(tool_setting, device_setting, lib_codes, None)
+
+    def on_change(changed_paths: set[str]) -> None:
+        languages = session.refresh(changed_paths)
+        if not languages:
+            logger.debug(f"No code block changes ({len(changed_paths)} paths changed)")
+            return
+        logger.info(f"Code blocks changed: {', '.join(sorted(languages))}")
+        update_device_snippet(tool_setting, device_setting, session.get_library_codes(languages), None)
+
+    watcher = create_watcher(
+        session.watch_dirpaths,
+        tool_setting.get("watch_backend", WATCH_BACKEND_AUTO),
+        session.iter_watch_file_paths,
+    )
+    logger.info(f"Watching {len(session.watch_dirpaths)} library directories (Ctrl+C to stop)")
+    try:
+        run_watch_loop(
+            watcher,
+            on_change,
+            threading.Event(),
+            interval=tool_setting.get("watch_interval", DEFAULT_WATCH_INTERVAL),
+            debounce=tool_setting.get("watch_debounce", DEFAULT_WATCH_DEBOUNCE),
+        )
+    except KeyboardInterrupt:
+        logger.info("Stop watching")
+    finally:
+        watcher.close()
@@ -1,19 +1,48 @@
 import json
+import mmap
+import os
 import re
+import shutil
+import tempfile
 from logging import getLogger
 from pathlib import Path
 from typing import Any
+from typing import Iterable
 from typing import Optional
 
-import yaml
-
 from snippet.setting import FILE_ENCODING
-from snippet.src.common.jinja2_helper import create_jinja2_context
-from snippet.src.common.jinja2_helper import render_jinja2_template
+from snippet.src.common.json_serializer import DEFAULT_JSON_SERIALIZER
+from snippet.src.common.json_serializer import JsonSerializer
 
 logger = getLogger("snippet").getChild("file_helper")
 
 
+def _read_umask() -> int:
+    # os.umaskは設定と同時にしか取得できないため、一時的に設定して元に戻す
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+# ワーカースレッドがファイルを作成している間にumaskを変更しないよう、インポート時に1回だけ取得する
+_UMASK = _read_umask()
+
+# この大きさ以上のファイルはmmapで検索する (小さなファイルは一括で読み込む方が速い)
+MMAP_MIN_FILE_SIZE = 64 * 1024
+
+# JSONCの走査状態 (文字列リテラル外、文字列リテラル内、行コメント内、ブロックコメント内)
+_JSONC_STATE_CODE = 0
+_JSONC_STATE_STRING = 1
+_JSONC_STATE_LINE_COMMENT = 2
+_JSONC_STATE_BLOCK_COMMENT = 3
+# 文字列リテラル外で状態が変わる可能性のある文字
+_JSONC_CODE_SPECIAL_PATTERN = re.compile(r'["/]')
+# 文字列リテラル内で状態が変わる可能性のある文字 (改行は閉じていない文字列リテラルの終端とする)
+_JSONC_STRING_SPECIAL_PATTERN = re.compile(r'["\\\n]')
+# コメント除去後のjsonの文字列リテラル (グループ1) または末尾カンマ
+_JSON_STRING_OR_TRAILING_COMMA_PATTERN = re.compile(r'("[^"\\\n]*(?:\\.[^"\\\n]*)*")|,(?=\s*[}\]])')
+
+
 def read_text(file_path: Path) -> list[str]:
     """テキストを読み込む。
 
@@ -27,6 +56,57 @@ def read_text(file_path: Path) -> list[str]:
         return [s.rstrip("\n") for s in f.readlines()]
 
 
+def _find_marker_region(data: Any, markers: list[bytes]) -> Optional[tuple[int, int]]:
+    # dataはbytesまたはmmap (どちらもfind/rfindを持つ)
+    found_markers = [(data.find(marker), marker) for marker in markers]
+    found_markers = [(position, marker) for position, marker in found_markers if position >= 0]
+    if not found_markers:
+        return None
+    first_position = min(position for position, _ in found_markers)
+    last_end = max(data.rfind(marker) + len(marker) for _, marker in found_markers)
+
+    # 最初のマークを含む行の先頭から、最後のマークを含む行の末尾まで (改行は\n, \r\n, \r)
+    start = max(data.rfind(b"\n", 0, first_position), data.rfind(b"\r", 0, first_position)) + 1
+    line_ends = [position for position in (data.find(b"\n", last_end), data.find(b"\r", last_end)) if position >= 0]
+    return start, min(line_ends, default=len(data))
+
+
+def read_marker_lines(file_path: Path, markers: Iterable[str]) -> Optional[list[str]]:
+    r"""マークを含むファイルのみ、最初のマークの行から最後のマークの行までを読み込む.
+
+    ファイルをバイト列のままマークで検索し、マークを含まないファイルはデコードしません。
+    マークを含むファイルも、最初のマークを含む行から最後のマークを含む行までのみデコードします。
+    大きなファイルはmmapで検索するため、ファイル全体をメモリに読み込みません。
+
+    Args:
+        file_path (Path): テキストファイルパス
+        markers (Iterable[str]): 検索するマーク (改行を含まない文字列)
+
+    Returns:
+        Optional[list[str]]: マークを含む範囲の行のリスト (read_textと同じく改行は除去)。
+            いずれのマークも含まない場合はNone
+
+    Note:
+        - 改行は"\n", "\r\n", "\r"のいずれも行区切りとして扱います (テキストモードでの読み込みと同じ)
+        - UTF-8の改行文字は複数バイト文字の一部にならないため、行単位でデコードできます
+    """
+    marker_bytes = [marker.encode(FILE_ENCODING) for marker in markers]
+    with open(file_path, "rb") as f:
+        file_size = os.fstat(f.fileno()).st_size
+        if file_size >= MMAP_MIN_FILE_SIZE:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                region = _find_marker_region(data, marker_bytes)
+                chunk = data[region[0] : region[1]] if region is not None else None
+        else:
+            content = f.read()
+            region = _find_marker_region(content, marker_bytes)
+            chunk = content[region[0] : region[1]] if region is not None else None
+
+    if chunk is None:
+        return None
+    return chunk.decode(FILE_ENCODING).replace("\r\n", "\n").replace("\r", "\n").split("\n")
+
+
 def read_yaml(yaml_path: Path) -> dict[Any, Any]:
     """yamlデータを読み込む
 
@@ -35,7 +115,12 @@ def read_yaml(yaml_path: Path) -> dict[Any, Any]:
 
     Returns:
         dict: 読み込んだyamlデータ
+
+    Note:
+        - 起動を軽くするため、yamlは初回呼び出し時にインポートします
     """
+    import yaml
+
     if not yaml_path.exists():
         return {}
     with open(yaml_path, "r", encoding=FILE_ENCODING) as f:
@@ -59,9 +144,100 @@ def read_json(json_path: Path) -> dict[Any, Any]:
         return result
 
 
+def _skip_jsonc_state(text: str, pos: int, state: int) -> tuple[int, int]:
+    """文字列リテラル・コメントの状態で、状態が変わる位置まで読み進める.
+
+    Args:
+        text (str): JSONC文字列
+        pos (int): 読み始める位置
+        state (int): 現在の状態 (_JSONC_STATE_CODE以外)
+
+    Returns:
+        tuple[int, int]: 読み進めた位置と、その位置での状態
+    """
+    if state == _JSONC_STATE_STRING:
+        match = _JSONC_STRING_SPECIAL_PATTERN.search(text, pos)
+        if match is None:
+            return len(text), state
+        if match.group() == "\\":
+            # エスケープされた文字は読み飛ばす
+            return match.end() + 1, state
+        return match.end(), _JSONC_STATE_CODE
+    if state == _JSONC_STATE_LINE_COMMENT:
+        # 行コメント末尾の改行は残す
+        line_end = text.find("\n", pos)
+        return (len(text) if line_end < 0 else line_end), _JSONC_STATE_CODE
+    comment_end = text.find("*/", pos)
+    return (len(text) if comment_end < 0 else comment_end + 2), _JSONC_STATE_CODE
+
+
+def _strip_jsonc_comments(text: str) -> str:
+    """JSONC文字列を1回走査して、文字列リテラル外のコメントを除去する.
+
+    文字列リテラル・行コメント・ブロックコメントの状態を持つ状態機械で、
+    状態が変わる可能性のある文字まで読み飛ばしながら走査します。
+
+    Args:
+        text (str): JSONC文字列
+
+    Returns:
+        str: コメントを除去した文字列 (行コメント末尾の改行は残す)
+    """
+    parts: list[str] = []
+    copied = 0  # 出力済みの位置
+    pos = 0
+    state = _JSONC_STATE_CODE
+
+    while pos < len(text):
+        if state != _JSONC_STATE_CODE:
+            in_comment = state != _JSONC_STATE_STRING
+            pos, state = _skip_jsonc_state(text, pos, state)
+            if in_comment:
+                copied = pos
+            continue
+
+        match = _JSONC_CODE_SPECIAL_PATTERN.search(text, pos)
+        if match is None:
+            break
+        pos = match.start()
+        if text[pos] == '"':
+            state = _JSONC_STATE_STRING
+            pos += 1
+        elif text.startswith("//", pos) or text.startswith("/*", pos):
+            parts.append(text[copied:pos])
+            state = _JSONC_STATE_LINE_COMMENT if text[pos + 1] == "/" else _JSONC_STATE_BLOCK_COMMENT
+            pos += 2
+            copied = pos
+        else:
+            pos += 1
+
+    if state in (_JSONC_STATE_LINE_COMMENT, _JSONC_STATE_BLOCK_COMMENT):
+        # 末尾の"//"または"/*"
+        copied = len(text)
+    parts.append(text[copied:])
+    return "".join(parts)
+
+
+def strip_jsonc(text: str) -> str:
+    """JSONC文字列からコメントと末尾カンマを除去してJSON文字列に変換する.
+
+    コメントを状態機械で除去してから、コメントを含まない文字列に対して末尾カンマを除去するため、
+    文字列内の"//"や"/*"、コメント内の括弧やカンマは、コメントや末尾カンマの判定に影響しません。
+
+    Args:
+        text (str): JSONC文字列
+
+    Returns:
+        str: JSON文字列
+    """
+    return _JSON_STRING_OR_TRAILING_COMMA_PATTERN.sub(r"\1", _strip_jsonc_comments(text))
+
+
 def read_jsonc(json_path: Path) -> dict[Any, Any]:
     """jsoncファイルを読み込む
 
+    コメントと末尾カンマを含まない場合は、そのままjsonとして読み込みます。
+
     Args:
         json_path (Path): jsonファイルパス
 
@@ -72,27 +248,130 @@ def read_jsonc(json_path: Path) -> dict[Any, Any]:
         return {}
 
     with open(json_path, "r", encoding=FILE_ENCODING) as f:
-        lines = f.readlines()
-
-    # 先頭行が // で始まるコメント行のみを削除
-    lines = [line for line in lines if not line.lstrip().startswith("//")]
-    text = "".join(lines)
+        text = f.read()
 
-    # ブロックコメント /* ... */ を削除
-    text = re.sub(r"/\*[\s\S]*?\*/", "", text)
-    result: dict[Any, Any] = json.loads(text)
+    try:
+        result: dict[Any, Any] = json.loads(text)
+    except json.JSONDecodeError:
+        result = json.loads(strip_jsonc(text))
     return result
 
 
-def write_json(json_path: Path, json_dict: dict) -> None:
-    """jsonファイルを書き込む
+def dump_json_text(json_dict: dict, serializer: JsonSerializer = DEFAULT_JSON_SERIALIZER) -> str:
+    """辞書データをjsonファイルに書き込む形式の文字列に変換する
+
+    Args:
+        json_dict (dict): 変換する辞書データ
+        serializer (JsonSerializer): 書き込み形式とシリアライザ (省略時はインデント2)
+
+    Returns:
+        str: json文字列 (write_jsonで書き込まれる内容と同じ)
+    """
+    return serializer.dumps(json_dict)
+
+
+def write_text_atomic(file_path: Path, text: str, fsync: bool = False) -> None:
+    """テキストファイルを原子的に書き込む
+
+    同じディレクトリの一時ファイルに書き込んでから置き換えるため、
+    書き込み途中の内容が読み込まれたり、書き込み中の異常終了でファイルが壊れたりしません。
+
+    Args:
+        file_path (Path): 書き込み先のファイルパス
+        text (str): 書き込むテキスト
+        fsync (bool): 置き換える前に一時ファイルの内容をディスクに同期するか
+
+    Note:
+        - 既存ファイルのパーミッションは引き継がれます
+        - シンボリックリンクの場合は、リンク自体ではなくリンク先のファイルを置き換えます
+        - ディレクトリエントリの同期はfsync_directoryで行ってください
+    """
+    file_path = Path(os.path.realpath(file_path))
+    fd, tmp_path = tempfile.mkstemp(dir=file_path.parent, prefix=f".{file_path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding=FILE_ENCODING) as f:
+            f.write(text)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        if file_path.exists():
+            shutil.copymode(file_path, tmp_path)
+        else:
+            # mkstempは所有者のみ読み書き可能なファイルを作成するため、通常のファイル作成と同じ権限にする
+            os.chmod(tmp_path, 0o666 & ~_UMASK)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+
+
+def fsync_directory(dirpath: Path) -> None:
+    """ディレクトリエントリの変更 (ファイルの置き換え) をディスクに同期する
+
+    Args:
+        dirpath (Path): 同期するディレクトリパス
+
+    Note:
+        - ディレクトリを開けないOS (Windows) では何もしません
+    """
+    try:
+        fd = os.open(dirpath, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def write_json(
+    json_path: Path, json_dict: dict, serializer: JsonSerializer = DEFAULT_JSON_SERIALIZER, fsync: bool = False
+) -> None:
+    """jsonファイルを原子的に書き込む
+
+    Args:
+        json_path (Path): 書き込み先のjsonファイル
+        json_dict (dict): 書き込む辞書データ
+        serializer (JsonSerializer): 書き込み形式とシリアライザ (省略時はインデント2)
+        fsync (bool): 置き換える前に内容をディスクに同期するか
+    """
+    write_text_atomic(json_path, dump_json_text(json_dict, serializer), fsync)
+
+
+def write_json_if_changed(
+    json_path: Path, json_dict: dict, serializer: JsonSerializer = DEFAULT_JSON_SERIALIZER, fsync: bool = False
+) -> bool:
+    """内容が変化している場合のみjsonファイルを原子的に書き込む
+
+    書き込む内容と既存ファイルの内容を比較し、同じ場合は書き込みをスキップします。
+    (エディタのファイル監視による再読み込みや、不要な書き込みを避けるため)
 
     Args:
         json_path (Path): 書き込み先のjsonファイル
         json_dict (dict): 書き込む辞書データ
+        serializer (JsonSerializer): 書き込み形式とシリアライザ (省略時はインデント2)
+        fsync (bool): 置き換える前に内容をディスクに同期するか
+
+    Returns:
+        bool: 書き込んだ場合True、内容が同じためスキップした場合False
     """
-    with open(json_path, "w", encoding=FILE_ENCODING) as f:
-        json.dump(json_dict, f, indent=2)
+    text = dump_json_text(json_dict, serializer)
+    if json_path.exists():
+        try:
+            with open(json_path, "r", encoding=FILE_ENCODING) as f:
+                if f.read() == text:
+                    return False
+        except UnicodeDecodeError:
+            # 読み込めない場合は内容が異なるものとして書き込む
+            pass
+
+    write_text_atomic(json_path, text, fsync)
+    return True
+
+
+_repo_root_cache: dict[Path, Optional[Path]] = {}
 
 
 def find_repo_root(start_path: Optional[Path] = None) -> Optional[Path]:
@@ -110,20 +389,43 @@ def find_repo_root(start_path: Optional[Path] = None) -> Optional[Path]:
     Note:
         - .gitディレクトリの存在をリポジトリの判定基準とする
         - ファイルシステムのルートまで遡っても見つからない場合はNoneを返す
+        - 遡る途中で確認したすべてのディレクトリの結果をキャッシュするため、
+          同じパスや兄弟ディレクトリからの再検索ではファイルシステムへのアクセスが最小限になる
+        - リポジトリの作成・削除を反映するにはclear_repo_root_cache()でキャッシュを破棄する
     """
-    current_path = start_path if start_path else Path.cwd()
-    current_path = current_path.resolve()
+    start_path = Path(os.path.abspath(start_path if start_path else Path.cwd()))
+    if start_path in _repo_root_cache:
+        return _repo_root_cache[start_path]
+
+    current_path = start_path.resolve()
+    visited_paths = [start_path]
 
     while True:
+        if current_path in _repo_root_cache:
+            repo_root = _repo_root_cache[current_path]
+            break
+
+        visited_paths.append(current_path)
         if (current_path / ".git").exists():
-            return current_path
+            repo_root = current_path
+            break
 
         parent = current_path.parent
         if parent == current_path:
             # ファイルシステムのルートに到達
-            return None
+            repo_root = None
+            break
         current_path = parent
 
+    for visited_path in visited_paths:
+        _repo_root_cache[visited_path] = repo_root
+    return repo_root
+
+
+def clear_repo_root_cache() -> None:
+    """find_repo_root()の検索結果のキャッシュを破棄する"""
+    _repo_root_cache.clear()
+
 
 def expand_yaml_templates(data: Any, base_path: Optional[Path] = None) -> Any:
     """YAML データ内の全ての文字列に対してJinja2テンプレート展開を行う
@@ -147,6 +449,10 @@ def expand_yaml_templates(data: Any, base_path: Optional[Path] = None) -> Any:
         >>> expand_yaml_templates(data)
         {"path": "/path/to/repo/lib", "count": 42}
     """
+    # 起動を軽くするため、jinja2は初回呼び出し時にインポートする
+    from snippet.src.common.jinja2_helper import create_jinja2_context
+    from snippet.src.common.jinja2_helper import render_jinja2_template
+
     context = create_jinja2_context(base_path)
 
     def _expand_recursive(obj: Any) -> Any:
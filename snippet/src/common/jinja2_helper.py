@@ -1,6 +1,7 @@
 """Jinja2テンプレート処理のヘルパー関数を提供するモジュール"""
 
 import os
+from functools import lru_cache
 from logging import getLogger
 from pathlib import Path
 from typing import Any
@@ -8,9 +9,49 @@ from typing import Optional
 
 from jinja2 import Environment
 from jinja2 import StrictUndefined
+from jinja2 import Template
 
 logger = getLogger("snippet").getChild("jinja2_helper")
 
+TEMPLATE_CACHE_SIZE = 512
+
+
+@lru_cache(maxsize=1)
+def get_jinja2_environment() -> Environment:
+    """共有のJinja2環境を取得する
+
+    Returns:
+        Environment: 全テンプレートで共有するJinja2環境 (初回呼び出し時に生成)
+    """
+    return Environment(
+        variable_start_string="{{",
+        variable_end_string="}}",
+        block_start_string="{%",
+        block_end_string="%}",
+        undefined=StrictUndefined,
+    )
+
+
+@lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def compile_jinja2_template(template_str: str) -> Template:
+    """テンプレート文字列をコンパイルする
+
+    同じテンプレート文字列のコンパイル結果はキャッシュされます。
+
+    Args:
+        template_str (str): テンプレート文字列
+
+    Returns:
+        Template: コンパイル済みテンプレート
+    """
+    return get_jinja2_environment().from_string(template_str)
+
+
+def clear_jinja2_template_cache() -> None:
+    """共有のJinja2環境とコンパイル済みテンプレートのキャッシュを破棄する"""
+    compile_jinja2_template.cache_clear()
+    get_jinja2_environment.cache_clear()
+
 
 def create_jinja2_context(base_path: Optional[Path] = None) -> dict[str, Any]:
     """Jinja2テンプレートのコンテキストを作成する
@@ -47,17 +88,9 @@ def render_jinja2_template(template_str: str, context: dict[str, Any]) -> str:
     if "{{" not in template_str and "{%" not in template_str:
         return template_str
 
-    # Jinja2環境を作成
-    env = Environment(
-        variable_start_string="{{",
-        variable_end_string="}}",
-        block_start_string="{%",
-        block_end_string="%}",
-        undefined=StrictUndefined,
-    )
-
     try:
-        template = env.from_string(template_str)
+        # 共有のJinja2環境でコンパイルしたテンプレートを再利用する
+        template = compile_jinja2_template(template_str)
         return template.render(context)
     except Exception as e:
         logger.error(f"Failed to render template: {template_str}. Error: {e}")
@@ -0,0 +1,142 @@
+"""jsonの書き込み形式とシリアライザを切り替えるモジュール."""
+
+import json
+import re
+from dataclasses import dataclass
+from logging import getLogger
+from types import ModuleType
+from typing import Any
+from typing import Optional
+
+logger = getLogger("snippet").getChild("json_serializer")
+
+try:
+    import orjson as _orjson
+
+    orjson: Optional[ModuleType] = _orjson
+except ImportError:
+    orjson = None
+
+JSON_BACKEND_AUTO = "auto"
+JSON_BACKEND_ORJSON = "orjson"
+JSON_BACKEND_STDLIB = "stdlib"
+
+JSON_FORMAT_PRETTY = "pretty"
+JSON_FORMAT_COMPACT = "compact"
+
+# json.dumps(ensure_ascii=True)がエスケープする、印字可能なASCII文字以外の文字 (制御文字を除く)
+_NON_ASCII_PATTERN = re.compile(r"[^\x00-\x7e]")
+
+
+def _escape_non_ascii_char(match: re.Match) -> str:
+    code = ord(match.group())
+    if code > 0xFFFF:
+        # BMP外の文字はサロゲートペアで表現する
+        code -= 0x10000
+        return f"\\u{0xD800 | (code >> 10):04x}\\u{0xDC00 | (code & 0x3FF):04x}"
+    return f"\\u{code:04x}"
+
+
+def escape_non_ascii(text: str) -> str:
+    r"""json文字列中の非ASCII文字を\uXXXX形式にエスケープする.
+
+    json.dumps(ensure_ascii=True)と同じ出力にするため、DEL(0x7f)もエスケープします。
+    非ASCII文字はjsonの文字列リテラル内にのみ現れるため、json文字列全体に適用できます。
+
+    Args:
+        text (str): json文字列
+
+    Returns:
+        str: 非ASCII文字をエスケープしたjson文字列
+    """
+    if text.isascii() and "\x7f" not in text:
+        return text
+    return _NON_ASCII_PATTERN.sub(_escape_non_ascii_char, text)
+
+
+def resolve_json_backend(backend: str) -> str:
+    """使用するシリアライザを決定する.
+
+    Args:
+        backend (str): 指定されたシリアライザ (auto/orjson/stdlib)
+
+    Returns:
+        str: 実際に使用するシリアライザ (orjson/stdlib)
+    """
+    if backend == JSON_BACKEND_STDLIB:
+        return JSON_BACKEND_STDLIB
+    if orjson is not None:
+        return JSON_BACKEND_ORJSON
+    if backend == JSON_BACKEND_ORJSON:
+        logger.warning(f"orjson is not installed, use `{JSON_BACKEND_STDLIB}` json backend instead")
+    elif backend != JSON_BACKEND_AUTO:
+        logger.warning(f"Unknown json backend `{backend}`, use `{JSON_BACKEND_AUTO}` instead")
+    return JSON_BACKEND_STDLIB
+
+
+@dataclass(frozen=True)
+class JsonSerializer:
+    """jsonの書き込み形式とシリアライザの設定データクラス
+
+    Attributes:
+        backend (str): シリアライザ (auto: orjsonがインストールされていれば使用, orjson, stdlib)
+        format (str): 書き込み形式 (pretty: インデント2, compact: 改行と空白なし)
+
+    Note:
+        - orjsonを使用した場合も、標準ライブラリのjson.dumpsと同じ文字列を出力します
+          (ただし浮動小数点数の指数表記とNaNの表現は異なります。スニペットデータは文字列のみのため影響しません)
+        - orjsonで変換できないデータ (64bitを超える整数、文字列以外のキー等) は標準ライブラリで変換します
+    """
+
+    backend: str = JSON_BACKEND_AUTO
+    format: str = JSON_FORMAT_PRETTY
+
+    @classmethod
+    def from_setting(cls, tool_setting: dict) -> "JsonSerializer":
+        """ツール設定からシリアライザの設定を生成する.
+
+        Args:
+            tool_setting (dict): ツール設定辞書
+                - json_backend: シリアライザ (auto/orjson/stdlib, 省略時はauto)
+                - json_format: 書き込み形式 (pretty/compact, 省略時はpretty)
+
+        Returns:
+            JsonSerializer: シリアライザの設定
+        """
+        json_format = tool_setting.get("json_format", JSON_FORMAT_PRETTY)
+        if json_format not in (JSON_FORMAT_PRETTY, JSON_FORMAT_COMPACT):
+            logger.warning(f"Unknown json format `{json_format}`, use `{JSON_FORMAT_PRETTY}` instead")
+            json_format = JSON_FORMAT_PRETTY
+        return cls(
+            backend=resolve_json_backend(tool_setting.get("json_backend", JSON_BACKEND_AUTO)),
+            format=json_format,
+        )
+
+    @property
+    def is_compact(self) -> bool:
+        """改行と空白を含まない形式で書き込むか."""
+        return self.format == JSON_FORMAT_COMPACT
+
+    def dumps(self, json_dict: Any) -> str:
+        """辞書データをjson文字列に変換する.
+
+        Args:
+            json_dict (Any): 変換する辞書データ
+
+        Returns:
+            str: json文字列
+        """
+        if orjson is not None and self.backend != JSON_BACKEND_STDLIB:
+            try:
+                option = 0 if self.is_compact else orjson.OPT_INDENT_2
+                return escape_non_ascii(orjson.dumps(json_dict, option=option).decode("utf-8"))
+            except TypeError:
+                # orjson.JSONEncodeErrorはTypeErrorのサブクラス
+                pass
+
+        if self.is_compact:
+            return json.dumps(json_dict, separators=(",", ":"))
+        return json.dumps(json_dict, indent=2)
+
+
+DEFAULT_JSON_SERIALIZER = JsonSerializer()
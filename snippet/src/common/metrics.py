@@ -0,0 +1,148 @@
+"""処理段階ごとの処理時間とカウンタを計測するモジュール."""
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+from contextlib import nullcontext
+from dataclasses import dataclass
+from dataclasses import field
+from logging import Logger
+from pathlib import Path
+from typing import Any
+from typing import ContextManager
+from typing import Iterator
+from typing import Optional
+
+from snippet.setting import FILE_ENCODING
+
+
+@dataclass
+class StageMetrics:
+    """1段階分の計測結果を格納するデータクラス
+
+    Attributes:
+        name (str): 段階名 (ex: "extract")
+        seconds (float): 処理時間の合計[秒]
+        counters (dict[str, int]): カウンタ (ex: {"files_scanned": 10})
+    """
+
+    name: str
+    seconds: float = 0.0
+    counters: dict[str, int] = field(default_factory=dict)
+
+
+class Metrics:
+    """登録処理の段階ごとの処理時間とカウンタを記録するクラス.
+
+    Note:
+        - 同じ段階名で複数回計測した場合、処理時間とカウンタは加算されます
+        - 段階は最初に記録された順序で出力されます
+        - カウンタの加算はスレッドセーフです
+    """
+
+    def __init__(self) -> None:
+        self.stages: dict[str, StageMetrics] = {}
+        self._lock = threading.Lock()
+
+    def _get_stage(self, name: str) -> StageMetrics:
+        if name not in self.stages:
+            self.stages[name] = StageMetrics(name)
+        return self.stages[name]
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[StageMetrics]:
+        """with文で囲んだ処理の時間を計測する.
+
+        Args:
+            name (str): 段階名
+
+        Yields:
+            StageMetrics: 計測中の段階
+        """
+        with self._lock:
+            stage_metrics = self._get_stage(name)
+        start = time.perf_counter()
+        try:
+            yield stage_metrics
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                stage_metrics.seconds += elapsed
+
+    def count(self, name: str, counter: str, value: int = 1) -> None:
+        """段階のカウンタを加算する.
+
+        Args:
+            name (str): 段階名
+            counter (str): カウンタ名 (ex: "files_scanned")
+            value (int): 加算する値
+        """
+        with self._lock:
+            counters = self._get_stage(name).counters
+            counters[counter] = counters.get(counter, 0) + value
+
+    def to_dict(self) -> dict[str, Any]:
+        """計測結果を辞書に変換する.
+
+        Returns:
+            dict[str, Any]: {"total_seconds": 合計時間, "stages": [{"name", "seconds", "counters"}, ...]}
+        """
+        return {
+            "total_seconds": sum(stage.seconds for stage in self.stages.values()),
+            "stages": [
+                {"name": stage.name, "seconds": stage.seconds, "counters": dict(stage.counters)}
+                for stage in self.stages.values()
+            ],
+        }
+
+    def log_summary(self, logger: Logger) -> None:
+        """計測結果の要約をログに出力する.
+
+        Args:
+            logger (Logger): 出力先のロガー
+        """
+        lines = ["metrics summary"]
+        for stage in self.stages.values():
+            counters = ", ".join(f"{key}={value}" for key, value in stage.counters.items())
+            lines.append(f"  {stage.name:<10} {stage.seconds * 1000:>10.2f} ms  {counters}".rstrip())
+        lines.append(f"  {'total':<10} {self.to_dict()['total_seconds'] * 1000:>10.2f} ms")
+        logger.info("\n".join(lines))
+
+    def write_json(self, json_path: Path) -> None:
+        """計測結果をjsonファイルに書き込む.
+
+        Args:
+            json_path (Path): 書き込み先のjsonファイル
+        """
+        json_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(json_path, "w", encoding=FILE_ENCODING) as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+
+def measure_stage(metrics: Optional[Metrics], name: str) -> ContextManager[Any]:
+    """metricsが指定されている場合のみ段階の処理時間を計測する.
+
+    Args:
+        metrics (Optional[Metrics]): 記録先。Noneの場合は計測しない
+        name (str): 段階名
+
+    Returns:
+        ContextManager[Any]: with文で使用するコンテキストマネージャ
+    """
+    if metrics is None:
+        return nullcontext()
+    return metrics.stage(name)
+
+
+def count_metrics(metrics: Optional[Metrics], name: str, counter: str, value: int = 1) -> None:
+    """metricsが指定されている場合のみ段階のカウンタを加算する.
+
+    Args:
+        metrics (Optional[Metrics]): 記録先。Noneの場合は何もしない
+        name (str): 段階名
+        counter (str): カウンタ名
+        value (int): 加算する値
+    """
+    if metrics is not None:
+        metrics.count(name, counter, value)
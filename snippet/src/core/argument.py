@@ -1,6 +1,7 @@
 import argparse
 from dataclasses import dataclass
 from logging import getLogger
+from typing import Optional
 
 from snippet.src.core.mode import Mode
 
@@ -13,9 +14,15 @@ class Argument:
 
     Attributes:
         mode (str): 実行モード(REGISTER/PREPARE/UNKNOWN)
+        profile (bool): 段階ごとの処理時間とカウンタを出力するか
+        command (str): clientモードでデーモンに送信するコマンド (register/status/stop)
+        device (Optional[str]): 使用するデバイス名 (指定しない場合はNone)
     """
 
     mode: str
+    profile: bool = False
+    command: str = Mode.REGISTER
+    device: Optional[str] = None
 
 
 def get_argument() -> Argument:
@@ -26,8 +33,13 @@ def get_argument() -> Argument:
     """
     parser = argparse.ArgumentParser()
     parser.add_argument("mode", type=str, nargs="?", default=Mode.UNKNOWN, help="")
+    parser.add_argument("command", type=str, nargs="?", default=Mode.REGISTER, help="clientモードで送信するコマンド")
+    parser.add_argument("--profile", action="store_true", help="段階ごとの処理時間とカウンタを出力する")
+    parser.add_argument("--device", type=str, default=None, help="使用するデバイス名 (setting.ymlのdevicesのキー)")
     parse_args = parser.parse_args()
 
     mode_value: str = parse_args.mode
     resolved_mode: str = mode_value if Mode.is_exist(mode_value) else Mode.UNKNOWN
-    return Argument(mode=resolved_mode)
+    return Argument(
+        mode=resolved_mode, profile=parse_args.profile, command=parse_args.command, device=parse_args.device
+    )
@@ -3,6 +3,9 @@ class Mode:
 
     REGISTER = "register"
     SETTING = "setting"
+    WATCH = "watch"
+    DAEMON = "daemon"
+    CLIENT = "client"
     UNKNOWN = "unknown"
 
     @staticmethod
@@ -15,5 +18,5 @@ class Mode:
         Returns:
             bool: 存在する(True) or 存在しない(False)
         """
-        modes = [Mode.REGISTER, Mode.SETTING]
+        modes = [Mode.REGISTER, Mode.SETTING, Mode.WATCH, Mode.DAEMON, Mode.CLIENT]
         return mode_name in modes
@@ -0,0 +1,59 @@
+"""デーモンにリクエストを送信するクライアントモジュール.
+
+Note:
+    - クライアントの起動を軽くするため、このモジュールは標準ライブラリとprotocolモジュールのみに依存します
+"""
+
+import json
+from logging import getLogger
+from pathlib import Path
+from typing import Optional
+
+from snippet.src.daemon.protocol import DAEMON_COMMANDS
+from snippet.src.daemon.protocol import DEFAULT_REQUEST_TIMEOUT
+from snippet.src.daemon.protocol import get_daemon_socket_path
+from snippet.src.daemon.protocol import is_unix_socket_supported
+from snippet.src.daemon.protocol import send_request
+
+logger = getLogger("snippet").getChild("daemon")
+
+EXIT_SUCCESS = 0
+EXIT_FAILURE = 1
+EXIT_DAEMON_NOT_RUNNING = 2
+
+
+def run_client(command: str, socket_path: Optional[Path] = None, timeout: float = DEFAULT_REQUEST_TIMEOUT) -> int:
+    """デーモンにコマンドを送信し、結果をjsonで標準出力に出力する.
+
+    Args:
+        command (str): 送信するコマンド (register/status/stop)
+        socket_path (Optional[Path]): デーモンのソケットファイルパス。Noneの場合はget_daemon_socket_pathのパス
+        timeout (float): 接続と受信のタイムアウト[秒]
+
+    Returns:
+        int: 終了コード (0: 成功, 1: 失敗, 2: デーモンが起動していない)
+    """
+    if command not in DAEMON_COMMANDS:
+        logger.error(f"Unknown daemon command `{command}` (choose from: {', '.join(DAEMON_COMMANDS)})")
+        return EXIT_FAILURE
+    if not is_unix_socket_supported():
+        logger.error("Unix domain socket is not supported on this platform")
+        return EXIT_FAILURE
+
+    socket_path = socket_path or get_daemon_socket_path()
+    try:
+        response = send_request({"command": command}, socket_path, timeout)
+    except (FileNotFoundError, ConnectionRefusedError):
+        logger.error(f"Daemon is not running: {socket_path} (start it with `python -m snippet daemon`)")
+        return EXIT_DAEMON_NOT_RUNNING
+    except (OSError, ValueError) as e:
+        logger.error(f"Failed to communicate with daemon: {type(e).__name__}: {e}")
+        return EXIT_FAILURE
+
+    if not response.get("ok"):
+        logger.error(f"Daemon request failed: {response.get('error')}")
+        return EXIT_FAILURE
+
+    result = response.get("result", {})
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    return EXIT_FAILURE if result.get("failed") else EXIT_SUCCESS
@@ -0,0 +1,107 @@
+"""デーモンとクライアントの間の通信プロトコルを定義するモジュール.
+
+1回の接続で、リクエストとレスポンスをそれぞれ1行のjson (UTF-8, 改行終端) で送受信します。
+
+- リクエスト: {"command": "register" | "status" | "stop"}
+- レスポンス: {"ok": true, "result": {...}} または {"ok": false, "error": "エラー内容"}
+
+Note:
+    - クライアントの起動を軽くするため、このモジュールは標準ライブラリのみに依存します
+"""
+
+import json
+import os
+import socket
+from pathlib import Path
+from typing import Any
+from typing import BinaryIO
+
+from snippet.setting import DAEMON_SOCKET_PATH
+
+COMMAND_REGISTER = "register"
+COMMAND_STATUS = "status"
+COMMAND_STOP = "stop"
+DAEMON_COMMANDS = (COMMAND_REGISTER, COMMAND_STATUS, COMMAND_STOP)
+
+DAEMON_SOCKET_ENV = "SNIPPET_DAEMON_SOCKET"
+DEFAULT_REQUEST_TIMEOUT = 300.0
+MAX_MESSAGE_SIZE = 1024 * 1024
+
+
+def get_daemon_socket_path() -> Path:
+    """デーモンのソケットファイルパスを取得する.
+
+    Returns:
+        Path: 環境変数SNIPPET_DAEMON_SOCKETのパス。未設定の場合はワークスペースのdaemon.sock
+    """
+    return Path(os.environ.get(DAEMON_SOCKET_ENV) or DAEMON_SOCKET_PATH)
+
+
+def is_unix_socket_supported() -> bool:
+    """Unixドメインソケットを使用できるかを判定する.
+
+    Returns:
+        bool: 使用できる場合True
+    """
+    return hasattr(socket, "AF_UNIX")
+
+
+def encode_message(message: dict[str, Any]) -> bytes:
+    """メッセージを送信用の1行のjsonに変換する.
+
+    Args:
+        message (dict[str, Any]): メッセージ
+
+    Returns:
+        bytes: 改行で終端したjson
+    """
+    return (json.dumps(message, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def read_message(stream: BinaryIO) -> dict[str, Any]:
+    """ストリームから1行のjsonメッセージを読み込む.
+
+    Args:
+        stream (BinaryIO): ソケットのストリーム
+
+    Returns:
+        dict[str, Any]: メッセージ
+
+    Raises:
+        ConnectionError: メッセージを受信する前に接続が閉じられた場合
+        ValueError: メッセージが大きすぎる場合、またはjsonオブジェクトでない場合
+    """
+    line = stream.readline(MAX_MESSAGE_SIZE + 1)
+    if not line:
+        raise ConnectionError("Connection closed before receiving a message")
+    if len(line) > MAX_MESSAGE_SIZE:
+        raise ValueError(f"Message is too large (> {MAX_MESSAGE_SIZE} bytes)")
+    message = json.loads(line)
+    if not isinstance(message, dict):
+        raise ValueError("Message must be a json object")
+    return message
+
+
+def send_request(
+    request: dict[str, Any], socket_path: Path, timeout: float = DEFAULT_REQUEST_TIMEOUT
+) -> dict[str, Any]:
+    """デーモンにリクエストを送信し、レスポンスを受信する.
+
+    Args:
+        request (dict[str, Any]): リクエスト
+        socket_path (Path): デーモンのソケットファイルパス
+        timeout (float): 接続と受信のタイムアウト[秒]
+
+    Returns:
+        dict[str, Any]: レスポンス
+
+    Raises:
+        OSError: デーモンに接続できない場合、または通信に失敗した場合
+        ValueError: レスポンスが不正な場合
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(os.fspath(socket_path))
+        sock.sendall(encode_message(request))
+        with sock.makefile("rb") as stream:
+            return read_message(stream)
@@ -0,0 +1,327 @@
+"""設定とライブラリコードをメモリ上に保持し、ソケット経由のリクエストでスニペットを登録するデーモンモジュール."""
+
+import os
+import socket
+import time
+from logging import getLogger
+from pathlib import Path
+from typing import IO
+from typing import Any
+from typing import Optional
+
+from snippet.setting import SETTING_PATH
+from snippet.src.daemon.protocol import COMMAND_REGISTER
+from snippet.src.daemon.protocol import COMMAND_STATUS
+from snippet.src.daemon.protocol import COMMAND_STOP
+from snippet.src.daemon.protocol import DEFAULT_REQUEST_TIMEOUT
+from snippet.src.daemon.protocol import encode_message
+from snippet.src.daemon.protocol import is_unix_socket_supported
+from snippet.src.daemon.protocol import read_message
+from snippet.src.io import read_setting
+from snippet.src.lib_loader.dataclass import clear_library_descriptor_cache
+from snippet.src.lib_loader.discovery import FileDiscoveryData
+from snippet.src.update_snippet.backup import backup_snippet_files
+from snippet.src.update_snippet.update import update_device_snippet
+from snippet.src.watch.session import LibraryWatchSession
+
+logger = getLogger("snippet").getChild("daemon")
+
+# 停止要求を確認する間隔[秒] (接続を待機している間も、この間隔でstop_requestedを確認する)
+DAEMON_ACCEPT_INTERVAL = 0.5
+# 接続したクライアントからリクエストを受信するまでの最大待機時間[秒]
+DAEMON_RECEIVE_TIMEOUT = 5.0
+
+
+def get_setting_mtime_ns() -> Optional[int]:
+    """設定ファイルの更新時刻を取得する.
+
+    Returns:
+        Optional[int]: 設定ファイルの更新時刻[ns]。設定ファイルが存在しない場合はNone
+    """
+    try:
+        return os.stat(SETTING_PATH).st_mtime_ns
+    except OSError:
+        return None
+
+
+class SnippetDaemon:
+    """設定と、ファイルごとに抽出したライブラリコードを保持してリクエストを処理するクラス.
+
+    registerリクエストでは、ライブラリを再探索して更新時刻またはサイズが変化したファイルのみ再抽出し、
+    `python -m snippet register`と同じくバックアップとスニペットファイルの更新を行います。
+
+    Note:
+        - 設定ファイルが更新されている場合は、registerリクエストの処理前に読み込み直します
+        - デバイスは起動時に選択したものを使用し続けます
+    """
+
+    def __init__(self, setting_data: dict, device_name: str) -> None:
+        """設定を保持し、すべてのライブラリのコードブロックを読み込む.
+
+        Args:
+            setting_data (dict): 設定データ
+            device_name (str): スニペットを登録するデバイス名
+        """
+        self.device_name = device_name
+        self.started_at = time.time()
+        self.request_count = 0
+        self.stop_requested = False
+        self._setting_mtime_ns = get_setting_mtime_ns()
+        self._load_setting(setting_data)
+
+    def _load_setting(self, setting_data: dict) -> None:
+        device_settings = setting_data.get("devices", {})
+        if self.device_name not in device_settings:
+            raise ValueError(f"Device `{self.device_name}` is not found in setting file")
+        self.tool_setting: dict = setting_data["tool_config"]
+        self.device_setting: dict = device_settings[self.device_name]
+        self.session = LibraryWatchSession(
+            setting_data.get("libraries", {}), FileDiscoveryData.from_setting(self.tool_setting)
+        )
+
+    def reload_setting_if_changed(self) -> bool:
+        """設定ファイルが更新されている場合、設定とライブラリコードを読み込み直す.
+
+        Returns:
+            bool: 読み込み直した場合True
+
+        Raises:
+            ValueError: 設定ファイルの読み込みに失敗した場合、または起動時のデバイスが存在しない場合
+        """
+        setting_mtime_ns = get_setting_mtime_ns()
+        if setting_mtime_ns is None or setting_mtime_ns == self._setting_mtime_ns:
+            return False
+
+        setting_data = read_setting.read_setting_yaml()
+        if not setting_data:
+            raise ValueError("Failed to read setting file")
+        # 変更前の設定のライブラリ情報を保持し続けないよう、共有オブジェクトを破棄してから読み込み直す
+        clear_library_descriptor_cache()
+        self._load_setting(setting_data)
+        self._setting_mtime_ns = setting_mtime_ns
+        logger.info("Setting file reloaded")
+        return True
+
+    def register(self) -> dict[str, Any]:
+        """変更されたライブラリコードを再読み込みし、スニペットファイルを更新する.
+
+        Returns:
+            dict[str, Any]: 更新結果 (更新・未変更・失敗したスニペットファイル数、コードブロックが変化した言語等)
+        """
+        start = time.perf_counter()
+        is_reloaded = self.reload_setting_if_changed()
+        changed_languages = self.session.refresh(self.session.watch_dirpaths)
+        lib_codes = self.session.get_library_codes()
+
+        backup_snippet_files(self.tool_setting, self.device_setting, {code.language for code in lib_codes})
+        update_result = update_device_snippet(self.tool_setting, self.device_setting, lib_codes)
+        return {
+            "updated": update_result.updated,
+            "unchanged": update_result.unchanged,
+            "failed": update_result.failed,
+            "setting_reloaded": is_reloaded,
+            "changed_languages": sorted(changed_languages),
+            # 無効なライブラリ等の削除用のコードは、登録されるコードブロックではないため数えない
+            "code_blocks": sum(1 for code in lib_codes if code.enable),
+            "seconds": round(time.perf_counter() - start, 6),
+        }
+
+    def status(self) -> dict[str, Any]:
+        """デーモンの状態を取得する.
+
+        Returns:
+            dict[str, Any]: プロセスID、デバイス名、稼働時間、処理したリクエスト数、保持しているファイル数等
+        """
+        return {
+            "pid": os.getpid(),
+            "device": self.device_name,
+            "uptime_seconds": round(time.time() - self.started_at, 3),
+            "requests": self.request_count,
+            "libraries": len(self.session.setting_data_list),
+            "files": self.session.file_count,
+            "code_blocks": sum(1 for code in self.session.get_library_codes() if code.enable),
+        }
+
+    def handle_request(self, request: dict[str, Any]) -> dict[str, Any]:
+        """リクエストを処理してレスポンスを作成する.
+
+        Args:
+            request (dict[str, Any]): リクエスト {"command": コマンド名}
+
+        Returns:
+            dict[str, Any]: レスポンス {"ok": 成否, "result": 結果} または {"ok": False, "error": エラー内容}
+        """
+        self.request_count += 1
+        command = request.get("command")
+        logger.info(f"Request: {command}")
+        try:
+            if command == COMMAND_REGISTER:
+                result = self.register()
+            elif command == COMMAND_STATUS:
+                result = self.status()
+            elif command == COMMAND_STOP:
+                self.stop_requested = True
+                result = {}
+            else:
+                return {"ok": False, "error": f"Unknown command: {command}"}
+        except Exception as e:
+            # 1つのリクエストの失敗でデーモンを停止させない
+            logger.exception(f"Failed to handle request: {command}")
+            return {"ok": False, "error": f"{type(e).__name__}: {e}"}
+        return {"ok": True, "result": result}
+
+
+def handle_connection(
+    daemon: SnippetDaemon, conn: socket.socket, receive_timeout: float = DAEMON_RECEIVE_TIMEOUT
+) -> None:
+    """1つの接続のリクエストを受信し、レスポンスを送信する.
+
+    Args:
+        daemon (SnippetDaemon): リクエストを処理するデーモン
+        conn (socket.socket): クライアントとの接続
+        receive_timeout (float): リクエストを受信するまでの最大待機時間[秒]
+            (リクエストを送信しないクライアントで、他のリクエストの処理が止まらないようにする)
+    """
+    conn.settimeout(receive_timeout)
+    try:
+        with conn.makefile("rb") as stream:
+            try:
+                request = read_message(stream)
+            except ValueError as e:
+                conn.sendall(encode_message({"ok": False, "error": f"Invalid request: {e}"}))
+                return
+        conn.settimeout(DEFAULT_REQUEST_TIMEOUT)
+        conn.sendall(encode_message(daemon.handle_request(request)))
+    except OSError as e:
+        # 接続確認のみのクライアントや、応答前に切断したクライアント、リクエストを送信しないクライアント
+        logger.debug(f"Connection closed: {e}")
+
+
+def is_daemon_running(socket_path: Path) -> bool:
+    """ソケットファイルで待ち受けているデーモンが存在するかを判定する.
+
+    Args:
+        socket_path (Path): デーモンのソケットファイルパス
+
+    Returns:
+        bool: 接続できた場合True
+    """
+    if not socket_path.exists():
+        return False
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(os.fspath(socket_path))
+        except OSError:
+            return False
+    return True
+
+
+def get_daemon_lock_path(socket_path: Path) -> Path:
+    """デーモンの多重起動を防ぐロックファイルのパスを取得する.
+
+    Args:
+        socket_path (Path): デーモンのソケットファイルパス
+
+    Returns:
+        Path: <ソケットファイルパス>.lock
+    """
+    return socket_path.with_name(f"{socket_path.name}.lock")
+
+
+def acquire_daemon_lock(socket_path: Path) -> Optional[IO[bytes]]:
+    """デーモンのロックファイルの排他ロックを取得する.
+
+    Args:
+        socket_path (Path): デーモンのソケットファイルパス
+
+    Returns:
+        Optional[IO[bytes]]: ロックを保持しているファイル (閉じるとロックが解放される)。
+            他のデーモンがロックを保持している場合はNone
+
+    Note:
+        - ロックファイルは削除しません (削除すると、ロックの取得中のデーモンと別のファイルをロックする可能性があるため)
+    """
+    import fcntl
+
+    lock_file = open(get_daemon_lock_path(socket_path), "ab")
+    try:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return None
+    return lock_file
+
+
+def serve_daemon(
+    daemon: SnippetDaemon,
+    socket_path: Path,
+    accept_interval: float = DAEMON_ACCEPT_INTERVAL,
+    receive_timeout: float = DAEMON_RECEIVE_TIMEOUT,
+) -> bool:
+    """ソケットファイルで待ち受け、stopリクエストを受信するまでリクエストを順に処理する.
+
+    Args:
+        daemon (SnippetDaemon): リクエストを処理するデーモン
+        socket_path (Path): 待ち受けるソケットファイルパス
+        accept_interval (float): 接続を待機している間にstop_requestedを確認する間隔[秒]
+        receive_timeout (float): 接続したクライアントからリクエストを受信するまでの最大待機時間[秒]
+
+    Returns:
+        bool: 待ち受けを開始できた場合True
+
+    Note:
+        - リクエストは1つずつ順に処理するため、スニペットファイルの更新が同時に行われることはありません
+        - ソケットファイルは所有者のみ読み書きできる権限で作成し、終了時に削除します
+        - 起動確認からソケットファイルの作成までをロックファイルの排他ロックで保護するため、
+          同時に起動したデーモンが互いのソケットファイルを削除することはありません
+        - 他のスレッドからstop_requestedをTrueにした場合も、accept_interval秒以内に終了します
+    """
+    if not is_unix_socket_supported():
+        logger.error("Unix domain socket is not supported on this platform")
+        return False
+
+    socket_path.parent.mkdir(parents=True, exist_ok=True)
+    lock_file = acquire_daemon_lock(socket_path)
+    if lock_file is None:
+        logger.error(f"Daemon is already running: {socket_path}")
+        return False
+
+    with lock_file:
+        if is_daemon_running(socket_path):
+            logger.error(f"Daemon is already running: {socket_path}")
+            return False
+        # 異常終了したデーモンのソケットファイルを削除する
+        socket_path.unlink(missing_ok=True)
+
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+            prev_umask = os.umask(0o077)
+            try:
+                server.bind(os.fspath(socket_path))
+            finally:
+                os.umask(prev_umask)
+            server.listen()
+            server.settimeout(accept_interval)
+            logger.info(f"Daemon is listening: {socket_path} (pid: {os.getpid()})")
+            try:
+                serve_connections(daemon, server, receive_timeout)
+            finally:
+                socket_path.unlink(missing_ok=True)
+    logger.info("Daemon stopped")
+    return True
+
+
+def serve_connections(daemon: SnippetDaemon, server: socket.socket, receive_timeout: float) -> None:
+    """stop_requestedがTrueになるまで、接続を受け付けてリクエストを処理する.
+
+    Args:
+        daemon (SnippetDaemon): リクエストを処理するデーモン
+        server (socket.socket): タイムアウトを設定した待ち受け中のソケット
+        receive_timeout (float): 接続したクライアントからリクエストを受信するまでの最大待機時間[秒]
+    """
+    while not daemon.stop_requested:
+        try:
+            conn, _ = server.accept()
+        except TimeoutError:
+            continue
+        with conn:
+            handle_connection(daemon, conn, receive_timeout)
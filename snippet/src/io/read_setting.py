@@ -1,3 +1,7 @@
+import os
+import socket
+import sys
+from fnmatch import fnmatchcase
 from logging import getLogger
 from typing import Any
 from typing import Optional
@@ -9,6 +13,7 @@ from snippet.src.common.file_helper import read_yaml
 from snippet.src.common.string_helper import is_real_number
 
 FIN_INPUT_LIST = set({"exit", "e", "quit", "q"})
+DEVICE_ENV = "SNIPPET_DEVICE"
 
 
 logger = getLogger("snippet").getChild("read_setting")
@@ -83,3 +88,76 @@ def select_device_interactive(setting_data: dict) -> Optional[str]:
 
         except KeyboardInterrupt:
             return None
+
+
+def get_hostnames() -> set[str]:
+    """このマシンのホスト名を取得する.
+
+    Returns:
+        set[str]: 小文字にしたホスト名と、ドメインを除いた短いホスト名
+    """
+    hostname = socket.gethostname().lower()
+    return {hostname, hostname.split(".", 1)[0]}
+
+
+def match_device_hostname(device_setting: dict, hostnames: set[str]) -> bool:
+    """デバイス設定のhostnameがこのマシンのホスト名に一致するかを判定する.
+
+    Args:
+        device_setting (dict): デバイス設定辞書
+            - hostname: ホスト名、またはホスト名のリスト (ワイルドカード"*", "?"を使用可能, 大文字小文字を区別しない)
+        hostnames (set[str]): 小文字にしたこのマシンのホスト名
+
+    Returns:
+        bool: 一致するホスト名がある場合True。hostnameが設定されていない場合はFalse
+    """
+    patterns = device_setting.get("hostname") or []
+    if isinstance(patterns, str):
+        patterns = [patterns]
+    return any(fnmatchcase(hostname, str(pattern).lower()) for pattern in patterns for hostname in hostnames)
+
+
+def resolve_device(setting_data: dict, device_name: Optional[str] = None) -> Optional[str]:
+    """使用するデバイスを対話なしで決定する.
+
+    以下の順にデバイスを決定します。
+        1. device_name (コマンドライン引数の--device)
+        2. 環境変数SNIPPET_DEVICE
+        3. デバイス設定のhostnameがこのマシンのホスト名に一致するデバイス (1つのみ一致する場合)
+        4. デバイスが1つのみ記載されている場合はそのデバイス
+        5. 標準入力が端末の場合はターミナルで選択 (select_device_interactive)
+
+    Args:
+        setting_data (dict): 設定データ
+        device_name (Optional[str]): 指定されたデバイス名
+
+    Returns:
+        Optional[str]: 使用するデバイス名。決定できない場合はNone
+    """
+    devices: dict[str, dict] = setting_data.get("devices") or {}
+    if not devices:
+        logger.error("`setting.yml` file does not describe the device settings")
+        return None
+
+    for source, name in (("--device", device_name), (DEVICE_ENV, os.environ.get(DEVICE_ENV))):
+        if not name:
+            continue
+        if name not in devices:
+            logger.error(f"Device `{name}` specified by {source} is not found (choose from: {', '.join(devices)})")
+            return None
+        return name
+
+    hostnames = get_hostnames()
+    matched_devices = [
+        name for name, device_setting in devices.items() if match_device_hostname(device_setting, hostnames)
+    ]
+    if len(matched_devices) == 1:
+        logger.debug(f"Device `{matched_devices[0]}` matched hostname")
+        return matched_devices[0]
+    if len(matched_devices) > 1:
+        logger.warning(f"Multiple devices match hostname: {', '.join(matched_devices)}")
+
+    if len(devices) > 1 and not sys.stdin.isatty():
+        logger.error(f"Cannot choose device without a terminal. Specify --device or {DEVICE_ENV}")
+        return None
+    return select_device_interactive(setting_data)
@@ -0,0 +1,208 @@
+"""ライブラリファイルの走査結果を永続化するキャッシュモジュール."""
+
+import hashlib
+import json
+import os
+from dataclasses import asdict
+from logging import getLogger
+from pathlib import Path
+from typing import Any
+from typing import Optional
+
+from snippet.src.common.file_helper import read_json
+from snippet.src.common.file_helper import write_json
+from snippet.src.common.json_serializer import JSON_FORMAT_COMPACT
+from snippet.src.common.json_serializer import JsonSerializer
+from snippet.src.lib_loader.dataclass import LibraryCode
+from snippet.src.lib_loader.dataclass import LibraryDescriptor
+from snippet.src.lib_loader.dataclass import LibrarySettingData
+
+logger = getLogger("snippet").getChild("scan_cache")
+
+SCAN_CACHE_VERSION = 2
+CACHE_JSON_SERIALIZER = JsonSerializer(format=JSON_FORMAT_COMPACT)
+
+
+def calc_file_hash(file_path: str) -> str:
+    """ファイル内容のハッシュ値を計算する.
+
+    Args:
+        file_path (str): ファイルパス
+
+    Returns:
+        str: sha256のハッシュ値 (16進数文字列)
+    """
+    with open(file_path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def calc_setting_fingerprint(setting_data: LibrarySettingData) -> str:
+    """ライブラリ設定の指紋を計算する.
+
+    抽出ルールや言語設定が変わった場合にキャッシュを無効化するために使用します。
+
+    Args:
+        setting_data (LibrarySettingData): ライブラリ設定データ
+
+    Returns:
+        str: 設定内容を一意に表す文字列
+    """
+    return json.dumps(asdict(setting_data), sort_keys=True, ensure_ascii=False)
+
+
+class ScanCache:
+    """ライブラリファイルごとのコードブロック抽出結果を保持するキャッシュ.
+
+    ファイルパス・更新時刻・サイズ (オプションでファイル内容のハッシュ) をキーとして、
+    ファイルから抽出したコードブロックを保持します。
+    キャッシュに存在しない、または変更されたファイルのみ再抽出が必要になります。
+
+    Attributes:
+        use_hash (bool): 更新時刻が変化した場合にファイル内容のハッシュで再判定するか
+        hit_count (int): キャッシュヒットしたファイル数
+        miss_count (int): キャッシュミスしたファイル数
+
+    Note:
+        - キャッシュはライブラリ名ごとに管理され、ライブラリ設定が変わると破棄されます
+        - save()では今回の実行で参照されたファイルのみが保存されます (削除済みファイルは除外)
+    """
+
+    def __init__(self, libraries: Optional[dict[str, Any]] = None, use_hash: bool = False) -> None:
+        self.use_hash = use_hash
+        self.hit_count = 0
+        self.miss_count = 0
+        self._libraries: dict[str, Any] = libraries if libraries else {}
+        self._next_libraries: dict[str, Any] = {}
+        self._pending_signatures: dict[tuple[str, str], dict[str, Any]] = {}
+        self._checked_libraries: set[str] = set()
+
+    @classmethod
+    def load(cls, cache_path: Path, use_hash: bool = False) -> "ScanCache":
+        """キャッシュファイルを読み込む.
+
+        Args:
+            cache_path (Path): キャッシュファイルのパス
+            use_hash (bool): 更新時刻が変化した場合にファイル内容のハッシュで再判定するか
+
+        Returns:
+            ScanCache: 読み込んだキャッシュ。ファイルが存在しない、または壊れている場合は空のキャッシュ
+        """
+        try:
+            cache_data = read_json(cache_path)
+        except (OSError, ValueError):
+            logger.warning(f"Failed to read scan cache, rebuild it -> {cache_path}")
+            return cls(use_hash=use_hash)
+
+        if cache_data.get("version") != SCAN_CACHE_VERSION:
+            return cls(use_hash=use_hash)
+        return cls(cache_data.get("libraries", {}), use_hash=use_hash)
+
+    def save(self, cache_path: Path) -> None:
+        """今回の実行で参照したファイルのキャッシュを書き込む.
+
+        Args:
+            cache_path (Path): キャッシュファイルのパス
+        """
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        # 人が読むファイルではないため、改行と空白を含まない形式で書き込む
+        cache_data = {"version": SCAN_CACHE_VERSION, "libraries": self._next_libraries}
+        write_json(cache_path, cache_data, CACHE_JSON_SERIALIZER)
+        logger.debug(f"Scan cache saved: {self.hit_count} hit, {self.miss_count} miss -> {cache_path}")
+
+    def get(self, setting_data: LibrarySettingData, code_path: str) -> Optional[list[LibraryCode]]:
+        """キャッシュからファイルのコードブロックを取得する.
+
+        Args:
+            setting_data (LibrarySettingData): ライブラリ設定データ
+            code_path (str): ライブラリコードファイルのパス
+
+        Returns:
+            Optional[list[LibraryCode]]: キャッシュされたコードブロックのリスト。
+                キャッシュに存在しない、またはファイルが変更されている場合はNone
+        """
+        stat = os.stat(code_path)
+        signature: dict[str, Any] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+        entry = self._get_library_entry(setting_data)["files"].get(code_path)
+        if entry is not None and not self._is_match(entry, signature, code_path):
+            entry = None
+
+        if entry is None:
+            self.miss_count += 1
+            self._pending_signatures[(setting_data.library_name, code_path)] = signature
+            return None
+
+        self.hit_count += 1
+        entry = {**entry, **signature}
+        self._get_next_library_entry(setting_data)["files"][code_path] = entry
+        library = LibraryDescriptor.from_setting_data(setting_data)
+        return [
+            LibraryCode.from_body(
+                library,
+                snippet_key=block["snippet_key"],
+                snippet_prefix=block["snippet_prefix"],
+                description=block["description"],
+                body=block["body"],
+            )
+            for block in entry["blocks"]
+        ]
+
+    def put(self, setting_data: LibrarySettingData, code_path: str, lib_codes: list[LibraryCode]) -> None:
+        """ファイルから抽出したコードブロックをキャッシュに登録する.
+
+        Args:
+            setting_data (LibrarySettingData): ライブラリ設定データ
+            code_path (str): ライブラリコードファイルのパス
+            lib_codes (list[LibraryCode]): ファイルから抽出したコードブロックのリスト
+        """
+        signature = self._pending_signatures.pop((setting_data.library_name, code_path), None)
+        if signature is None:
+            stat = os.stat(code_path)
+            signature = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+        if self.use_hash and "hash" not in signature:
+            signature["hash"] = calc_file_hash(code_path)
+
+        self._get_next_library_entry(setting_data)["files"][code_path] = {
+            **signature,
+            "blocks": [
+                {
+                    "snippet_key": code.snippet_key,
+                    "snippet_prefix": code.snippet_prefix,
+                    "description": code.description,
+                    "body": code.body,
+                }
+                for code in lib_codes
+            ],
+        }
+
+    def _is_match(self, entry: dict[str, Any], signature: dict[str, Any], code_path: str) -> bool:
+        if entry["size"] != signature["size"]:
+            return False
+        if entry["mtime_ns"] == signature["mtime_ns"]:
+            return True
+        if not self.use_hash or "hash" not in entry:
+            return False
+
+        # 更新時刻のみ変化した場合(checkout等)は、内容のハッシュで再判定する
+        signature["hash"] = calc_file_hash(code_path)
+        return bool(entry["hash"] == signature["hash"])
+
+    def _get_library_entry(self, setting_data: LibrarySettingData) -> dict[str, Any]:
+        library_name = setting_data.library_name
+        if library_name not in self._checked_libraries:
+            # ライブラリ設定が変わっている場合は、そのライブラリのキャッシュを破棄する
+            entry = self._libraries.get(library_name)
+            if not entry or entry.get("fingerprint") != calc_setting_fingerprint(setting_data):
+                self._libraries[library_name] = {"files": {}}
+            self._checked_libraries.add(library_name)
+        library_entry: dict[str, Any] = self._libraries[library_name]
+        return library_entry
+
+    def _get_next_library_entry(self, setting_data: LibrarySettingData) -> dict[str, Any]:
+        if setting_data.library_name not in self._next_libraries:
+            self._next_libraries[setting_data.library_name] = {
+                "fingerprint": calc_setting_fingerprint(setting_data),
+                "files": {},
+            }
+        entry: dict[str, Any] = self._next_libraries[setting_data.library_name]
+        return entry
@@ -1,5 +1,46 @@
+import re
 from dataclasses import dataclass
 from dataclasses import field
+from functools import cached_property
+from typing import Any
+from typing import Iterator
+
+
+def extract_prefix_value(line: str, prefix: str) -> str:
+    """プレフィックス行からプレフィックスと"#"を除去して値を抽出する.
+
+    Args:
+        line (str): プレフィックスを含む行 (ex: "# [snippet_key] my_function")
+        prefix (str): 除去するプレフィックス (ex: "[snippet_key]")
+
+    Returns:
+        str: 抽出した値 (ex: "my_function")
+    """
+    return line.replace(prefix, "").replace("#", "").strip()
+
+
+def join_code_lines(code_lines: list[str]) -> str:
+    """コード行のリストを、各行の末尾に改行を付けた1つの文字列に連結する.
+
+    Args:
+        code_lines (list[str]): コード行のリスト (各行は改行を含まない)
+
+    Returns:
+        str: 連結した文字列 (空のリストの場合は空文字列)
+    """
+    return "\n".join(code_lines) + "\n" if code_lines else ""
+
+
+def split_code_body(body: str) -> list[str]:
+    """join_code_linesで連結した文字列をコード行のリストに分割する.
+
+    Args:
+        body (str): join_code_linesで連結した文字列
+
+    Returns:
+        list[str]: コード行のリスト
+    """
+    return body.split("\n")[:-1]
 
 
 @dataclass
@@ -23,6 +64,11 @@ class LibraryRuleData:
     lib_desc_prefix_snippet_prefix: str
     lib_desc_prefix_description: str
 
+    @cached_property
+    def matcher(self) -> "LibraryRuleMatcher":
+        """マークとプレフィックスをまとめた行分類器 (最初のアクセス時に1回だけ生成)."""
+        return LibraryRuleMatcher(self)
+
     @classmethod
     def from_setting(cls, lib_setting: dict) -> "LibraryRuleData":
         """設定辞書からLibraryRuleDataオブジェクトを生成する
@@ -42,6 +88,121 @@ class LibraryRuleData:
         )
 
 
+class LibraryRuleMatcher:
+    """抽出ルールのマークとプレフィックスを1つの正規表現にまとめて、行を分類するクラス.
+
+    開始・終了マークと3つのプレフィックスの選言パターンを1回だけコンパイルし、
+    いずれも含まない行 (コード行の大部分) を1回の検索で読み飛ばします。
+
+    Attributes:
+        BEGIN (int): 開始マークを含む行のフラグ
+        END (int): 終了マークを含む行のフラグ
+        SNIPPET_KEY (int): スニペットキーのプレフィックスを含む行のフラグ
+        SNIPPET_PREFIX (int): スニペットプレフィックスのプレフィックスを含む行のフラグ
+        DESCRIPTION (int): 説明のプレフィックスを含む行のフラグ
+        pattern (re.Pattern[str]): マークとプレフィックスの選言パターン
+    """
+
+    BEGIN = 1
+    END = 2
+    SNIPPET_KEY = 4
+    SNIPPET_PREFIX = 8
+    DESCRIPTION = 16
+
+    def __init__(self, rule: LibraryRuleData) -> None:
+        """抽出ルールから選言パターンをコンパイルする.
+
+        Args:
+            rule (LibraryRuleData): ライブラリコードの抽出ルール
+        """
+        flag_tokens = (
+            (self.BEGIN, rule.lib_code_block_begin),
+            (self.END, rule.lib_code_block_end),
+            (self.SNIPPET_KEY, rule.lib_desc_prefix_snippet_key),
+            (self.SNIPPET_PREFIX, rule.lib_desc_prefix_snippet_prefix),
+            (self.DESCRIPTION, rule.lib_desc_prefix_description),
+        )
+        # 同じ文字列が複数の役割を持つ場合は、フラグをまとめる
+        self._token_flags: dict[str, int] = {}
+        for flag, token in flag_tokens:
+            self._token_flags[token] = self._token_flags.get(token, 0) | flag
+        # 長いものから並べて、他の文字列を含むマーク・プレフィックスも検出できるようにする
+        tokens = sorted(self._token_flags, key=len, reverse=True)
+        self.pattern = re.compile("|".join(re.escape(token) for token in tokens))
+        # 出現箇所が重なり得る場合は、重ならない検索では見落とすため、含まれるかを個別に判定する
+        self._overlapping = _has_overlapping_tokens(tokens)
+
+    def classify(self, line: str) -> int:
+        """行に含まれるマークとプレフィックスのフラグを取得する.
+
+        Args:
+            line (str): 分類する行
+
+        Returns:
+            int: 含まれるマーク・プレフィックスのフラグの論理和。いずれも含まない場合は0
+        """
+        flags = 0
+        if self._overlapping:
+            if self.pattern.search(line) is not None:
+                for token, token_flags in self._token_flags.items():
+                    if token in line:
+                        flags |= token_flags
+            return flags
+
+        # 1行に複数のマーク・プレフィックスが含まれる場合も、それぞれのフラグを立てる
+        for token in self.pattern.findall(line):
+            flags |= self._token_flags[token]
+        return flags
+
+    def iter_marked_lines(self, lines: list[str]) -> Iterator[tuple[int, int]]:
+        """マークまたはプレフィックスを含む行のみを順に取得する.
+
+        すべての行を改行で連結したテキストに対して選言パターンを検索するため、
+        マーク・プレフィックスを含まない行は1行ずつ調べずに読み飛ばします。
+
+        Args:
+            lines (list[str]): 走査対象の行のリスト (各行は改行を含まない)
+
+        Yields:
+            tuple[int, int]: (行番号, classifyで取得したフラグ)。フラグは0以外
+        """
+        if not lines:
+            # 空のマーク・プレフィックスは空のテキストの先頭にも一致するため、行がない場合は検索しない
+            return
+        text = "\n".join(lines)
+        search = self.pattern.search
+        line_index = 0
+        line_start = 0
+        match = search(text)
+        while match is not None:
+            match_start = match.start()
+            line_index += text.count("\n", line_start, match_start)
+            flags = self.classify(lines[line_index])
+            if flags:
+                yield line_index, flags
+
+            # 同じ行の残りの部分は検索しない
+            line_end = text.find("\n", match_start)
+            if line_end < 0:
+                break
+            line_index += 1
+            line_start = line_end + 1
+            match = search(text, line_start)
+
+
+def _has_overlapping_tokens(tokens: list[str]) -> bool:
+    # いずれかの文字列が他の文字列を含む、または末尾と先頭が重なる場合にTrue (空文字列を含む)
+    for token in tokens:
+        if not token:
+            return True
+        for other in tokens:
+            if token is other:
+                continue
+            if token in other or any(other.startswith(token[i:]) for i in range(1, len(token))):
+                return True
+    return False
+
+
 @dataclass
 class LanguageData:
     """プログラミング言語に関する設定を管理するクラス.
@@ -117,25 +278,247 @@ class LibrarySettingData:
         )
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
+class LibraryDescriptor:
+    """同じライブラリのLibraryCodeで共有する、ライブラリの情報を管理するクラス.
+
+    同じ値のオブジェクトはinternで1つにまとめられ、プロセス間で受け渡した場合も共有されます。
+    登録した共有オブジェクトはclear_library_descriptor_cache()で破棄できます。
+
+    Attributes:
+        enable (bool): ライブラリの有効/無効フラグ
+        library_name (str): ライブラリ名
+        relative_path (str): ライブラリコードの相対パス
+        language (str): 言語名
+    """
+
+    enable: bool
+    library_name: str
+    relative_path: str
+    language: str
+
+    @classmethod
+    def intern(cls, enable: bool, library_name: str, relative_path: str, language: str) -> "LibraryDescriptor":
+        """同じ値の共有オブジェクトを取得する (存在しない場合は生成して登録する).
+
+        Args:
+            enable (bool): ライブラリの有効/無効フラグ
+            library_name (str): ライブラリ名
+            relative_path (str): ライブラリコードの相対パス
+            language (str): 言語名
+
+        Returns:
+            LibraryDescriptor: 共有オブジェクト
+        """
+        key = (enable, library_name, relative_path, language)
+        descriptor = _library_descriptors.get(key)
+        if descriptor is None:
+            descriptor = _library_descriptors.setdefault(key, cls(enable, library_name, relative_path, language))
+        return descriptor
+
+    @classmethod
+    def from_setting_data(cls, setting_data: LibrarySettingData) -> "LibraryDescriptor":
+        """ライブラリ設定データから共有オブジェクトを取得する.
+
+        Args:
+            setting_data (LibrarySettingData): ライブラリ設定データ
+
+        Returns:
+            LibraryDescriptor: 共有オブジェクト
+        """
+        return cls.intern(
+            setting_data.enable, setting_data.library_name, setting_data.relative_path, setting_data.language.name
+        )
+
+    def __reduce__(self) -> tuple[Any, tuple[bool, str, str, str]]:
+        # 復元時も共有オブジェクトを使用する
+        return LibraryDescriptor.intern, (self.enable, self.library_name, self.relative_path, self.language)
+
+
+# {(enable, library_name, relative_path, language): LibraryDescriptor}
+_library_descriptors: dict[tuple[bool, str, str, str], LibraryDescriptor] = {}
+
+
+def clear_library_descriptor_cache() -> None:
+    """LibraryDescriptor.intern()で登録した共有オブジェクトを破棄する
+
+    Note:
+        - 設定を読み込み直す常駐プロセスで、変更前の設定の共有オブジェクトが残り続けないように呼び出す
+        - 破棄後に生成したLibraryCodeは、既存のLibraryCodeと共有オブジェクトを共有しない (値による比較は変わらない)
+    """
+    _library_descriptors.clear()
+
+
 class LibraryCode:
     """ライブラリコードのメタ情報を管理するクラス.
 
+    大量のコードブロックを保持するため、__slots__でインスタンス辞書を持たず、
+    ライブラリの情報は共有のLibraryDescriptorを参照し、コード行は1つの文字列として保持します。
+    コード行のリストは、スニペットjsonに書き込む際などにcode_linesで分割して取得します。
+
     Attributes:
+        library (LibraryDescriptor): ライブラリの情報 (同じライブラリのコードで共有)
         snippet_key (str): スニペットキー
         snippet_prefix (str): スニペットプレフィックス
         description (str): スニペット説明
-        code_lines (list[str]): コード行のリスト
+        body (str): 各行の末尾に改行を付けて連結したコード
     """
 
-    enable: bool
-    library_name: str
-    relative_path: str
-    language: str
+    __slots__ = ("library", "snippet_key", "snippet_prefix", "description", "body")
+
+    library: LibraryDescriptor
     snippet_key: str
     snippet_prefix: str
     description: str
-    code_lines: list[str]
+    body: str
+
+    def __init__(
+        self,
+        enable: bool,
+        library_name: str,
+        relative_path: str,
+        language: str,
+        snippet_key: str,
+        snippet_prefix: str,
+        description: str,
+        code_lines: list[str],
+    ) -> None:
+        """ライブラリの情報とスニペット情報からLibraryCodeオブジェクトを生成する.
+
+        Args:
+            enable (bool): ライブラリの有効/無効フラグ
+            library_name (str): ライブラリ名
+            relative_path (str): ライブラリコードの相対パス
+            language (str): 言語名
+            snippet_key (str): スニペットキー
+            snippet_prefix (str): スニペットプレフィックス
+            description (str): スニペット説明
+            code_lines (list[str]): コード行のリスト
+        """
+        self.library = LibraryDescriptor.intern(enable, library_name, relative_path, language)
+        self.snippet_key = snippet_key
+        self.snippet_prefix = snippet_prefix
+        self.description = description
+        self.body = join_code_lines(code_lines)
+
+    @property
+    def enable(self) -> bool:
+        """ライブラリの有効/無効フラグ."""
+        return self.library.enable
+
+    @property
+    def library_name(self) -> str:
+        """ライブラリ名."""
+        return self.library.library_name
+
+    @property
+    def relative_path(self) -> str:
+        """ライブラリコードの相対パス."""
+        return self.library.relative_path
+
+    @property
+    def language(self) -> str:
+        """言語名."""
+        return self.library.language
+
+    @property
+    def code_lines(self) -> list[str]:
+        """コード行のリスト (参照するたびにbodyを分割して生成)."""
+        return split_code_body(self.body)
+
+    def __eq__(self, other: object) -> bool:
+        """ライブラリの情報、スニペット情報、コードがすべて等しい場合にTrue."""
+        if not isinstance(other, LibraryCode):
+            return NotImplemented
+        return (
+            self.library == other.library
+            and self.snippet_key == other.snippet_key
+            and self.snippet_prefix == other.snippet_prefix
+            and self.description == other.description
+            and self.body == other.body
+        )
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        """生成時の引数と同じ形式の文字列表現."""
+        return (
+            f"LibraryCode(enable={self.enable!r}, library_name={self.library_name!r}, "
+            f"relative_path={self.relative_path!r}, language={self.language!r}, "
+            f"snippet_key={self.snippet_key!r}, snippet_prefix={self.snippet_prefix!r}, "
+            f"description={self.description!r}, code_lines={self.code_lines!r})"
+        )
+
+    @classmethod
+    def from_body(
+        cls, library: LibraryDescriptor, snippet_key: str, snippet_prefix: str, description: str, body: str
+    ) -> "LibraryCode":
+        """共有のライブラリの情報と連結済みのコードからLibraryCodeオブジェクトを生成する.
+
+        Args:
+            library (LibraryDescriptor): ライブラリの情報
+            snippet_key (str): スニペットキー
+            snippet_prefix (str): スニペットプレフィックス
+            description (str): スニペット説明
+            body (str): join_code_linesで連結したコード
+
+        Returns:
+            LibraryCode: 生成されたLibraryCodeオブジェクト
+        """
+        lib_code = cls.__new__(cls)
+        lib_code.library = library
+        lib_code.snippet_key = snippet_key
+        lib_code.snippet_prefix = snippet_prefix
+        lib_code.description = description
+        lib_code.body = body
+        return lib_code
+
+    @classmethod
+    def create(
+        cls,
+        setting_data: LibrarySettingData,
+        snippet_key: str,
+        snippet_prefix: str,
+        description: str,
+        code_lines: list[str],
+    ) -> "LibraryCode":
+        """ライブラリ設定データとスニペット情報からLibraryCodeオブジェクトを生成する.
+
+        Args:
+            setting_data (LibrarySettingData): ライブラリ設定データ
+            snippet_key (str): スニペットキー
+            snippet_prefix (str): スニペットプレフィックス
+            description (str): スニペット説明
+            code_lines (list[str]): コード行のリスト
+
+        Returns:
+            LibraryCode: 生成されたLibraryCodeオブジェクト
+        """
+        return cls.from_body(
+            LibraryDescriptor.from_setting_data(setting_data),
+            snippet_key,
+            snippet_prefix,
+            description,
+            join_code_lines(code_lines),
+        )
+
+    @classmethod
+    def purge(cls, setting_data: LibrarySettingData) -> "LibraryCode":
+        """ライブラリの既存スニペットを削除するためのLibraryCodeオブジェクトを生成する.
+
+        スニペットの更新処理は、ライブラリ名ごとに既存のスニペットを削除してから有効なコードのみ追加するため、
+        ファイルを読み込まずにライブラリ名と言語のみを持つ無効なコードを渡すことで、既存のスニペットを削除できます。
+
+        Args:
+            setting_data (LibrarySettingData): 既存スニペットを削除するライブラリの設定データ
+
+        Returns:
+            LibraryCode: enableがFalseで、スニペット情報が空のLibraryCodeオブジェクト
+        """
+        library = LibraryDescriptor.intern(
+            False, setting_data.library_name, setting_data.relative_path, setting_data.language.name
+        )
+        return cls.from_body(library, "", "", "", "")
 
     @classmethod
     def from_lines(cls, lib_code_lines: list[str], setting_data: LibrarySettingData) -> "LibraryCode":
@@ -161,34 +544,23 @@ class LibraryCode:
             - 内部でextract_snippet_info()を呼び出して情報を抽出します
         """
 
-        def replace(src: str, rep: str) -> str:
-            return src.replace(rep, "").replace("#", "").strip()
-
         def extract_snippet_info() -> tuple[str, str, str, list[str]]:
             rule = setting_data.rule
+            matcher = rule.matcher
             snippet_key, snippet_prefix, description = "", "", ""
             code_lines = []
 
             for line in lib_code_lines:
-                if rule.lib_desc_prefix_snippet_key in line:
-                    snippet_key = replace(line, rule.lib_desc_prefix_snippet_key)
-                elif rule.lib_desc_prefix_snippet_prefix in line:
-                    snippet_prefix = replace(line, rule.lib_desc_prefix_snippet_prefix)
-                elif rule.lib_desc_prefix_description in line:
-                    description = replace(line, rule.lib_desc_prefix_description)
+                flags = matcher.classify(line)
+                if flags & matcher.SNIPPET_KEY:
+                    snippet_key = extract_prefix_value(line, rule.lib_desc_prefix_snippet_key)
+                elif flags & matcher.SNIPPET_PREFIX:
+                    snippet_prefix = extract_prefix_value(line, rule.lib_desc_prefix_snippet_prefix)
+                elif flags & matcher.DESCRIPTION:
+                    description = extract_prefix_value(line, rule.lib_desc_prefix_description)
                 else:
                     code_lines.append(line)
             return snippet_key, snippet_prefix, description, code_lines
 
         snippet_key, snippet_prefix, description, code_lines = extract_snippet_info()
-
-        return cls(
-            enable=setting_data.enable,
-            library_name=setting_data.library_name,
-            relative_path=setting_data.relative_path,
-            language=setting_data.language.name,
-            snippet_key=snippet_key,
-            snippet_prefix=snippet_prefix,
-            description=description,
-            code_lines=code_lines,
-        )
+        return cls.create(setting_data, snippet_key, snippet_prefix, description, code_lines)
@@ -0,0 +1,133 @@
+"""gitのインデックスからライブラリコードファイルを列挙するモジュール."""
+
+import os
+import subprocess
+from dataclasses import dataclass
+from logging import getLogger
+from pathlib import Path
+from typing import Iterator
+from typing import Optional
+
+from snippet.src.common.file_helper import find_repo_root
+from snippet.src.lib_loader.dataclass import LanguageData
+
+logger = getLogger("snippet").getChild("lib_loader")
+
+FILE_DISCOVERY_WALK = "walk"
+FILE_DISCOVERY_GIT = "git"
+
+# git ls-filesの応答を待つ最大時間[秒]
+GIT_LS_FILES_TIMEOUT = 60
+
+
+@dataclass
+class FileDiscoveryData:
+    """ライブラリコードファイルの探索方法の設定を管理するクラス.
+
+    Attributes:
+        method (str): 探索方法 ("walk": ディレクトリを走査する, "git": gitのインデックスから列挙する)
+        include_untracked (bool): gitで探索する場合に、.gitignoreで除外されていない未追跡ファイルも含めるか
+    """
+
+    method: str = FILE_DISCOVERY_WALK
+    include_untracked: bool = False
+
+    @classmethod
+    def from_setting(cls, tool_setting: dict) -> "FileDiscoveryData":
+        """ツール設定辞書からFileDiscoveryDataオブジェクトを生成する
+
+        Args:
+            tool_setting (dict): ツール設定辞書
+
+        Returns:
+            FileDiscoveryData: 生成されたFileDiscoveryDataオブジェクト
+        """
+        method = tool_setting.get("file_discovery", FILE_DISCOVERY_WALK)
+        if method not in (FILE_DISCOVERY_WALK, FILE_DISCOVERY_GIT):
+            logger.warning(f"Unknown file discovery method `{method}`, use `{FILE_DISCOVERY_WALK}` instead")
+            method = FILE_DISCOVERY_WALK
+        return cls(method=method, include_untracked=tool_setting.get("git_include_untracked", False))
+
+
+def list_git_files(lib_dirpath: str, include_untracked: bool = False) -> Optional[list[str]]:
+    """`git ls-files -z`でライブラリディレクトリ配下のファイルを列挙する.
+
+    Args:
+        lib_dirpath (str): ライブラリディレクトリのパス
+        include_untracked (bool): .gitignoreで除外されていない未追跡ファイルも含めるか
+
+    Returns:
+        Optional[list[str]]: ライブラリディレクトリからの相対パス ("/"区切り) のリスト (順不同、重複なし)。
+            ディレクトリがgitリポジトリ内にない、またはgitコマンドを実行できない場合はNone
+
+    Note:
+        - 未追跡ファイルを含めない場合は、サブモジュール内の追跡ファイルも列挙します
+        - インデックスに登録されていれば、作業ツリーから削除されたファイルも含まれます
+    """
+    if not os.path.isdir(lib_dirpath) or find_repo_root(Path(lib_dirpath)) is None:
+        return None
+
+    command = ["git", "-C", lib_dirpath, "ls-files", "-z", "--cached"]
+    if include_untracked:
+        command += ["--others", "--exclude-standard"]
+    else:
+        # --recurse-submodulesは--othersと併用できない
+        command.append("--recurse-submodules")
+
+    try:
+        completed = subprocess.run(
+            command, capture_output=True, stdin=subprocess.DEVNULL, timeout=GIT_LS_FILES_TIMEOUT, check=False
+        )
+    except (OSError, subprocess.SubprocessError) as e:
+        logger.debug(f"Failed to run git ls-files ({e}) -> {lib_dirpath}")
+        return None
+    if completed.returncode != 0:
+        stderr = os.fsdecode(completed.stderr).strip()
+        logger.debug(f"git ls-files exited with {completed.returncode} ({stderr}) -> {lib_dirpath}")
+        return None
+
+    # 競合中のファイルはステージごとに出力されるため、重複を除く
+    return list({os.fsdecode(path) for path in completed.stdout.split(b"\0") if path})
+
+
+def get_git_code_path(
+    lib_dirpath: str, lang_data: LanguageData, include_untracked: bool = False
+) -> Optional[Iterator[str]]:
+    """`git ls-files`で列挙したファイルから条件に合致するコードファイルのパスを取得する.
+
+    get_library_code_pathと同じ拡張子フィルタ、除外フィルタ、"."で始まるファイル・ディレクトリの除外を適用し、
+    ディレクトリを名前順に深さ優先で走査した場合と同じ順序で返します。
+
+    Args:
+        lib_dirpath (str): ライブラリディレクトリのパス
+        lang_data (LanguageData): 言語設定データ
+        include_untracked (bool): .gitignoreで除外されていない未追跡ファイルも含めるか
+
+    Returns:
+        Optional[Iterator[str]]: フィルタリング後のコードファイルパスのイテレータ。
+            ディレクトリがgitリポジトリ内にない、またはgitコマンドを実行できない場合はNone
+    """
+    git_files = list_git_files(lib_dirpath, include_untracked)
+    if git_files is None:
+        return None
+
+    extensions = frozenset(lang_data.extensions)
+    excludes = tuple(lang_data.excludes)
+    code_path_parts = []
+    for git_file in git_files:
+        parts = git_file.split("/")
+        if os.path.splitext(parts[-1])[-1] in extensions and not any(part.startswith(".") for part in parts):
+            code_path_parts.append(parts)
+
+    def iter_code_path() -> Iterator[str]:
+        # パスの要素ごとに比較すると、ディレクトリを名前順に走査した場合と同じ順序になる
+        for parts in sorted(code_path_parts):
+            code_path = os.path.join(lib_dirpath, *parts)
+            # 祖先ディレクトリのパスはファイルパスの先頭部分のため、除外フィルタはファイルパスのみ判定すればよい
+            if any(exclude in code_path for exclude in excludes):
+                continue
+            # インデックスに登録されたまま削除されたファイルや、サブモジュール自体のエントリを除く
+            if os.path.isfile(code_path):
+                yield code_path
+
+    return iter_code_path()
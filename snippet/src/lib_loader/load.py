@@ -1,60 +1,215 @@
 import os
-from glob import glob
+from concurrent.futures import Executor
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
 from logging import getLogger
 from pathlib import Path
+from typing import Iterable
+from typing import Iterator
 from typing import Optional
 
-from snippet.src.common.file_helper import read_text
-from snippet.src.lib_loader.check import check_library_code_block
-from snippet.src.lib_loader.check import check_library_code_prefix
+from snippet.src.common.file_helper import read_marker_lines
+from snippet.src.common.metrics import Metrics
+from snippet.src.common.metrics import count_metrics
+from snippet.src.common.metrics import measure_stage
+from snippet.src.lib_loader.cache import ScanCache
 from snippet.src.lib_loader.dataclass import LanguageData
 from snippet.src.lib_loader.dataclass import LibraryCode
+from snippet.src.lib_loader.dataclass import LibraryRuleData
+from snippet.src.lib_loader.dataclass import LibraryRuleMatcher
 from snippet.src.lib_loader.dataclass import LibrarySettingData
+from snippet.src.lib_loader.dataclass import extract_prefix_value
+from snippet.src.lib_loader.discovery import FILE_DISCOVERY_GIT
+from snippet.src.lib_loader.discovery import FILE_DISCOVERY_WALK
+from snippet.src.lib_loader.discovery import FileDiscoveryData
+from snippet.src.lib_loader.discovery import get_git_code_path
 
 logger = getLogger("snippet").getChild("lib_loader")
 
+EXECUTOR_PROCESS = "process"
+EXECUTOR_THREAD = "thread"
 
-def get_library_code_path(lib_dirpath: str, lang_data: LanguageData) -> list[str]:
+
+def get_library_code_path(
+    lib_dirpath: str, lang_data: LanguageData, discovery: Optional[FileDiscoveryData] = None
+) -> Iterator[str]:
     """ライブラリディレクトリから条件に合致するコードファイルのパスを取得する.
 
-    指定されたディレクトリを再帰的に探索し、拡張子フィルタと除外フィルタを
-    適用してライブラリコードファイルのパスリストを返します。
+    指定されたディレクトリをos.scandirで再帰的に探索し、拡張子フィルタと除外フィルタを
+    適用したライブラリコードファイルのパスを逐次返します。
+    探索方法に"git"を指定した場合は、ディレクトリを走査せずに`git ls-files`で列挙したファイルに
+    同じフィルタを適用します。
 
     Args:
         lib_dirpath (str): ライブラリディレクトリのパス
         lang_data (LanguageData): 言語設定データ
             - extensions: 対象とする拡張子のリスト (ex: [".py", ".cpp"])
             - excludes: 除外する文字列のリスト (ex: ["__pycache__", "_old"])
+        discovery (Optional[FileDiscoveryData]): ファイルの探索方法。Noneの場合はディレクトリを走査する
 
-    Returns:
-        list[str]: フィルタリング後のコードファイルパスのリスト
+    Yields:
+        str: フィルタリング後のコードファイルパス
 
     Note:
         - ファイルパスに excludes の文字列が含まれる場合は除外されます
+        - excludes の文字列を含むディレクトリは、配下を探索せずに除外されます
         - 拡張子が extensions に含まれないファイルは除外されます
+        - "."で始まるファイル・ディレクトリは除外されます (globの"**"と同じ挙動)
+        - 同一ディレクトリ内は名前順に探索するため、結果の順序は実行環境によらず一定です
+        - gitで探索する場合も結果の順序は同じですが、.gitignoreで除外されたファイルと
+          (include_untrackedがFalseの場合は) 未追跡のファイルは含まれません
+        - gitリポジトリ外のディレクトリや、gitコマンドを実行できない場合はディレクトリを走査します
     """
+    extensions = frozenset(lang_data.extensions)
+    excludes = tuple(lang_data.excludes)
 
-    def check_ignore(input_path: str, extensions: list[str], excludes: list[str]) -> bool:
-        if os.path.splitext(input_path)[-1] not in extensions:
-            return True
-        for exclude in excludes:
-            if exclude in input_path:
-                return True
-        return False
-
-    code_path_list = [
-        curr_path
-        for curr_path in glob(os.path.join(lib_dirpath, "**"), recursive=True)
-        if not check_ignore(curr_path, lang_data.extensions, lang_data.excludes)
-    ]
-    return code_path_list
+    def is_excluded(input_path: str) -> bool:
+        return any(exclude in input_path for exclude in excludes)
+
+    def walk(dirpath: str) -> Iterator[str]:
+        try:
+            with os.scandir(dirpath) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except OSError:
+            return
+
+        for entry in entries:
+            if entry.name.startswith(".") or is_excluded(entry.path):
+                continue
+            if entry.is_dir():
+                yield from walk(entry.path)
+            elif os.path.splitext(entry.name)[-1] in extensions:
+                yield entry.path
+
+    if discovery is not None and discovery.method == FILE_DISCOVERY_GIT:
+        git_code_paths = get_git_code_path(lib_dirpath, lang_data, discovery.include_untracked)
+        if git_code_paths is not None:
+            return git_code_paths
+        logger.debug(f"Not in a git repository, use `{FILE_DISCOVERY_WALK}` instead -> {lib_dirpath}")
+
+    return walk(lib_dirpath)
+
+
+class CodeBlockPlacementError(ValueError):
+    """ライブラリコードブロックの開始・終了マークの配置が不正な場合に送出される例外"""
+
+
+class _LibraryCodeBlockBuilder:
+    """走査中のライブラリコードブロックの内容を蓄積するクラス.
+
+    ブロック内の行を受け取り、必須プレフィックスの出現回数の集計と
+    スニペット情報・コード行の分離を同時に行います。
+    """
+
+    def __init__(self, rule: LibraryRuleData) -> None:
+        self.rule = rule
+        self.prefix_counts = [0, 0, 0]
+        self.snippet_key = ""
+        self.snippet_prefix = ""
+        self.description = ""
+        self.code_lines: list[str] = []
+
+    def add_line(self, line: str, flags: int) -> None:
+        """ブロック内の1行を追加する.
+
+        Args:
+            line (str): ブロック内の行
+            flags (int): LibraryRuleMatcher.classifyで取得した行のフラグ
+        """
+        rule = self.rule
+        has_key = flags & LibraryRuleMatcher.SNIPPET_KEY
+        has_prefix = flags & LibraryRuleMatcher.SNIPPET_PREFIX
+        has_description = flags & LibraryRuleMatcher.DESCRIPTION
+        self.prefix_counts[0] += bool(has_key)
+        self.prefix_counts[1] += bool(has_prefix)
+        self.prefix_counts[2] += bool(has_description)
+
+        if has_key:
+            self.snippet_key = extract_prefix_value(line, rule.lib_desc_prefix_snippet_key)
+        elif has_prefix:
+            self.snippet_prefix = extract_prefix_value(line, rule.lib_desc_prefix_snippet_prefix)
+        elif has_description:
+            self.description = extract_prefix_value(line, rule.lib_desc_prefix_description)
+        else:
+            self.code_lines.append(line)
+
+    def add_code_lines(self, lines: list[str]) -> None:
+        """マーク・プレフィックスを含まないブロック内の行をまとめて追加する.
+
+        Args:
+            lines (list[str]): ブロック内のコード行
+        """
+        self.code_lines.extend(lines)
+
+    def build(self, setting_data: LibrarySettingData) -> Optional[LibraryCode]:
+        """蓄積した内容からLibraryCodeオブジェクトを生成する.
+
+        Args:
+            setting_data (LibrarySettingData): ライブラリ設定データ
+
+        Returns:
+            Optional[LibraryCode]: 生成したLibraryCodeオブジェクト。
+                必須プレフィックスがちょうど1回ずつ含まれていない場合はNone
+        """
+        if self.prefix_counts != [1, 1, 1]:
+            return None
+        return LibraryCode.create(
+            setting_data, self.snippet_key, self.snippet_prefix, self.description, self.code_lines
+        )
+
+
+def iter_library_code(lines: Iterable[str], setting_data: LibrarySettingData) -> Iterator[Optional[LibraryCode]]:
+    """コード行を1回だけ走査してコードブロックを順次抽出する.
+
+    開始・終了マークの配置検証、必須プレフィックスの集計、スニペット情報の抽出を
+    1回の走査で行うステートマシンです。
+    状態を遷移させるのはマークまたはプレフィックスを含む行のみのため、LibraryRuleMatcherで
+    それらの行だけを取得し、間にあるコード行はスライスでまとめてブロックに追加します。
+
+    Args:
+        lines (Iterable[str]): 走査対象のコード行 (各行は改行を含まない)
+        setting_data (LibrarySettingData): ライブラリ設定データ
+
+    Yields:
+        Optional[LibraryCode]: コードブロックごとの抽出結果。必須プレフィックスが不正なブロックはNone
+
+    Raises:
+        CodeBlockPlacementError: 開始・終了マークの配置が不正な場合 (check_library_code_blockと同じ判定)
+    """
+    rule = setting_data.rule
+    matcher = rule.matcher
+    line_list = lines if isinstance(lines, list) else list(lines)
+    block: Optional[_LibraryCodeBlockBuilder] = None
+    # 直前に処理したマーク・プレフィックス行の次の行番号
+    next_index = 0
+
+    for index, flags in matcher.iter_marked_lines(line_list):
+        if flags & matcher.BEGIN:
+            if block is not None:
+                raise CodeBlockPlacementError("nested library code block")
+            block = _LibraryCodeBlockBuilder(rule)
+        elif flags & matcher.END:
+            if block is None:
+                raise CodeBlockPlacementError("library code block end mark without begin mark")
+            block.add_code_lines(line_list[next_index:index])
+            yield block.build(setting_data)
+            block = None
+        elif block is not None:
+            block.add_code_lines(line_list[next_index:index])
+            block.add_line(line_list[index], flags)
+        next_index = index + 1
+
+    if block is not None:
+        raise CodeBlockPlacementError("library code block without end mark")
 
 
 def extract_library_code(code_path: str, setting_data: LibrarySettingData) -> Optional[list[LibraryCode]]:
     """ライブラリコードファイルからコードブロックを抽出する.
 
-    ファイルを読み込み、開始・終了マークで囲まれたコードブロックを抽出します。
-    マーク配置の検証と必須プレフィックスのチェックも行います。
+    ファイルをバイト列のまま開始・終了マークで検索し、マークを含む範囲の行のみデコードして、
+    開始・終了マークで囲まれたコードブロックを抽出します。
+    マーク配置の検証と必須プレフィックスのチェックも同じ走査の中で行います。
 
     Args:
         code_path (str): ライブラリコードファイルのパス
@@ -73,20 +228,38 @@ def extract_library_code(code_path: str, setting_data: LibrarySettingData) -> Op
         - 複数のコードブロックが存在する場合、すべてリストとして返されます
         - マーク配置が不正な場合は警告を出力してNoneを返します
         - 必須プレフィックスが欠けているブロックは警告を出力してスキップされます
+        - プレフィックスの警告は、マーク配置の検証がファイル末尾まで完了してから出力されます
     """
-    lines: list[str] = read_text(Path(code_path))
+    lib_codes, _ = extract_library_code_with_skipped(code_path, setting_data)
+    return lib_codes
 
-    rule = setting_data.rule
-    if not check_library_code_block(lines, rule.lib_code_block_begin, rule.lib_code_block_end):
-        logger.warning(f"Incorrect placement of start and end marks for library code block -> {code_path}")
-        return None
 
-    begin_index_list = [idx for idx, line in enumerate(lines) if rule.lib_code_block_begin in line]
-    end_index_list = [idx for idx, line in enumerate(lines) if rule.lib_code_block_end in line]
+def extract_library_code_with_skipped(
+    code_path: str, setting_data: LibrarySettingData
+) -> tuple[Optional[list[LibraryCode]], int]:
+    """ライブラリコードファイルからコードブロックを抽出し、必須プレフィックスが欠けていたブロック数も返す.
 
-    lib_lines_list = [
-        lines[begin_index + 1 : end_index] for begin_index, end_index in zip(begin_index_list, end_index_list)
-    ]
+    Args:
+        code_path (str): ライブラリコードファイルのパス
+        setting_data (LibrarySettingData): ライブラリ設定データ
+
+    Returns:
+        tuple[Optional[list[LibraryCode]], int]: (extract_library_codeと同じ抽出結果, スキップしたブロック数)
+
+    Note:
+        - スキップしたブロックがあるファイルは、警告を毎回出力するために走査結果をキャッシュしません
+    """
+    rule = setting_data.rule
+    # 開始・終了マークを含まないファイルはデコードしない (終了マークのみのファイルも配置の検証が必要)
+    lines = read_marker_lines(Path(code_path), (rule.lib_code_block_begin, rule.lib_code_block_end))
+    if lines is None:
+        return [], 0
+
+    try:
+        lib_code_results = list(iter_library_code(lines, setting_data))
+    except CodeBlockPlacementError:
+        logger.warning(f"Incorrect placement of start and end marks for library code block -> {code_path}")
+        return None, 0
 
     prefix_list = [
         rule.lib_desc_prefix_snippet_key,
@@ -94,18 +267,69 @@ def extract_library_code(code_path: str, setting_data: LibrarySettingData) -> Op
         rule.lib_desc_prefix_description,
     ]
 
-    def enable_code_list(lines: list[str]) -> bool:
-        if not check_library_code_prefix(lines, prefix_list):
+    lib_codes: list[LibraryCode] = []
+    skipped_count = 0
+    for lib_code in lib_code_results:
+        if lib_code is None:
             logger.warning(f"Missing required prefix ({prefix_list}) in library code block -> {code_path}")
-            return False
-        return True
+            skipped_count += 1
+        else:
+            lib_codes.append(lib_code)
+    return lib_codes, skipped_count
 
-    lib_lines_list = [lines for lines in lib_lines_list if enable_code_list(lines)]
-    lib_codes = [LibraryCode.from_lines(lines, setting_data) for lines in lib_lines_list]
-    return lib_codes
 
+def create_library_executor(max_workers: int, executor_type: str = EXECUTOR_PROCESS) -> Optional[Executor]:
+    """コードブロック抽出を並列実行するためのExecutorを生成する.
 
-def load_library_code(lib_name: str, lib_setting: dict) -> list[LibraryCode]:
+    Args:
+        max_workers (int): ワーカー数。0の場合はCPU数、1の場合は並列実行しない
+        executor_type (str): Executorの種類 ("process" or "thread")
+
+    Returns:
+        Optional[Executor]: 生成したExecutor。並列実行しない場合はNone
+    """
+    if max_workers == 0:
+        max_workers = os.cpu_count() or 1
+    if max_workers <= 1:
+        return None
+
+    if executor_type == EXECUTOR_THREAD:
+        return ThreadPoolExecutor(max_workers=max_workers)
+    if executor_type != EXECUTOR_PROCESS:
+        logger.warning(f"Unknown executor type `{executor_type}`, use `{EXECUTOR_PROCESS}` instead")
+    return ProcessPoolExecutor(max_workers=max_workers)
+
+
+def extract_library_code_list(
+    code_path_list: list[str], setting_data: LibrarySettingData, executor: Optional[Executor] = None
+) -> Iterable[tuple[Optional[list[LibraryCode]], int]]:
+    """複数のライブラリコードファイルからコードブロックを抽出する.
+
+    Args:
+        code_path_list (list[str]): ライブラリコードファイルのパスのリスト
+        setting_data (LibrarySettingData): ライブラリ設定データ
+        executor (Optional[Executor]): 並列実行に使用するExecutor。Noneの場合は逐次実行する
+
+    Returns:
+        Iterable[tuple[Optional[list[LibraryCode]], int]]: ファイルごとの抽出結果と、
+            必須プレフィックスが欠けていたブロック数 (code_path_listと同じ順序)
+    """
+    if executor is None:
+        return map(extract_library_code_with_skipped, code_path_list, repeat(setting_data))
+
+    # プロセス間通信のオーバーヘッドを抑えるため、ある程度まとめてワーカーに渡す
+    chunksize = max(1, len(code_path_list) // ((os.cpu_count() or 1) * 4))
+    return executor.map(extract_library_code_with_skipped, code_path_list, repeat(setting_data), chunksize=chunksize)
+
+
+def load_library_code(
+    lib_name: str,
+    lib_setting: dict,
+    scan_cache: Optional[ScanCache] = None,
+    executor: Optional[Executor] = None,
+    metrics: Optional[Metrics] = None,
+    discovery: Optional[FileDiscoveryData] = None,
+) -> list[LibraryCode]:
     """単一ライブラリの設定からコードブロックを読み込む.
 
     ライブラリディレクトリをスキャンし、条件に合致するファイルから
@@ -119,30 +343,73 @@ def load_library_code(lib_name: str, lib_setting: dict) -> list[LibraryCode]:
             - language: 言語設定（name, extensions, excludes）
             - library_code_block: コードブロックマーク設定
             - library_description_prefix: プレフィックス設定
+        scan_cache (Optional[ScanCache]): 走査結果のキャッシュ。Noneの場合はすべてのファイルを読み込む
+        executor (Optional[Executor]): コードブロック抽出に使用するExecutor。Noneの場合は逐次実行する
+        metrics (Optional[Metrics]): 処理時間とカウンタの記録先。Noneの場合は計測しない
+        discovery (Optional[FileDiscoveryData]): ファイルの探索方法。Noneの場合はディレクトリを走査する
 
     Returns:
-        list[LibraryCode]: 抽出されたライブラリコードのリスト
+        list[LibraryCode]: 抽出されたライブラリコードのリスト (無効なライブラリの場合は削除用のコード1つ)
 
     Note:
         - 設定辞書からLibrarySettingDataオブジェクトを生成して処理します
         - 各ファイルに対してextract_library_code()を呼び出します
+        - scan_cacheが指定された場合、キャッシュに存在しない、または変更されたファイルのみ抽出します
+        - 必須プレフィックスが欠けたブロックを含むファイルはキャッシュしないため、毎回警告が出力されます
+        - executorで並列実行した場合も、コードブロックの順序はファイルの探索順で固定されます
         - relative_pathのJinja2テンプレートは、read_setting_yaml()で既に展開されています
+        - 無効なライブラリはファイルを走査せず、既存スニペットを削除するためのLibraryCode.purge()のみ返します
     """
     setting_data = LibrarySettingData.from_setting(lib_name, lib_setting)
+    if not setting_data.enable:
+        # 無効なライブラリはファイルを走査せず、既存スニペットの削除のみ行う
+        count_metrics(metrics, "discover", "libraries_skipped")
+        return [LibraryCode.purge(setting_data)]
 
     # relative_pathは既にread_setting_yaml()でテンプレート展開済み
-    lib_code_path_list = get_library_code_path(setting_data.relative_path, setting_data.language)
-
-    lib_code_list: list[LibraryCode] = []
-    for lib_code_path in lib_code_path_list:
-        lib_code = extract_library_code(lib_code_path, setting_data)
-        if lib_code:
-            lib_code_list.extend(lib_code)
+    with measure_stage(metrics, "discover"):
+        lib_code_path_list = list(get_library_code_path(setting_data.relative_path, setting_data.language, discovery))
+    count_metrics(metrics, "discover", "files_scanned", len(lib_code_path_list))
+
+    with measure_stage(metrics, "extract"):
+        # キャッシュに存在しないファイルのみ抽出対象とする
+        lib_code_results: list[Optional[list[LibraryCode]]] = []
+        extract_path_list: list[str] = []
+        for lib_code_path in lib_code_path_list:
+            lib_code = scan_cache.get(setting_data, lib_code_path) if scan_cache is not None else None
+            lib_code_results.append(lib_code)
+            if lib_code is None:
+                extract_path_list.append(lib_code_path)
+
+        extracted_lib_codes = iter(extract_library_code_list(extract_path_list, setting_data, executor))
+
+        lib_code_list: list[LibraryCode] = []
+        for lib_code_path, lib_code in zip(lib_code_path_list, lib_code_results):
+            if lib_code is None:
+                lib_code, skipped_count = next(extracted_lib_codes)
+                # 警告が出たファイル (マーク配置の不正、ブロックのスキップ) は、次回も警告を出力するためキャッシュしない
+                if scan_cache is not None and lib_code is not None and skipped_count == 0:
+                    scan_cache.put(setting_data, lib_code_path, lib_code)
+            if lib_code:
+                lib_code_list.extend(lib_code)
+
+    if metrics is not None:
+        metrics.count("extract", "files_read", len(extract_path_list))
+        metrics.count("extract", "cache_hits", len(lib_code_path_list) - len(extract_path_list))
+        metrics.count("extract", "bytes_read", sum(os.path.getsize(path) for path in extract_path_list))
+        metrics.count("extract", "blocks_extracted", len(lib_code_list))
 
     return lib_code_list
 
 
-def load_library(library_settings: dict) -> list[LibraryCode]:
+def load_library(
+    library_settings: dict,
+    scan_cache: Optional[ScanCache] = None,
+    max_workers: int = 1,
+    executor_type: str = EXECUTOR_PROCESS,
+    metrics: Optional[Metrics] = None,
+    discovery: Optional[FileDiscoveryData] = None,
+) -> list[LibraryCode]:
     """複数のライブラリ設定からコードブロックを一括読み込みする.
 
     設定ファイルから読み込んだすべてのライブラリに対して、
@@ -152,20 +419,34 @@ def load_library(library_settings: dict) -> list[LibraryCode]:
         library_settings (dict): ライブラリ設定辞書
             キー: ライブラリ名
             値: ライブラリ設定辞書（load_library_code関数の引数参照）
+        scan_cache (Optional[ScanCache]): 走査結果のキャッシュ。Noneの場合はすべてのファイルを読み込む
+        max_workers (int): コードブロック抽出のワーカー数。0の場合はCPU数、1の場合は並列実行しない
+        executor_type (str): 並列実行に使用するExecutorの種類 ("process" or "thread")
+        metrics (Optional[Metrics]): 処理時間とカウンタの記録先。Noneの場合は計測しない
+        discovery (Optional[FileDiscoveryData]): ファイルの探索方法。Noneの場合はディレクトリを走査する
 
     Returns:
         list[LibraryCode]: 抽出されたすべてのライブラリコードのリスト
 
     Note:
         - 各ライブラリは個別に処理されます
+        - 並列実行した場合も、結果の順序は逐次実行と同じになります
         - エラーが発生したライブラリはスキップされ、次のライブラリの処理が継続されます
     """
     lib_codes: list[LibraryCode] = []
-
-    for lib_name, lib_setting in library_settings.items():
-        logger.debug(f"Loading library: {lib_name}")
-        curr_lib_codes = load_library_code(lib_name, lib_setting)
-        lib_codes.extend(curr_lib_codes)
-        logger.debug(f"Loaded {len(curr_lib_codes)} code blocks from {lib_name}")
+    executor = create_library_executor(max_workers, executor_type)
+
+    try:
+        for lib_name, lib_setting in library_settings.items():
+            logger.debug(f"Loading library: {lib_name}")
+            curr_lib_codes = load_library_code(lib_name, lib_setting, scan_cache, executor, metrics, discovery)
+            lib_codes.extend(curr_lib_codes)
+            if all(code.enable for code in curr_lib_codes):
+                logger.debug(f"Loaded {len(curr_lib_codes)} code blocks from {lib_name}")
+            else:
+                logger.debug(f"Skipped disabled library: {lib_name}")
+    finally:
+        if executor is not None:
+            executor.shutdown()
 
     return lib_codes
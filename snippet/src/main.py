@@ -1,4 +1,4 @@
-import shutil
+import sys
 from logging import DEBUG
 from logging import Formatter
 from logging import StreamHandler
@@ -9,46 +9,29 @@ from snippet.setting import TEMPLATE_SETTING_PATH
 from snippet.setting import WORKSPACE_DIRPATH
 from snippet.src.core.argument import get_argument
 from snippet.src.core.mode import Mode
-from snippet.src.io import read_setting
-from snippet.src.lib_loader.load import load_library
-from snippet.src.update_snippet.backup import backup_snippet_files
-from snippet.src.update_snippet.update import update_snippet
 
 logger = getLogger("snippet")
-handler = StreamHandler()
-logger.setLevel(DEBUG)
-handler.setLevel(DEBUG)
-formatter = Formatter("[%(asctime)s][%(name)s][%(levelname)s] %(message)s")
-handler.setFormatter(formatter)
-logger.addHandler(handler)
-
-
-def resist_snippet() -> None:
-    """スニペットへの登録処理"""
-    setting_data = read_setting.read_setting_yaml()
-    if not setting_data:
-        logger.error("設定ファイルの読み込みに失敗しました。設定ファイルの内容を確認してください。")
-        return
-
-    device_name = read_setting.select_device_interactive(setting_data)
-    if not device_name:
-        logger.error("デバイスの選択に失敗しました。設定ファイルのdevices項目を確認してください。")
-        return
 
-    logger.info(f"choose device: {device_name}")
+LOG_HANDLER_NAME = "snippet_console"
 
-    tool_setting = setting_data["tool_config"]
-    device_setting = setting_data["devices"][device_name]
-    library_settings = setting_data.get("libraries", [])
 
-    lib_codes = load_library(library_settings)
-
-    backup_snippet_files(tool_setting, device_setting)
-    update_snippet(device_setting, lib_codes)
+def setup_logger() -> None:
+    """snippetロガーにコンソール出力のハンドラを設定する (複数回呼び出しても1つのみ設定する)"""
+    if any(handler.get_name() == LOG_HANDLER_NAME for handler in logger.handlers):
+        return
+    handler = StreamHandler()
+    handler.set_name(LOG_HANDLER_NAME)
+    logger.setLevel(DEBUG)
+    handler.setLevel(DEBUG)
+    formatter = Formatter("[%(asctime)s][%(name)s][%(levelname)s] %(message)s")
+    handler.setFormatter(formatter)
+    logger.addHandler(handler)
 
 
 def prepare_setting_file() -> None:
     """カレントパスに設定ファイルを用意(コピー)する"""
+    import shutil
+
     if not SETTING_PATH.exists():
         WORKSPACE_DIRPATH.mkdir(exist_ok=True)
         shutil.copy2(TEMPLATE_SETTING_PATH, SETTING_PATH)
@@ -62,19 +45,44 @@ def display_usage() -> None:
         ""
         "[usage]\n"
         "python -m snippet setting    # 設定ファイルのテンプレートを生成\n"
-        "python -m snippet register   # スニペットを登録"
+        "python -m snippet register   # スニペットを登録\n"
+        "python -m snippet register --profile  # スニペットを登録し、段階ごとの処理時間を出力\n"
+        "python -m snippet register --device NAME  # 指定したデバイスにスニペットを登録\n"
+        "python -m snippet watch      # ライブラリの変更を監視し、スニペットを自動で再登録\n"
+        "python -m snippet daemon     # 設定とライブラリコードを保持するデーモンを起動\n"
+        "python -m snippet client [register|status|stop]  # デーモンにリクエストを送信"
     )
     print(usage)
 
 
 def main() -> None:
-    """メイン処理"""
+    """メイン処理
+
+    Note:
+        - 起動を軽くするため、各モードの処理モジュール (yaml, jinja2等に依存) は実行するモードのみインポートします
+    """
+    setup_logger()
     args = get_argument()
 
     match args.mode:
         case Mode.SETTING:
             prepare_setting_file()
         case Mode.REGISTER:
-            resist_snippet()
+            from snippet.src.command.register import resist_snippet
+
+            if not resist_snippet(args.profile, args.device):
+                sys.exit(1)
+        case Mode.WATCH:
+            from snippet.src.command.watch import watch_snippet
+
+            watch_snippet(args.device)
+        case Mode.DAEMON:
+            from snippet.src.command.daemon import run_daemon
+
+            run_daemon(args.device)
+        case Mode.CLIENT:
+            from snippet.src.daemon.client import run_client
+
+            sys.exit(run_client(args.command))
         case _:
             display_usage()
@@ -1,33 +1,278 @@
 """スニペットファイルのバックアップを管理するモジュール."""
 
+import os
 import shutil
+from datetime import datetime
+from logging import getLogger
 from pathlib import Path
+from typing import Iterable
+from typing import Optional
 
 from snippet.setting import WORKSPACE_DIRPATH
 
+logger = getLogger("snippet").getChild("backup")
+
+BACKUP_MODE_FULL = "full"
+BACKUP_MODE_INCREMENTAL = "incremental"
+BACKUP_MODE_GENERATION = "generation"
+BACKUP_MODE_NONE = "none"
+
+DEFAULT_BACKUP_GENERATIONS = 5
+GENERATION_DIRNAME_FORMAT = "%Y%m%d-%H%M%S-%f"
 
-def backup_snippet_files(tool_setting: dict, device_setting: dict) -> None:
-    """スニペットファイルをバックアップディレクトリにコピーする.
 
-    既存のバックアップディレクトリがあれば削除してから、
-    デバイス設定で指定されたスニペットディレクトリ全体をバックアップします。
+def get_backup_target_snippet_dirs(device_setting: dict) -> dict[str, Path]:
+    """バックアップ対象のスニペットディレクトリを取得する.
 
     Args:
-        tool_setting (dict): ツール設定辞書
-            - backup_snippet_dirpath: バックアップディレクトリの相対パス
         device_setting (dict): デバイス設定辞書
             - snippet_path: スニペットパスの辞書 {エディタ名: スニペットディレクトリパス}
+
+    Returns:
+        dict[str, Path]: {エディタ名: スニペットディレクトリパス}
     """
-    backup_dirpath = WORKSPACE_DIRPATH / Path(tool_setting["backup_snippet_dirpath"])
+    # "none"または空の場合はスキップ(使用していないエディタの設定)
+    return {
+        snippet_name: Path(snippet_path)
+        for snippet_name, snippet_path in device_setting["snippet_path"].items()
+        if snippet_path not in ("none", "", None)
+    }
+
+
+def list_snippet_files(snippet_dirpath: Path, target_filenames: Optional[set[str]] = None) -> list[Path]:
+    """バックアップ対象のスニペットファイルを列挙する.
+
+    Args:
+        snippet_dirpath (Path): スニペットディレクトリパス
+        target_filenames (Optional[set[str]]): 対象のファイル名 (ex: {"python.json"})。
+            Noneの場合はディレクトリ配下のすべてのファイル
+
+    Returns:
+        list[Path]: スニペットディレクトリからの相対パスのリスト
+    """
+    if target_filenames is not None:
+        return [Path(filename) for filename in sorted(target_filenames) if (snippet_dirpath / filename).is_file()]
+    return sorted(path.relative_to(snippet_dirpath) for path in snippet_dirpath.rglob("*") if path.is_file())
+
+
+def is_same_file_stat(src_path: Path, dst_path: Path) -> bool:
+    """2つのファイルのサイズと更新時刻が一致するかを判定する.
+
+    バックアップはshutil.copy2で更新時刻を保持してコピーするため、
+    サイズと更新時刻が一致すれば内容も変化していないとみなします。
+
+    Args:
+        src_path (Path): 比較元のファイルパス
+        dst_path (Path): 比較先のファイルパス
+
+    Returns:
+        bool: サイズと更新時刻が一致する場合True
+    """
+    try:
+        src_stat = src_path.stat()
+        dst_stat = dst_path.stat()
+    except OSError:
+        return False
+    return src_stat.st_size == dst_stat.st_size and src_stat.st_mtime_ns == dst_stat.st_mtime_ns
 
+
+def backup_full(backup_dirpath: Path, snippet_dirs: dict[str, Path], target_filenames: Optional[set[str]]) -> None:
+    """既存のバックアップを削除してから、スニペットファイルをすべてコピーする.
+
+    Args:
+        backup_dirpath (Path): バックアップディレクトリパス
+        snippet_dirs (dict[str, Path]): {エディタ名: スニペットディレクトリパス}
+        target_filenames (Optional[set[str]]): 対象のファイル名。Noneの場合はディレクトリ全体
+    """
     if backup_dirpath.exists():
         shutil.rmtree(backup_dirpath)
 
     backup_dirpath.mkdir(parents=True, exist_ok=True)
 
-    for snippet_name, snippet_path in device_setting["snippet_path"].items():
-        # "none"または空の場合はスキップ(使用していないエディタの設定)
-        if snippet_path in ("none", "", None):
+    for snippet_name, snippet_dirpath in snippet_dirs.items():
+        backup_snippet_path = backup_dirpath / Path(snippet_name)
+        if target_filenames is None:
+            shutil.copytree(snippet_dirpath, backup_snippet_path)
+            continue
+
+        backup_snippet_path.mkdir(parents=True, exist_ok=True)
+        for relative_path in list_snippet_files(snippet_dirpath, target_filenames):
+            shutil.copy2(snippet_dirpath / relative_path, backup_snippet_path / relative_path)
+
+
+def backup_incremental(
+    backup_dirpath: Path, snippet_dirs: dict[str, Path], target_filenames: Optional[set[str]]
+) -> int:
+    """サイズまたは更新時刻が変化したスニペットファイルのみバックアップにコピーする.
+
+    Args:
+        backup_dirpath (Path): バックアップディレクトリパス
+        snippet_dirs (dict[str, Path]): {エディタ名: スニペットディレクトリパス}
+        target_filenames (Optional[set[str]]): 対象のファイル名。Noneの場合はディレクトリ全体
+
+    Returns:
+        int: コピーしたファイル数
+
+    Note:
+        - ディレクトリ全体を対象とする場合、スニペットディレクトリに存在しないファイルはバックアップから削除されます
+          (ファイルの削除で空になったディレクトリも削除されます)
+        - スニペットディレクトリが存在しない場合、そのエディタのバックアップは変更されません
+    """
+    copy_count = 0
+    for snippet_name, snippet_dirpath in snippet_dirs.items():
+        if not snippet_dirpath.is_dir():
+            # 一時的に参照できないスニペットディレクトリでバックアップを消さないよう、前回のバックアップを残す
+            logger.debug(f"Snippet directory not found, keep previous backup -> {snippet_dirpath}")
             continue
         backup_snippet_path = backup_dirpath / Path(snippet_name)
-        shutil.copytree(snippet_path, backup_snippet_path)
+        relative_paths = list_snippet_files(snippet_dirpath, target_filenames)
+
+        for relative_path in relative_paths:
+            src_path = snippet_dirpath / relative_path
+            dst_path = backup_snippet_path / relative_path
+            if is_same_file_stat(src_path, dst_path):
+                continue
+            dst_path.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(src_path, dst_path)
+            copy_count += 1
+
+        if target_filenames is None and backup_snippet_path.exists():
+            # 元のスニペットディレクトリから削除されたファイルをバックアップからも削除する
+            for stale_path in set(list_snippet_files(backup_snippet_path)) - set(relative_paths):
+                (backup_snippet_path / stale_path).unlink()
+            remove_empty_dirs(backup_snippet_path)
+    return copy_count
+
+
+def remove_empty_dirs(dirpath: Path) -> None:
+    """ディレクトリ配下の空になったサブディレクトリを削除する.
+
+    Args:
+        dirpath (Path): 対象のディレクトリパス (このディレクトリ自体は削除しない)
+    """
+    # 深い階層から削除すると、子の削除で空になった親ディレクトリも削除できる
+    for current_dirpath, _, _ in sorted(os.walk(dirpath), key=lambda entry: entry[0], reverse=True):
+        if current_dirpath != str(dirpath) and not os.listdir(current_dirpath):
+            os.rmdir(current_dirpath)
+
+
+def is_generation_dirname(dirname: str) -> bool:
+    """世代バックアップのディレクトリ名かを判定する.
+
+    Args:
+        dirname (str): ディレクトリ名
+
+    Returns:
+        bool: GENERATION_DIRNAME_FORMAT形式のディレクトリ名の場合True
+    """
+    try:
+        datetime.strptime(dirname, GENERATION_DIRNAME_FORMAT)
+        return True
+    except ValueError:
+        return False
+
+
+def link_or_copy(src_path: Path, dst_path: Path, prev_path: Optional[Path]) -> bool:
+    """前世代のバックアップと同じ内容ならハードリンクを作成し、異なる場合はコピーする.
+
+    Args:
+        src_path (Path): スニペットファイルパス
+        dst_path (Path): バックアップ先のファイルパス
+        prev_path (Optional[Path]): 前世代のバックアップのファイルパス
+
+    Returns:
+        bool: コピーした場合True、ハードリンクを作成した場合False
+    """
+    dst_path.parent.mkdir(parents=True, exist_ok=True)
+    if prev_path is not None and is_same_file_stat(src_path, prev_path):
+        try:
+            os.link(prev_path, dst_path)
+            return False
+        except OSError:
+            # ハードリンク非対応のファイルシステムの場合はコピーする
+            pass
+    shutil.copy2(src_path, dst_path)
+    return True
+
+
+def backup_generation(
+    backup_dirpath: Path,
+    snippet_dirs: dict[str, Path],
+    target_filenames: Optional[set[str]],
+    generations: int = DEFAULT_BACKUP_GENERATIONS,
+) -> int:
+    """タイムスタンプ付きの世代ディレクトリにスニペットファイルをバックアップする.
+
+    前世代から変化していないファイルはハードリンクを作成し、変化したファイルのみコピーします。
+
+    Args:
+        backup_dirpath (Path): バックアップディレクトリパス
+        snippet_dirs (dict[str, Path]): {エディタ名: スニペットディレクトリパス}
+        target_filenames (Optional[set[str]]): 対象のファイル名。Noneの場合はディレクトリ全体
+        generations (int): 保持する世代数 (古い世代から削除されます)
+
+    Returns:
+        int: コピーしたファイル数
+    """
+    backup_dirpath.mkdir(parents=True, exist_ok=True)
+    generation_dirs = sorted(
+        path for path in backup_dirpath.iterdir() if path.is_dir() and is_generation_dirname(path.name)
+    )
+    prev_generation_dir = generation_dirs[-1] if generation_dirs else None
+
+    generation_dir = backup_dirpath / datetime.now().strftime(GENERATION_DIRNAME_FORMAT)
+    copy_count = 0
+    for snippet_name, snippet_dirpath in snippet_dirs.items():
+        for relative_path in list_snippet_files(snippet_dirpath, target_filenames):
+            prev_path = prev_generation_dir / snippet_name / relative_path if prev_generation_dir else None
+            copy_count += link_or_copy(
+                snippet_dirpath / relative_path, generation_dir / snippet_name / relative_path, prev_path
+            )
+    generation_dir.mkdir(parents=True, exist_ok=True)
+
+    # 保持する世代数を超えた古い世代を削除する
+    for old_generation_dir in (generation_dirs + [generation_dir])[: -max(generations, 1)]:
+        shutil.rmtree(old_generation_dir)
+    return copy_count
+
+
+def backup_snippet_files(tool_setting: dict, device_setting: dict, languages: Optional[Iterable[str]] = None) -> None:
+    """スニペットファイルをバックアップディレクトリにコピーする.
+
+    tool_settingのbackup_modeに応じて、以下の方式でバックアップします。
+        - full: 既存のバックアップディレクトリを削除してから、スニペットディレクトリ全体をコピーする
+        - incremental: サイズまたは更新時刻が変化したファイルのみコピーする
+        - generation: タイムスタンプ付きの世代ディレクトリを作成し、変化していないファイルはハードリンクする
+        - none: バックアップしない (スニペットファイルは原子的に書き込まれるため、書き込み中の異常終了では壊れません)
+
+    Args:
+        tool_setting (dict): ツール設定辞書
+            - backup_snippet_dirpath: バックアップディレクトリの相対パス
+            - backup_mode: バックアップ方式 (full/incremental/generation/none, 省略時はfull)
+            - backup_generations: generation方式で保持する世代数 (省略時は5)
+            - backup_only_targets: 更新対象の<言語名>.jsonのみバックアップするか (省略時はfalse)
+        device_setting (dict): デバイス設定辞書
+            - snippet_path: スニペットパスの辞書 {エディタ名: スニペットディレクトリパス}
+        languages (Optional[Iterable[str]]): 更新対象の言語名。backup_only_targetsが有効な場合に使用
+    """
+    backup_dirpath = WORKSPACE_DIRPATH / Path(tool_setting["backup_snippet_dirpath"])
+    backup_mode = tool_setting.get("backup_mode", BACKUP_MODE_FULL)
+    snippet_dirs = get_backup_target_snippet_dirs(device_setting)
+
+    target_filenames = None
+    if tool_setting.get("backup_only_targets", False) and languages is not None:
+        target_filenames = {f"{lang}.json" for lang in languages}
+
+    if backup_mode == BACKUP_MODE_NONE:
+        logger.debug("Backup skipped")
+    elif backup_mode == BACKUP_MODE_INCREMENTAL:
+        copy_count = backup_incremental(backup_dirpath, snippet_dirs, target_filenames)
+        logger.debug(f"Incremental backup: {copy_count} files copied -> {backup_dirpath}")
+    elif backup_mode == BACKUP_MODE_GENERATION:
+        generations = tool_setting.get("backup_generations", DEFAULT_BACKUP_GENERATIONS)
+        copy_count = backup_generation(backup_dirpath, snippet_dirs, target_filenames, generations)
+        logger.debug(f"Generation backup: {copy_count} files copied -> {backup_dirpath}")
+    else:
+        if backup_mode != BACKUP_MODE_FULL:
+            logger.warning(f"Unknown backup mode `{backup_mode}`, use `{BACKUP_MODE_FULL}` instead")
+        backup_full(backup_dirpath, snippet_dirs, target_filenames)
@@ -0,0 +1,86 @@
+"""スニペットキーをライブラリ名ごとに索引化するモジュール."""
+
+from typing import Any
+
+SNIPPET_KEY_SEPARATOR = "@"
+
+
+def get_key_owner(snippet_key: str) -> str:
+    """スニペットキーの所有者 (最初の"@"より前の部分) を取得する.
+
+    Args:
+        snippet_key (str): スニペットキー (ex: "my_lib@my_function")
+
+    Returns:
+        str: 所有者名 (ex: "my_lib")。"@"を含まない場合は空文字列
+    """
+    owner, separator, _ = snippet_key.partition(SNIPPET_KEY_SEPARATOR)
+    return owner if separator else ""
+
+
+class IndexedSnippetData:
+    """スニペットデータ辞書と、ライブラリ名ごとのスニペットキーの索引を保持するクラス.
+
+    スニペットキーは"<ライブラリ名>@<スニペットキー>"の形式のため、最初の"@"より前の部分で索引化します。
+    ライブラリのスニペットの削除は、索引から対象のキーのみを参照して行うため、
+    スニペットデータ全体を走査する必要がありません。
+
+    Note:
+        - スニペットデータ辞書は直接変更されます (コピーしません)
+        - 削除後に追加したスニペットは辞書の末尾に配置されます
+    """
+
+    def __init__(self, snippet_data: dict) -> None:
+        """スニペットデータ辞書から索引を作成する.
+
+        Args:
+            snippet_data (dict): スニペットデータ辞書
+        """
+        self.data = snippet_data
+        # {所有者名: {スニペットキー: None}} (順序付き集合として使用)
+        self._owner_keys: dict[str, dict[str, None]] = {}
+        for snippet_key in snippet_data.keys():
+            self._owner_keys.setdefault(get_key_owner(snippet_key), {})[snippet_key] = None
+
+    def _get_library_owner_keys(self, library_name: str) -> dict[str, None]:
+        return self._owner_keys.get(get_key_owner(f"{library_name}{SNIPPET_KEY_SEPARATOR}"), {})
+
+    def library_keys(self, library_name: str) -> list[str]:
+        """指定したライブラリ名で始まるスニペットキーを取得する.
+
+        Args:
+            library_name (str): ライブラリ名
+
+        Returns:
+            list[str]: "<ライブラリ名>@"で始まるスニペットキーのリスト
+        """
+        # ライブラリ名が"@"を含む場合、同じ所有者の別ライブラリのキーが含まれるため絞り込む
+        key_prefix = f"{library_name}{SNIPPET_KEY_SEPARATOR}"
+        owner_keys = self._get_library_owner_keys(library_name)
+        return [snippet_key for snippet_key in owner_keys if snippet_key.startswith(key_prefix)]
+
+    def remove_library(self, library_name: str) -> int:
+        """指定したライブラリ名で始まるスニペットを削除する.
+
+        Args:
+            library_name (str): 削除対象のライブラリ名
+
+        Returns:
+            int: 削除したスニペット数
+        """
+        snippet_keys = self.library_keys(library_name)
+        owner_keys = self._get_library_owner_keys(library_name)
+        for snippet_key in snippet_keys:
+            del self.data[snippet_key]
+            del owner_keys[snippet_key]
+        return len(snippet_keys)
+
+    def set_snippet(self, snippet_key: str, snippet_value: Any) -> None:
+        """スニペットを追加または置き換える.
+
+        Args:
+            snippet_key (str): スニペットキー
+            snippet_value (Any): スニペットの値
+        """
+        self.data[snippet_key] = snippet_value
+        self._owner_keys.setdefault(get_key_owner(snippet_key), {})[snippet_key] = None
@@ -1,21 +1,108 @@
 """スニペットファイルの更新処理を行うモジュール."""
 
+import os
 from collections import defaultdict
-from copy import deepcopy
+from concurrent.futures import ThreadPoolExecutor
+from copy import copy
+from dataclasses import dataclass
+from dataclasses import field
 from logging import getLogger
 from pathlib import Path
+from typing import Optional
 
 from snippet.setting import VSCODE_SNIPPET_KEY_BODY
 from snippet.setting import VSCODE_SNIPPET_KEY_DESC
 from snippet.setting import VSCODE_SNIPPET_KEY_PREFIX
+from snippet.src.common.file_helper import fsync_directory
 from snippet.src.common.file_helper import read_jsonc
-from snippet.src.common.file_helper import write_json
+from snippet.src.common.file_helper import write_json_if_changed
 from snippet.src.common.groupby import groupby
+from snippet.src.common.json_serializer import DEFAULT_JSON_SERIALIZER
+from snippet.src.common.json_serializer import JsonSerializer
+from snippet.src.common.metrics import Metrics
+from snippet.src.common.metrics import count_metrics
+from snippet.src.common.metrics import measure_stage
 from snippet.src.lib_loader.dataclass import LibraryCode
+from snippet.src.update_snippet.index import IndexedSnippetData
 
 logger = getLogger("snippet").getChild("update_snippet")
 
 
+DEFAULT_UPDATE_WORKERS = 4
+
+
+@dataclass
+class SnippetTarget:
+    """更新対象のスニペットファイルのデータクラス
+
+    Attributes:
+        editor_names (list[str]): スニペットファイルを使用するエディタ名のリスト
+        language (str): 言語名
+        snippet_path (Path): スニペットファイルパス (<スニペットディレクトリ>/<言語名>.json)
+        lang_codes (list[LibraryCode]): マージするライブラリコードのリスト
+    """
+
+    editor_names: list[str]
+    language: str
+    snippet_path: Path
+    lang_codes: list[LibraryCode]
+
+
+@dataclass
+class SnippetTargetResult:
+    """スニペットファイル1つ分の更新結果のデータクラス
+
+    Attributes:
+        target (SnippetTarget): 更新対象
+        is_updated (bool): 書き込みを行ったか (内容が同じためスキップした場合False)
+        entry_count (int): 更新後のスニペット数
+        error (Optional[str]): 失敗した場合のエラー内容
+    """
+
+    target: SnippetTarget
+    is_updated: bool = False
+    entry_count: int = 0
+    error: Optional[str] = None
+
+
+@dataclass
+class SnippetUpdateResult:
+    """スニペットファイル更新結果の集計データクラス
+
+    Attributes:
+        updated (int): 書き込みを行ったスニペットファイル数
+        unchanged (int): 内容が変化していないため書き込みをスキップしたスニペットファイル数
+        failed (int): 読み込みまたは書き込みに失敗したスニペットファイル数
+        targets (list[SnippetTargetResult]): 更新対象ごとの結果
+    """
+
+    updated: int = 0
+    unchanged: int = 0
+    failed: int = 0
+    targets: list[SnippetTargetResult] = field(default_factory=list)
+
+    @property
+    def is_success(self) -> bool:
+        """すべてのスニペットファイルの読み込みと書き込みに成功したか"""
+        return self.failed == 0
+
+
+def create_snippet_entry(code: LibraryCode) -> dict:
+    """ライブラリコードからスニペットの値を作成する.
+
+    Args:
+        code (LibraryCode): ライブラリコード
+
+    Returns:
+        dict: {"prefix": スニペットプレフィックス, "description": 説明, "body": コード行}
+    """
+    return {
+        VSCODE_SNIPPET_KEY_PREFIX: code.snippet_prefix,
+        VSCODE_SNIPPET_KEY_DESC: code.description,
+        VSCODE_SNIPPET_KEY_BODY: code.code_lines,
+    }
+
+
 def delete_latest_library_snippet(snippet_data: defaultdict, library_name: str) -> defaultdict:
     """指定したライブラリ名で始まるスニペットキーを削除する.
 
@@ -37,91 +124,259 @@ def update_library_snippet(snippet_data: defaultdict, lib_codes: list[LibraryCod
     """ライブラリコードをスニペットデータに追加する.
 
     Args:
-        snippet_data (defaultdict): 既存のスニペットデータ辞書
+        snippet_data (defaultdict): 既存のスニペットデータ辞書 (変更されません)
         lib_codes (list[LibraryCode]): 追加するライブラリコードのリスト
 
     Returns:
         defaultdict: ライブラリコードを追加したスニペットデータ
     """
-    snippet_data = deepcopy(snippet_data)
+    # 既存のスニペットの値は書き換えないため、浅いコピーで十分
+    snippet_data = copy(snippet_data)
 
     for code in lib_codes:
-        snippet_key = f"{code.library_name}@{code.snippet_key}"
-        snippet_prefix = code.snippet_prefix
-        description = code.description
-        body = code.code_lines
-
         if code.enable:
-            snippet_data[snippet_key] = {
-                VSCODE_SNIPPET_KEY_PREFIX: snippet_prefix,
-                VSCODE_SNIPPET_KEY_DESC: description,
-                VSCODE_SNIPPET_KEY_BODY: body,
-            }
+            snippet_data[f"{code.library_name}@{code.snippet_key}"] = create_snippet_entry(code)
     return snippet_data
 
 
-def update_language_snippet(snippet_data: defaultdict, lang_codes: list[LibraryCode]) -> defaultdict:
-    """言語ごとのスニペットデータを更新する.
+def merge_language_snippet(indexed_snippet_data: IndexedSnippetData, lang_codes: list[LibraryCode]) -> int:
+    """索引付きのスニペットデータに言語ごとのライブラリコードを直接反映する.
 
-    同一ライブラリの既存スニペットを削除してから、
-    新しいライブラリコードをスニペットデータに追加します。
+    同一ライブラリの既存スニペットを索引を使用して削除してから、新しいライブラリコードを追加します。
+    削除はライブラリのスニペット数に比例する処理量のみで、スニペットデータ全体は走査しません。
 
     Args:
-        snippet_data (defaultdict): 既存のスニペットデータ辞書
+        indexed_snippet_data (IndexedSnippetData): 索引付きのスニペットデータ (直接変更されます)
         lang_codes (list[LibraryCode]): 言語ごとのライブラリコードリスト
 
     Returns:
-        defaultdict: 更新されたスニペットデータ
+        int: 削除したスニペット数
     """
-    snippet_data = deepcopy(snippet_data)
-
     # ライブラリごとにコードをグルーピング
     lib_groupby_codes = groupby(lang_codes, lambda code: code.library_name)
 
     # 以前に登録していたライブラリのスニペットを削除
-    for lib_name in lib_groupby_codes.keys():
-        snippet_data = delete_latest_library_snippet(snippet_data, lib_name)
+    removed_count = sum(indexed_snippet_data.remove_library(lib_name) for lib_name in lib_groupby_codes.keys())
 
     # ライブラリごとにスニペットを追加
     for lib_codes in lib_groupby_codes.values():
-        snippet_data = update_library_snippet(snippet_data, lib_codes)
+        for code in lib_codes:
+            if code.enable:
+                indexed_snippet_data.set_snippet(f"{code.library_name}@{code.snippet_key}", create_snippet_entry(code))
+    return removed_count
 
-    return snippet_data
 
+def update_language_snippet(snippet_data: dict, lang_codes: list[LibraryCode]) -> defaultdict:
+    """言語ごとのスニペットデータを更新する.
 
-def write_device_snippet_file(editor_name: str, snippet_path: Path, snippet_data: defaultdict) -> None:
-    """スニペットデータをJSONファイルに書き込む.
+    同一ライブラリの既存スニペットを削除してから、
+    新しいライブラリコードをスニペットデータに追加します。
+    入力のスニペットデータの浅いコピーに対してmerge_language_snippetを適用するため、入力は変更されません。
 
     Args:
-        editor_name (str): エディタ名（ログ出力用）
-        snippet_path (Path): スニペットファイルパス
-        snippet_data (defaultdict): 書き込むスニペットデータ
+        snippet_data (dict): 既存のスニペットデータ辞書
+        lang_codes (list[LibraryCode]): 言語ごとのライブラリコードリスト
+
+    Returns:
+        defaultdict: 更新されたスニペットデータ
+
+    Note:
+        - 更新対象外のスニペットは元の順序のまま先頭に、更新対象のライブラリのスニペットはその後ろに配置されます
+        - 既存のスニペットの値は新しい辞書と共有されます (コピーされません)
     """
-    write_json(snippet_path, snippet_data)
-    logger.info(f"[{editor_name}] Snippet file updated: {snippet_path}")
+    if not lang_codes:
+        return defaultdict(dict, snippet_data)
 
+    merged_snippet_data: defaultdict = defaultdict(None, snippet_data)
+    merge_language_snippet(IndexedSnippetData(merged_snippet_data), lang_codes)
+    return merged_snippet_data
 
-def update_snippet(device_setting: dict, lib_codes: list[LibraryCode]) -> None:
-    """デバイスのスニペットファイルを更新する.
 
-    言語ごとにライブラリコードをグループ化し、
-    各エディタのスニペットファイルを更新します。
+def plan_snippet_targets(device_setting: dict, lib_codes: list[LibraryCode]) -> list[SnippetTarget]:
+    """更新対象のスニペットファイルを列挙する.
+
+    言語ごとにライブラリコードをグループ化し、各エディタの<言語名>.jsonを更新対象とします。
+    複数のエディタが同じスニペットファイルを指す場合は1つの更新対象にまとめます。
 
     Args:
         device_setting (dict): デバイス設定辞書
             - snippet_path: スニペットパスの辞書 {エディタ名: スニペットディレクトリパス}
         lib_codes (list[LibraryCode]): 更新するライブラリコードのリスト
+
+    Returns:
+        list[SnippetTarget]: 更新対象のリスト (言語、エディタの順)
     """
+    targets: dict[Path, SnippetTarget] = {}
+
     # 言語ごとにコードをグルーピング
     lang_groupby_codes = groupby(lib_codes, lambda code: code.language)
 
     for lang, lang_codes in lang_groupby_codes.items():
-        # 各エディタごとにスニペットファイルを更新
         for editor_name, snippet_dirpath in device_setting["snippet_path"].items():
             # "none"または空の場合はスキップ(使用していないエディタの設定)
             if snippet_dirpath in ("none", "", None):
                 continue
             snippet_path = Path(snippet_dirpath) / Path(f"{lang}.json")
-            jsonc_data = read_jsonc(snippet_path)
-            snippet_data = update_language_snippet(defaultdict(dict, jsonc_data), lang_codes)
-            write_device_snippet_file(editor_name, snippet_path, snippet_data)
+            target_key = Path(os.path.abspath(snippet_path))
+            if target_key in targets:
+                targets[target_key].editor_names.append(editor_name)
+                continue
+            targets[target_key] = SnippetTarget([editor_name], lang, snippet_path, lang_codes)
+    return list(targets.values())
+
+
+def update_snippet_target(
+    target: SnippetTarget,
+    metrics: Optional[Metrics] = None,
+    serializer: JsonSerializer = DEFAULT_JSON_SERIALIZER,
+    fsync: bool = False,
+) -> SnippetTargetResult:
+    """1つのスニペットファイルを読み込み、ライブラリコードをマージして書き込む.
+
+    既存のスニペットファイルと内容が同じ場合は書き込みをスキップします。
+    読み込みまたは書き込みに失敗した場合は例外を送出せず、結果にエラー内容を格納します。
+
+    Args:
+        target (SnippetTarget): 更新対象
+        metrics (Optional[Metrics]): 処理時間とカウンタの記録先。Noneの場合は計測しない
+        serializer (JsonSerializer): スニペットファイルの書き込み形式とシリアライザ
+        fsync (bool): スニペットファイルを置き換える前に内容をディスクに同期するか
+
+    Returns:
+        SnippetTargetResult: 更新結果
+    """
+    try:
+        with measure_stage(metrics, "merge"):
+            # 読み込んだスニペットデータは他で使用しないため、コピーせずに直接更新する
+            indexed_snippet_data = IndexedSnippetData(read_jsonc(target.snippet_path))
+            removed_count = merge_language_snippet(indexed_snippet_data, target.lang_codes)
+        count_metrics(metrics, "merge", "snippet_entries", len(indexed_snippet_data.data))
+        count_metrics(metrics, "merge", "snippets_removed", removed_count)
+
+        with measure_stage(metrics, "write"):
+            is_updated = write_json_if_changed(target.snippet_path, indexed_snippet_data.data, serializer, fsync)
+    except (OSError, ValueError) as e:
+        return SnippetTargetResult(target, error=f"{type(e).__name__}: {e}")
+    return SnippetTargetResult(target, is_updated=is_updated, entry_count=len(indexed_snippet_data.data))
+
+
+def report_snippet_target_result(target_result: SnippetTargetResult) -> None:
+    """スニペットファイルの更新結果をログに出力する.
+
+    Args:
+        target_result (SnippetTargetResult): 更新結果
+    """
+    target = target_result.target
+    editor_label = ",".join(target.editor_names)
+    if target_result.error is not None:
+        logger.error(f"[{editor_label}] Snippet file update failed: {target.snippet_path} ({target_result.error})")
+    elif target_result.is_updated:
+        logger.info(f"[{editor_label}] Snippet file updated: {target.snippet_path}")
+    else:
+        logger.info(f"[{editor_label}] Snippet file unchanged: {target.snippet_path}")
+
+
+def update_snippet(
+    device_setting: dict,
+    lib_codes: list[LibraryCode],
+    metrics: Optional[Metrics] = None,
+    max_workers: int = DEFAULT_UPDATE_WORKERS,
+    serializer: JsonSerializer = DEFAULT_JSON_SERIALIZER,
+    fsync: bool = False,
+) -> SnippetUpdateResult:
+    """デバイスのスニペットファイルを更新する.
+
+    更新対象のスニペットファイルを列挙してから、スレッドプールで並行して読み込み・マージ・書き込みを行い、
+    すべての更新が終わった後に更新対象ごとの結果を出力します。
+    スニペットファイルは一時ファイルへの書き込みと置き換えによって原子的に更新されます。
+
+    Args:
+        device_setting (dict): デバイス設定辞書
+            - snippet_path: スニペットパスの辞書 {エディタ名: スニペットディレクトリパス}
+        lib_codes (list[LibraryCode]): 更新するライブラリコードのリスト
+        metrics (Optional[Metrics]): 処理時間とカウンタの記録先。Noneの場合は計測しない
+        max_workers (int): 同時に更新するスニペットファイル数の上限 (1: 並行実行しない)
+        serializer (JsonSerializer): スニペットファイルの書き込み形式とシリアライザ
+        fsync (bool): スニペットファイルの内容と、更新したスニペットディレクトリをディスクに同期するか
+
+    Returns:
+        SnippetUpdateResult: 書き込んだファイル数と、内容が同じためスキップしたファイル数、更新対象ごとの結果
+
+    Note:
+        - 並行実行した場合、merge/writeの処理時間は各スレッドの処理時間の合計になります
+    """
+    targets = plan_snippet_targets(device_setting, lib_codes)
+
+    if max_workers > 1 and len(targets) > 1:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(targets))) as executor:
+            target_results = list(
+                executor.map(lambda target: update_snippet_target(target, metrics, serializer, fsync), targets)
+            )
+    else:
+        target_results = [update_snippet_target(target, metrics, serializer, fsync) for target in targets]
+
+    if fsync:
+        # ファイルの置き換えをディレクトリごとに1回だけ同期する
+        with measure_stage(metrics, "write"):
+            # シンボリックリンクはリンク先のファイルが置き換えられるため、リンク先のディレクトリを同期する
+            updated_dirpaths = {
+                Path(os.path.realpath(result.target.snippet_path)).parent
+                for result in target_results
+                if result.is_updated
+            }
+            for dirpath in updated_dirpaths:
+                fsync_directory(dirpath)
+
+    result = SnippetUpdateResult(targets=target_results)
+    for target_result in target_results:
+        report_snippet_target_result(target_result)
+        if target_result.error is not None:
+            result.failed += 1
+        elif target_result.is_updated:
+            result.updated += 1
+        else:
+            result.unchanged += 1
+
+    count_metrics(metrics, "write", "snippets_written", result.updated)
+    count_metrics(metrics, "write", "snippets_unchanged", result.unchanged)
+
+    summary = f"Snippet files: {result.updated} updated, {result.unchanged} unchanged, {result.failed} failed"
+    if result.is_success:
+        logger.info(summary)
+    else:
+        failed_paths = [
+            str(target_result.target.snippet_path) for target_result in target_results if target_result.error
+        ]
+        logger.error(f"{summary} ({', '.join(failed_paths)})")
+    return result
+
+
+def update_device_snippet(
+    tool_setting: dict, device_setting: dict, lib_codes: list[LibraryCode], metrics: Optional[Metrics] = None
+) -> SnippetUpdateResult:
+    """ツール設定に従ってデバイスのスニペットファイルを更新する.
+
+    Args:
+        tool_setting (dict): ツール設定辞書
+            - update_workers: 同時に更新するスニペットファイル数 (省略時は4)
+            - json_backend/json_format: スニペットファイルの書き込み形式とシリアライザ
+            - fsync: スニペットファイルをディスクに同期するか (省略時はFalse)
+        device_setting (dict): デバイス設定辞書
+        lib_codes (list[LibraryCode]): 登録するライブラリコードのリスト
+        metrics (Optional[Metrics]): 処理時間とカウンタの記録先。Noneの場合は計測しない
+
+    Returns:
+        SnippetUpdateResult: スニペットファイルの更新結果
+
+    Note:
+        - 失敗したスニペットファイルがある場合は、集計をエラーレベルで出力します。
+          呼び出し元はSnippetUpdateResult.is_successで失敗を判定してください
+    """
+    return update_snippet(
+        device_setting,
+        lib_codes,
+        metrics,
+        max_workers=tool_setting.get("update_workers", DEFAULT_UPDATE_WORKERS),
+        serializer=JsonSerializer.from_setting(tool_setting),
+        fsync=tool_setting.get("fsync", False),
+    )
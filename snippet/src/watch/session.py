@@ -0,0 +1,174 @@
+"""監視モードで読み込み済みのライブラリコードを保持するモジュール."""
+
+import os
+from dataclasses import dataclass
+from dataclasses import field
+from itertools import chain
+from logging import getLogger
+from typing import Iterable
+from typing import Iterator
+from typing import Optional
+
+from snippet.src.lib_loader.dataclass import LibraryCode
+from snippet.src.lib_loader.dataclass import LibrarySettingData
+from snippet.src.lib_loader.discovery import FileDiscoveryData
+from snippet.src.lib_loader.load import extract_library_code
+from snippet.src.lib_loader.load import get_library_code_path
+
+logger = getLogger("snippet").getChild("watch")
+
+
+@dataclass
+class WatchedFile:
+    """監視中のライブラリコードファイルのデータクラス
+
+    Attributes:
+        mtime_ns (int): 抽出時のファイル更新時刻[ns]
+        size (int): 抽出時のファイルサイズ[byte]
+        lib_codes (list[LibraryCode]): ファイルから抽出したコードブロックのリスト
+    """
+
+    mtime_ns: int
+    size: int
+    lib_codes: list[LibraryCode] = field(default_factory=list)
+
+
+class LibraryWatchSession:
+    """ライブラリ設定と、ファイルごとに抽出したライブラリコードをメモリ上に保持するクラス.
+
+    変更されたパスを含むライブラリのみ再探索し、更新時刻またはサイズが変化したファイルのみ再抽出します。
+
+    Note:
+        - ライブラリ内のコードブロックの順序は、load_libraryと同じくファイルの探索順になります
+        - マーク配置が不正なファイルは、コードブロックを含まないファイルとして扱います
+        - 無効なライブラリはファイルを走査・監視せず、既存スニペットを削除するためのコードのみ返します
+        - コードブロックがすべて削除されたライブラリも、既存スニペットを削除するためのコードを返します
+    """
+
+    def __init__(self, library_settings: dict, discovery: Optional[FileDiscoveryData] = None) -> None:
+        """すべてのライブラリのコードブロックを読み込む.
+
+        Args:
+            library_settings (dict): ライブラリ設定辞書 {ライブラリ名: ライブラリ設定辞書}
+            discovery (Optional[FileDiscoveryData]): ファイルの探索方法。Noneの場合はディレクトリを走査する
+        """
+        self.discovery = discovery
+        self.setting_data_list = [
+            LibrarySettingData.from_setting(lib_name, lib_setting) for lib_name, lib_setting in library_settings.items()
+        ]
+        # {ライブラリ名: {ファイルパス: WatchedFile}} (ファイルパスは探索順)
+        self._files: dict[str, dict[str, WatchedFile]] = {}
+        for setting_data in self.setting_data_list:
+            self._refresh_library(setting_data)
+
+    @property
+    def watch_dirpaths(self) -> list[str]:
+        """監視対象のライブラリディレクトリの絶対パスのリスト."""
+        return sorted(
+            {
+                os.path.abspath(setting_data.relative_path)
+                for setting_data in self.setting_data_list
+                if setting_data.enable
+            }
+        )
+
+    def iter_watch_file_paths(self) -> Iterator[str]:
+        """監視対象のライブラリコードファイルのパスを取得する.
+
+        get_library_code_pathでディレクトリを走査するため、拡張子フィルタ・除外フィルタ・
+        "."で始まるファイルとディレクトリの除外は、ライブラリの読み込みと同じ条件になります。
+
+        Yields:
+            str: ライブラリコードファイルの絶対パス
+        """
+        for setting_data in self.setting_data_list:
+            if setting_data.enable:
+                yield from get_library_code_path(os.path.abspath(setting_data.relative_path), setting_data.language)
+
+    @property
+    def file_count(self) -> int:
+        """保持しているライブラリコードファイル数."""
+        return sum(len(files) for files in self._files.values())
+
+    def get_library_codes(self, languages: Optional[Iterable[str]] = None) -> list[LibraryCode]:
+        """保持しているライブラリコードを取得する.
+
+        Args:
+            languages (Optional[Iterable[str]]): 取得する言語名。Noneの場合はすべての言語
+
+        Returns:
+            list[LibraryCode]: ライブラリコードのリスト (ライブラリ設定の順序、ファイルの探索順)
+        """
+        language_set = set(languages) if languages is not None else None
+        lib_codes: list[LibraryCode] = []
+        for setting_data in self.setting_data_list:
+            if language_set is not None and setting_data.language.name not in language_set:
+                continue
+            library_codes = list(self._iter_codes(self._files[setting_data.library_name]))
+            # 無効なライブラリや、コードブロックがすべて削除されたライブラリは、削除用のコードを返す
+            lib_codes.extend(library_codes or [LibraryCode.purge(setting_data)])
+        return lib_codes
+
+    def find_libraries(self, changed_paths: Iterable[str]) -> list[LibrarySettingData]:
+        """変更されたパスを含むライブラリを取得する.
+
+        Args:
+            changed_paths (Iterable[str]): 変更されたファイルまたはディレクトリのパス
+
+        Returns:
+            list[LibrarySettingData]: 変更されたパスを含むライブラリ設定データのリスト
+        """
+        abs_paths = [os.path.abspath(path) for path in changed_paths]
+        affected_libraries = []
+        for setting_data in self.setting_data_list:
+            lib_dirpath = os.path.abspath(setting_data.relative_path)
+            if any(path == lib_dirpath or path.startswith(lib_dirpath + os.sep) for path in abs_paths):
+                affected_libraries.append(setting_data)
+        return affected_libraries
+
+    def refresh(self, changed_paths: Iterable[str]) -> set[str]:
+        """変更されたパスを含むライブラリのコードブロックを再読み込みする.
+
+        Args:
+            changed_paths (Iterable[str]): 変更されたファイルまたはディレクトリのパス
+
+        Returns:
+            set[str]: コードブロックが変化した言語名の集合
+        """
+        changed_languages: set[str] = set()
+        for setting_data in self.find_libraries(changed_paths):
+            if self._refresh_library(setting_data):
+                changed_languages.add(setting_data.language.name)
+        return changed_languages
+
+    @staticmethod
+    def _iter_codes(files: dict[str, WatchedFile]) -> Iterator[LibraryCode]:
+        return chain.from_iterable(watched_file.lib_codes for watched_file in files.values())
+
+    def _refresh_library(self, setting_data: LibrarySettingData) -> bool:
+        if not setting_data.enable:
+            # 無効なライブラリは走査しない (get_library_codesで削除用のコードのみ返す)
+            self._files[setting_data.library_name] = {}
+            return False
+
+        prev_files = self._files.get(setting_data.library_name, {})
+        next_files: dict[str, WatchedFile] = {}
+        extract_count = 0
+
+        for code_path in get_library_code_path(setting_data.relative_path, setting_data.language, self.discovery):
+            try:
+                stat = os.stat(code_path)
+            except OSError:
+                # 探索後に削除されたファイル
+                continue
+            watched_file = prev_files.get(code_path)
+            if watched_file is None or (watched_file.mtime_ns, watched_file.size) != (stat.st_mtime_ns, stat.st_size):
+                lib_codes = extract_library_code(code_path, setting_data) or []
+                watched_file = WatchedFile(stat.st_mtime_ns, stat.st_size, lib_codes)
+                extract_count += 1
+            next_files[code_path] = watched_file
+
+        self._files[setting_data.library_name] = next_files
+        is_changed = list(self._iter_codes(prev_files)) != list(self._iter_codes(next_files))
+        logger.debug(f"Reloaded library: {setting_data.library_name} ({extract_count} files extracted)")
+        return is_changed
@@ -0,0 +1,235 @@
+"""ライブラリディレクトリのファイル変更を監視するモジュール."""
+
+import os
+import threading
+from logging import getLogger
+from typing import Any
+from typing import Callable
+from typing import Iterable
+from typing import Optional
+from typing import Protocol
+
+logger = getLogger("snippet").getChild("watch")
+
+WATCH_BACKEND_AUTO = "auto"
+WATCH_BACKEND_WATCHDOG = "watchdog"
+WATCH_BACKEND_POLLING = "polling"
+
+DEFAULT_WATCH_INTERVAL = 1.0
+DEFAULT_WATCH_DEBOUNCE = 0.5
+
+
+class Watcher(Protocol):
+    """ファイル変更の監視方式のインターフェース"""
+
+    def wait_changes(self, timeout: float) -> set[str]:
+        """ファイルの変更を待機する.
+
+        Args:
+            timeout (float): 最大待機時間[秒]
+
+        Returns:
+            set[str]: 前回の呼び出し以降に変更されたパスの集合 (変更がない場合は空)
+        """
+        ...
+
+    def close(self) -> None:
+        """監視を終了する."""
+        ...
+
+
+class PollingWatcher:
+    """一定間隔でファイルの更新時刻とサイズを比較して変更を検出するクラス.
+
+    Note:
+        - "."で始まるファイルとディレクトリは監視しません
+        - list_pathsを指定した場合は、list_pathsが返すファイルのみ監視します
+    """
+
+    def __init__(self, dirpaths: list[str], list_paths: Optional[Callable[[], Iterable[str]]] = None) -> None:
+        """監視を開始する.
+
+        Args:
+            dirpaths (list[str]): 監視するディレクトリパスのリスト
+            list_paths (Optional[Callable[[], Iterable[str]]]): 監視するファイルパスを列挙する関数
+                (ex: 拡張子フィルタと除外フィルタを適用したライブラリコードファイル)。
+                Noneの場合はdirpaths配下のすべてのファイルを監視する
+        """
+        self.dirpaths = dirpaths
+        self.list_paths = list_paths or self._walk_paths
+        self._closed = threading.Event()
+        self._snapshot = self._take_snapshot()
+
+    def _walk_paths(self) -> Iterable[str]:
+        for dirpath in self.dirpaths:
+            for root, dirnames, filenames in os.walk(dirpath):
+                dirnames[:] = [dirname for dirname in dirnames if not dirname.startswith(".")]
+                for filename in filenames:
+                    if not filename.startswith("."):
+                        yield os.path.join(root, filename)
+
+    def _take_snapshot(self) -> dict[str, tuple[int, int]]:
+        snapshot: dict[str, tuple[int, int]] = {}
+        for file_path in self.list_paths():
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                continue
+            snapshot[file_path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def wait_changes(self, timeout: float) -> set[str]:
+        """timeout秒待機してから、前回の確認以降に変更されたファイルを取得する.
+
+        Args:
+            timeout (float): 待機時間[秒]
+
+        Returns:
+            set[str]: 追加・変更・削除されたファイルパスの集合
+        """
+        if self._closed.wait(timeout):
+            return set()
+        snapshot = self._take_snapshot()
+        changed_paths = {
+            path for path in snapshot.keys() | self._snapshot.keys() if snapshot.get(path) != self._snapshot.get(path)
+        }
+        self._snapshot = snapshot
+        return changed_paths
+
+    def close(self) -> None:
+        """監視を終了する."""
+        self._closed.set()
+
+
+class WatchdogWatcher:
+    """watchdogでファイルシステムのイベントを受け取って変更を検出するクラス.
+
+    Note:
+        - watchdogがインストールされている場合のみ使用できます
+    """
+
+    def __init__(self, dirpaths: list[str]) -> None:
+        """監視を開始する.
+
+        Args:
+            dirpaths (list[str]): 監視するディレクトリパスのリスト
+        """
+        from watchdog.observers import Observer
+
+        self._lock = threading.Lock()
+        self._changed = threading.Event()
+        self._changed_paths: set[str] = set()
+        self._observer = Observer()
+        for dirpath in dirpaths:
+            self._observer.schedule(self, dirpath, recursive=True)
+        self._observer.start()
+
+    def dispatch(self, event: Any) -> None:
+        """watchdogのイベントを受け取る (watchdogのイベントハンドラとして呼び出されます).
+
+        Args:
+            event (Any): watchdogのFileSystemEvent
+        """
+        if event.is_directory and event.event_type == "modified":
+            # ディレクトリの更新時刻の変化は、配下のファイルのイベントで検出する
+            return
+        paths = [event.src_path, getattr(event, "dest_path", "")]
+        with self._lock:
+            self._changed_paths.update(os.fsdecode(path) for path in paths if path)
+        self._changed.set()
+
+    def wait_changes(self, timeout: float) -> set[str]:
+        """ファイルのイベントを最大timeout秒待機し、前回の呼び出し以降に変更されたパスを取得する.
+
+        Args:
+            timeout (float): 最大待機時間[秒]
+
+        Returns:
+            set[str]: 作成・変更・削除・移動されたパスの集合
+        """
+        self._changed.wait(timeout)
+        with self._lock:
+            changed_paths = self._changed_paths
+            self._changed_paths = set()
+            self._changed.clear()
+        return changed_paths
+
+    def close(self) -> None:
+        """監視を終了する."""
+        self._observer.stop()
+        self._observer.join()
+
+
+def is_watchdog_available() -> bool:
+    """watchdogがインストールされているかを判定する.
+
+    Returns:
+        bool: インストールされている場合True
+    """
+    try:
+        import watchdog  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def create_watcher(
+    dirpaths: list[str],
+    backend: str = WATCH_BACKEND_AUTO,
+    list_paths: Optional[Callable[[], Iterable[str]]] = None,
+) -> Watcher:
+    """監視方式に応じたWatcherを生成する.
+
+    Args:
+        dirpaths (list[str]): 監視するディレクトリパスのリスト
+        backend (str): 監視方式 (auto: watchdogがインストールされていれば使用, watchdog, polling)
+        list_paths (Optional[Callable[[], Iterable[str]]]): polling方式で監視するファイルパスを列挙する関数。
+            Noneの場合はdirpaths配下のすべてのファイルを監視する
+
+    Returns:
+        Watcher: 監視を開始したWatcher
+    """
+    if backend == WATCH_BACKEND_POLLING:
+        return PollingWatcher(dirpaths, list_paths)
+    if is_watchdog_available():
+        return WatchdogWatcher(dirpaths)
+    if backend == WATCH_BACKEND_WATCHDOG:
+        logger.warning(f"watchdog is not installed, use `{WATCH_BACKEND_POLLING}` watch backend instead")
+    elif backend != WATCH_BACKEND_AUTO:
+        logger.warning(f"Unknown watch backend `{backend}`, use `{WATCH_BACKEND_AUTO}` instead")
+    return PollingWatcher(dirpaths, list_paths)
+
+
+def run_watch_loop(
+    watcher: Watcher,
+    on_change: Callable[[set[str]], None],
+    stop_event: threading.Event,
+    interval: float = DEFAULT_WATCH_INTERVAL,
+    debounce: float = DEFAULT_WATCH_DEBOUNCE,
+) -> None:
+    """ファイルの変更を待機し、変更がまとまった時点でon_changeを呼び出す.
+
+    変更を検出した後、debounce秒間新たな変更がなくなるまで変更を蓄積してからon_changeを呼び出します。
+    (エディタの保存処理による連続したイベントを1回の更新にまとめるため)
+
+    Args:
+        watcher (Watcher): ファイル変更を監視するWatcher
+        on_change (Callable[[set[str]], None]): 変更されたパスの集合を受け取るコールバック
+        stop_event (threading.Event): 監視を終了するためのイベント
+        interval (float): 変更を確認する間隔[秒]
+        debounce (float): 変更をまとめるための待機時間[秒]
+
+    Note:
+        - on_changeがOSErrorまたはValueErrorを送出した場合は、ログを出力して監視を継続します
+          (編集途中の不正なUTF-8のファイルや、変更の検出後に削除されたファイル、スニペットファイルの書き込み失敗等)
+    """
+    while not stop_event.is_set():
+        changed_paths = watcher.wait_changes(interval)
+        if not changed_paths:
+            continue
+        while not stop_event.is_set() and (more_paths := watcher.wait_changes(debounce)):
+            changed_paths |= more_paths
+        try:
+            on_change(changed_paths)
+        except (OSError, ValueError):
+            logger.exception(f"Failed to handle changes, keep watching ({len(changed_paths)} paths changed)")
@@ -0,0 +1,38 @@
+"""テストで共通して使用するデータを作成するモジュール."""
+
+
+def create_lib_setting(relative_path: str, begin: str = "lib:begin") -> dict:
+    """テスト用のライブラリ設定辞書を作成する.
+
+    Args:
+        relative_path (str): ライブラリディレクトリのパス
+        begin (str): コードブロックの開始マーク
+
+    Returns:
+        dict: ライブラリ設定辞書 (python、終了マークは"lib:end")
+    """
+    return {
+        "enable": True,
+        "description": "Test library",
+        "relative_path": relative_path,
+        "language": {"name": "python", "extensions": [".py"], "excludes": ["__pycache__"]},
+        "library_code_block": {"begin": begin, "end": "lib:end"},
+        "library_description_prefix": {
+            "snippet_key": "[snippet_key]",
+            "snippet_prefix": "[snippet_prefix]",
+            "description": "[description]",
+        },
+    }
+
+
+def create_code(snippet_key: str, body: str = "print(0)") -> str:
+    """テスト用のコードブロックを含むファイル内容を作成する.
+
+    Args:
+        snippet_key (str): スニペットキー
+        body (str): コードブロックの内容
+
+    Returns:
+        str: create_lib_settingの設定で抽出できるコードブロックを1つ含むファイル内容
+    """
+    return f"# lib:begin\n# [snippet_key] {snippet_key}\n# [snippet_prefix] p\n# [description] d\n{body}\n# lib:end\n"
@@ -0,0 +1,45 @@
+"""benchmarksパッケージのユニットテスト."""
+
+import json
+import tempfile
+from pathlib import Path
+
+from benchmarks.generators import generate_library
+from benchmarks.generators import generate_snippet_json
+from benchmarks.run_benchmark import main
+from snippet.src.common.file_helper import read_jsonc
+
+
+def test_generate_library() -> None:
+    """指定したファイル数のライブラリが生成されるテスト."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        lib_dir = Path(tmpdir) / "lib"
+
+        total_bytes = generate_library(lib_dir, file_count=20, block_count=2)
+
+        assert len(list(lib_dir.rglob("*.py"))) == 20
+        assert total_bytes > 0
+
+
+def test_generate_snippet_json() -> None:
+    """指定したエントリ数のスニペットjsonが生成されるテスト."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        json_path = Path(tmpdir) / "python.json"
+
+        generate_snippet_json(json_path, entry_count=30, library_count=3)
+
+        assert len(read_jsonc(json_path)) == 30
+
+
+def test_run_benchmark_small() -> None:
+    """小さな条件でベンチマークが最後まで実行できるテスト."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        output_path = Path(tmpdir) / "bench.json"
+
+        results = main(
+            ["--files", "3", "--blocks", "2", "--entries", "10", "--repeat", "1", "--output", str(output_path)]
+        )
+
+        assert len(results) > 0
+        assert all(result.min_seconds >= 0 for result in results)
+        assert len(json.loads(output_path.read_text())["results"]) == len(results)
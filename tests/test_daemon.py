@@ -0,0 +1,159 @@
+"""daemonモジュールのユニットテスト."""
+
+import io
+import os
+import socket
+import tempfile
+import threading
+from pathlib import Path
+
+import pytest
+
+from snippet.src.common.file_helper import read_json
+from snippet.src.daemon.client import EXIT_DAEMON_NOT_RUNNING
+from snippet.src.daemon.client import EXIT_SUCCESS
+from snippet.src.daemon.client import run_client
+from snippet.src.daemon.protocol import encode_message
+from snippet.src.daemon.protocol import is_unix_socket_supported
+from snippet.src.daemon.protocol import read_message
+from snippet.src.daemon.protocol import send_request
+from snippet.src.daemon.server import SnippetDaemon
+from snippet.src.daemon.server import acquire_daemon_lock
+from snippet.src.daemon.server import is_daemon_running
+from snippet.src.daemon.server import serve_daemon
+from tests.helper import create_code
+from tests.helper import create_lib_setting
+
+pytestmark = pytest.mark.skipif(not is_unix_socket_supported(), reason="Unix domain socket is not supported")
+
+
+def create_setting_data(lib_dirpath: str, snippet_dirpath: str) -> dict:
+    """テスト用の設定データを作成する."""
+    return {
+        "tool_config": {"backup_snippet_dirpath": "backup", "backup_mode": "none", "update_workers": 1},
+        "devices": {"test_device": {"snippet_path": {"vscode": snippet_dirpath}}},
+        "libraries": {"test_lib": create_lib_setting(lib_dirpath)},
+    }
+
+
+def test_message_roundtrip() -> None:
+    """メッセージのエンコードと読み込みが対応するテスト."""
+    message = {"command": "register", "text": "日本語"}
+
+    assert read_message(io.BytesIO(encode_message(message))) == message
+    with pytest.raises(ValueError):
+        read_message(io.BytesIO(b"[1, 2]\n"))
+    with pytest.raises(ConnectionError):
+        read_message(io.BytesIO(b""))
+
+
+def test_daemon_handle_request() -> None:
+    """registerリクエストで変更されたファイルのみ反映されるテスト."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        lib_dir = Path(tmpdir) / "lib"
+        snippet_dir = Path(tmpdir) / "snippets"
+        lib_dir.mkdir()
+        snippet_dir.mkdir()
+        (lib_dir / "a.py").write_text(create_code("a"))
+        daemon = SnippetDaemon(create_setting_data(str(lib_dir), str(snippet_dir)), "test_device")
+
+        first = daemon.handle_request({"command": "register"})
+        second = daemon.handle_request({"command": "register"})
+        (lib_dir / "b.py").write_text(create_code("b"))
+        third = daemon.handle_request({"command": "register"})
+
+        assert first["result"]["updated"] == 1
+        assert second["result"]["unchanged"] == 1
+        assert third["result"]["changed_languages"] == ["python"]
+        assert set(read_json(snippet_dir / "python.json")) == {"test_lib@a", "test_lib@b"}
+        assert daemon.handle_request({"command": "status"})["result"]["files"] == 2
+        assert daemon.handle_request({"command": "unknown"})["ok"] is False
+
+
+def test_daemon_code_blocks_without_purge() -> None:
+    """無効なライブラリの削除用のコードが、コードブロック数に含まれないテスト."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        lib_dir = Path(tmpdir) / "lib"
+        snippet_dir = Path(tmpdir) / "snippets"
+        lib_dir.mkdir()
+        snippet_dir.mkdir()
+        (lib_dir / "a.py").write_text(create_code("a"))
+        setting_data = create_setting_data(str(lib_dir), str(snippet_dir))
+        disabled_setting = create_lib_setting(str(Path(tmpdir) / "missing"))
+        disabled_setting["enable"] = False
+        setting_data["libraries"]["disabled_lib"] = disabled_setting
+        daemon = SnippetDaemon(setting_data, "test_device")
+
+        assert daemon.handle_request({"command": "register"})["result"]["code_blocks"] == 1
+        assert daemon.handle_request({"command": "status"})["result"]["code_blocks"] == 1
+
+
+def test_daemon_invalid_device() -> None:
+    """存在しないデバイスを指定した場合にValueErrorが発生するテスト."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        with pytest.raises(ValueError):
+            SnippetDaemon(create_setting_data(tmpdir, tmpdir), "unknown_device")
+
+
+def test_serve_daemon_and_client() -> None:
+    """ソケット経由でリクエストを処理し、stopリクエストで終了するテスト."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        socket_path = Path(tmpdir) / "daemon.sock"
+        assert run_client("status", socket_path) == EXIT_DAEMON_NOT_RUNNING
+
+        daemon = SnippetDaemon(create_setting_data(tmpdir, tmpdir), "test_device")
+        thread = threading.Thread(target=serve_daemon, args=(daemon, socket_path))
+        thread.start()
+        try:
+            for _ in range(100):
+                if is_daemon_running(socket_path):
+                    break
+                threading.Event().wait(0.05)
+            assert os.stat(socket_path).st_mode & 0o077 == 0
+            assert run_client("status", socket_path) == EXIT_SUCCESS
+            assert send_request({"command": "status"}, socket_path)["result"]["device"] == "test_device"
+        finally:
+            send_request({"command": "stop"}, socket_path)
+            thread.join(timeout=10)
+
+        assert not thread.is_alive()
+        assert not socket_path.exists()
+
+
+def test_serve_daemon_stop_with_idle_client() -> None:
+    """リクエストを送信しないクライアントが接続していても、stop_requestedで終了するテスト."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        socket_path = Path(tmpdir) / "daemon.sock"
+        daemon = SnippetDaemon(create_setting_data(tmpdir, tmpdir), "test_device")
+        thread = threading.Thread(target=serve_daemon, args=(daemon, socket_path, 0.05, 0.2))
+        thread.start()
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as idle_client:
+            try:
+                for _ in range(100):
+                    if socket_path.exists():
+                        break
+                    threading.Event().wait(0.05)
+                idle_client.connect(os.fspath(socket_path))
+                # 受信待ちのタイムアウト後も、他のクライアントのリクエストを処理できる
+                assert send_request({"command": "status"}, socket_path, timeout=5)["ok"]
+            finally:
+                daemon.stop_requested = True
+                thread.join(timeout=10)
+
+        assert not thread.is_alive()
+        assert not socket_path.exists()
+
+
+def test_serve_daemon_locked() -> None:
+    """他のデーモンがロックを保持している場合は起動せず、ソケットファイルも変更しないテスト."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        socket_path = Path(tmpdir) / "daemon.sock"
+        socket_path.write_text("")
+        daemon = SnippetDaemon(create_setting_data(tmpdir, tmpdir), "test_device")
+
+        lock_file = acquire_daemon_lock(socket_path)
+        assert lock_file is not None
+        with lock_file:
+            assert acquire_daemon_lock(socket_path) is None
+            assert not serve_daemon(daemon, socket_path)
+            assert socket_path.is_file()
@@ -1,16 +1,28 @@
 """file_helperモジュールのユニットテスト."""
 
 import json
+import os
+import random
+import re
+import stat
 import tempfile
 from pathlib import Path
+from typing import Any
 
+import pytest
 import yaml
 
+from snippet.src.common.file_helper import MMAP_MIN_FILE_SIZE
+from snippet.src.common.file_helper import fsync_directory
 from snippet.src.common.file_helper import read_json
 from snippet.src.common.file_helper import read_jsonc
+from snippet.src.common.file_helper import read_marker_lines
 from snippet.src.common.file_helper import read_text
 from snippet.src.common.file_helper import read_yaml
+from snippet.src.common.file_helper import strip_jsonc
 from snippet.src.common.file_helper import write_json
+from snippet.src.common.file_helper import write_json_if_changed
+from snippet.src.common.file_helper import write_text_atomic
 
 
 def test_read_text_basic() -> None:
@@ -304,3 +316,197 @@ def test_write_json_empty_dict() -> None:
         assert result == {}
     finally:
         temp_path.unlink()
+
+
+def test_write_json_if_changed() -> None:
+    """内容が変化した場合のみJSONファイルが書き込まれるテスト."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        json_path = Path(tmpdir) / "test.json"
+
+        assert write_json_if_changed(json_path, {"key": "value"}) is True
+        assert write_json_if_changed(json_path, {"key": "value"}) is False
+        assert write_json_if_changed(json_path, {"key": "changed"}) is True
+        assert read_json(json_path) == {"key": "changed"}
+
+
+def test_read_jsonc_with_comment_mark_in_string() -> None:
+    """文字列内のコメント記号と、行末のコメントを含むJSONCファイル読み込みのテスト."""
+    jsonc_content = """{
+    "line": "a // b", // trailing comment
+    "block": "/* not a comment */",
+    "escaped": "quote \\" /* still string */"
+}"""
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        temp_path = Path(tmpdir) / "test.jsonc"
+        temp_path.write_text(jsonc_content, encoding="utf-8")
+
+        result = read_jsonc(temp_path)
+
+        assert result == {"line": "a // b", "block": "/* not a comment */", "escaped": 'quote " /* still string */'}
+
+
+def test_read_jsonc_with_trailing_comma() -> None:
+    """末尾カンマを含むJSONCファイル読み込みのテスト."""
+    jsonc_content = """{
+    "list": [1, 2, /* comment */ ],
+    "dict": {"key": "value",},
+    "comma_in_string": ",]",
+}"""
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        temp_path = Path(tmpdir) / "test.jsonc"
+        temp_path.write_text(jsonc_content, encoding="utf-8")
+
+        result = read_jsonc(temp_path)
+
+        assert result == {"list": [1, 2], "dict": {"key": "value"}, "comma_in_string": ",]"}
+
+
+def strip_jsonc_reference(text: str) -> str:
+    """文字列リテラルとコメントを正規表現で判定し、コメントを除去してから末尾カンマを除去するJSONCの変換 (比較用)."""
+    string_pattern = r"""(?P<string>"[^"\\\n]*(?:\\.[^"\\\n]*)*")"""
+    comment_pattern = re.compile(string_pattern + r"|//[^\n]*|/\*[\s\S]*?(?:\*/|$)")
+    trailing_comma_pattern = re.compile(string_pattern + r"|,(?=\s*[}\]])")
+    return trailing_comma_pattern.sub(r"\g<string>", comment_pattern.sub(r"\g<string>", text))
+
+
+def test_strip_jsonc_same_as_reference() -> None:
+    """ランダムな入力に対して、正規表現による変換と同じ結果になるテスト."""
+    fragments = ['"a"', '"//"', '"/*"', '"*/"', '"\\""', '","', "//c\n", "/*c*/", "/*\n*/"]
+    fragments += ["//]\n", "// /*\n", "/*]*/", ",", "]", "}", " ", "\n", "1"]
+    rand = random.Random(0)
+
+    for _ in range(2000):
+        text = "".join(rand.choice(fragments) for _ in range(rand.randint(0, 15)))
+
+        assert strip_jsonc(text) == strip_jsonc_reference(text), text
+
+
+def test_strip_jsonc_brackets_and_comment_marks_in_comment() -> None:
+    """コメント内の括弧や"/*"によって、区切りのカンマが末尾カンマとして除去されないテスト."""
+    cases = [
+        '{\n  "a": [1, 2], // e.g. arr[0]\n  "b": 2\n}',
+        '{\n  "a": 1, // see /* here\n  "b": 2\n}',
+        '{\n  "a": 1, /* } ] */ "b": [1, /* ] */ 2,],\n}',
+        '{"a": 1, // }\n"b": "x // ] /*", /* // ] */ "c": 3 // end',
+    ]
+    expected = [{"a": [1, 2], "b": 2}, {"a": 1, "b": 2}, {"a": 1, "b": [1, 2]}]
+
+    for text, data in zip(cases, expected):
+        assert json.loads(strip_jsonc(text)) == data, text
+    assert strip_jsonc(cases[3]) == '{"a": 1, \n"b": "x // ] /*",  "c": 3 '
+
+
+def test_strip_jsonc_random_valid_jsonc() -> None:
+    """ランダムなjsonデータにコメントと末尾カンマを挿入したJSONCが、元のデータとして読み込まれるテスト."""
+    comments = ["// ] } , /* [0]\n", "/* ] } , // */", "/* multi\n] line */", " "]
+    strings = ["a", "]", "},", "// x", "/* y */", 'q"q', "\\"]
+    rand = random.Random(0)
+
+    def random_value(depth: int) -> Any:
+        if depth >= 3 or rand.random() < 0.3:
+            return rand.choice([rand.randint(0, 9), rand.choice(strings), None, True])
+        if rand.random() < 0.5:
+            return [random_value(depth + 1) for _ in range(rand.randint(0, 3))]
+        return {rand.choice(strings) + str(idx): random_value(depth + 1) for idx in range(rand.randint(0, 3))}
+
+    def to_jsonc(value: Any) -> str:
+        def comment() -> str:
+            return rand.choice(comments)
+
+        if isinstance(value, list):
+            items = [comment() + to_jsonc(item) + comment() for item in value]
+            trailing = "," + comment() if items and rand.random() < 0.5 else ""
+            return "[" + ",".join(items) + trailing + "]"
+        if isinstance(value, dict):
+            items = [
+                f"{comment()}{json.dumps(key)}{comment()}:{comment()}{to_jsonc(item)}" for key, item in value.items()
+            ]
+            trailing = "," + comment() if items and rand.random() < 0.5 else ""
+            return "{" + ",".join(items) + trailing + comment() + "}"
+        return json.dumps(value)
+
+    for _ in range(500):
+        data = {"root": random_value(0)}
+        text = to_jsonc(data)
+
+        assert json.loads(strip_jsonc(text)) == data, text
+
+
+def test_write_text_atomic_keep_mode_and_no_temp_file() -> None:
+    """原子的な書き込みで、既存ファイルの権限が引き継がれ一時ファイルが残らないテスト."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        file_path = Path(tmpdir) / "python.json"
+        file_path.write_text("old")
+        os.chmod(file_path, 0o640)
+
+        write_text_atomic(file_path, "new", fsync=True)
+        fsync_directory(Path(tmpdir))
+
+        assert file_path.read_text() == "new"
+        assert stat.S_IMODE(file_path.stat().st_mode) == 0o640
+        assert os.listdir(tmpdir) == ["python.json"]
+
+
+def test_write_text_atomic_symlink() -> None:
+    """シンボリックリンクに書き込んだ場合、リンクを残したままリンク先のファイルが置き換えられるテスト."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        target_path = Path(tmpdir) / "dotfiles" / "python.json"
+        target_path.parent.mkdir()
+        target_path.write_text("old")
+        link_path = Path(tmpdir) / "python.json"
+        link_path.symlink_to(target_path)
+
+        write_text_atomic(link_path, "new")
+
+        assert link_path.is_symlink()
+        assert target_path.read_text() == "new"
+        assert os.listdir(target_path.parent) == ["python.json"]
+
+
+def test_write_text_atomic_keep_original_on_error() -> None:
+    """書き込みに失敗した場合は元のファイルが変更されないテスト."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        file_path = Path(tmpdir) / "python.json"
+        file_path.write_text("old")
+
+        with pytest.raises(UnicodeEncodeError):
+            # サロゲート文字はUTF-8にエンコードできない
+            write_text_atomic(file_path, "\ud800")
+
+        assert file_path.read_text() == "old"
+        assert os.listdir(tmpdir) == ["python.json"]
+
+
+def test_read_marker_lines_without_marker() -> None:
+    """マークを含まないファイルと空のファイルはNoneになるテスト."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        file_path = Path(tmpdir) / "sample.py"
+        file_path.write_bytes(b"print('hello')\n\xff\xfe not utf-8\n")
+        assert read_marker_lines(file_path, ["lib:begin", "lib:end"]) is None
+
+        file_path.write_bytes(b"")
+        assert read_marker_lines(file_path, ["lib:begin", "lib:end"]) is None
+
+
+def test_read_marker_lines_region() -> None:
+    """最初のマークの行から最後のマークの行までが、改行の種類によらず行に分割されるテスト."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        file_path = Path(tmpdir) / "sample.py"
+        file_path.write_bytes("head\r\n# lib:begin\rコード\r\n# lib:end\ntail\n".encode("utf-8"))
+
+        assert read_marker_lines(file_path, ["lib:begin", "lib:end"]) == ["# lib:begin", "コード", "# lib:end"]
+
+
+def test_read_marker_lines_mmap() -> None:
+    """mmapで検索する大きなファイルでも、マークを含む範囲のみ読み込まれるテスト."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        file_path = Path(tmpdir) / "large.py"
+        filler = "x = 0\n" * (MMAP_MIN_FILE_SIZE // 6 + 1)
+        file_path.write_text(filler + "# lib:begin\nbody\n# lib:end\n" + filler, encoding="utf-8")
+
+        assert read_marker_lines(file_path, ["lib:begin", "lib:end"]) == ["# lib:begin", "body", "# lib:end"]
+
+        file_path.write_text(filler * 2, encoding="utf-8")
+        assert read_marker_lines(file_path, ["lib:begin", "lib:end"]) is None
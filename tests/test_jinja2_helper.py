@@ -0,0 +1,42 @@
+"""jinja2_helperモジュールのユニットテスト."""
+
+from snippet.src.common.jinja2_helper import clear_jinja2_template_cache
+from snippet.src.common.jinja2_helper import compile_jinja2_template
+from snippet.src.common.jinja2_helper import get_jinja2_environment
+from snippet.src.common.jinja2_helper import render_jinja2_template
+
+
+def test_render_jinja2_template_without_variable() -> None:
+    """テンプレート変数を含まない文字列はそのまま返されるテスト."""
+    clear_jinja2_template_cache()
+
+    assert render_jinja2_template("./lib", {}) == "./lib"
+    assert compile_jinja2_template.cache_info().currsize == 0
+
+
+def test_render_jinja2_template_reuse_compiled_template() -> None:
+    """同じテンプレート文字列のコンパイル結果が再利用されるテスト."""
+    clear_jinja2_template_cache()
+
+    assert render_jinja2_template("{{ repo_root }}/lib", {"repo_root": "/repo1"}) == "/repo1/lib"
+    assert render_jinja2_template("{{ repo_root }}/lib", {"repo_root": "/repo2"}) == "/repo2/lib"
+
+    cache_info = compile_jinja2_template.cache_info()
+    assert cache_info.misses == 1
+    assert cache_info.hits == 1
+
+
+def test_render_jinja2_template_undefined_variable() -> None:
+    """未定義の変数を含む場合は元の文字列が返されるテスト."""
+    assert render_jinja2_template("{{ undefined_value }}/lib", {}) == "{{ undefined_value }}/lib"
+
+
+def test_clear_jinja2_template_cache() -> None:
+    """キャッシュ破棄により共有のJinja2環境が再生成されるテスト."""
+    environment = get_jinja2_environment()
+    assert get_jinja2_environment() is environment
+
+    clear_jinja2_template_cache()
+
+    assert get_jinja2_environment() is not environment
+    assert compile_jinja2_template.cache_info().currsize == 0
@@ -0,0 +1,67 @@
+"""common.json_serializerモジュールのユニットテスト."""
+
+import json
+import random
+
+import pytest
+
+from snippet.src.common.json_serializer import JSON_BACKEND_ORJSON
+from snippet.src.common.json_serializer import JSON_BACKEND_STDLIB
+from snippet.src.common.json_serializer import JSON_FORMAT_COMPACT
+from snippet.src.common.json_serializer import JSON_FORMAT_PRETTY
+from snippet.src.common.json_serializer import JsonSerializer
+from snippet.src.common.json_serializer import escape_non_ascii
+
+SNIPPET_DATA = {
+    "lib@func": {
+        "prefix": "func",
+        "description": "日本語の説明 \U0001f600",
+        "body": ["def func():", '    return "\\t\x7f"'],
+    },
+    "empty": {"body": []},
+}
+
+
+def test_stdlib_pretty_same_as_json_dumps() -> None:
+    """標準ライブラリのpretty形式がjson.dumps(indent=2)と同じになるテスト."""
+    serializer = JsonSerializer(backend=JSON_BACKEND_STDLIB, format=JSON_FORMAT_PRETTY)
+
+    assert serializer.dumps(SNIPPET_DATA) == json.dumps(SNIPPET_DATA, indent=2)
+
+
+def test_compact_format() -> None:
+    """compact形式では改行と空白を含まないテスト."""
+    serializer = JsonSerializer(format=JSON_FORMAT_COMPACT)
+
+    text = serializer.dumps({"a": [1, 2], "b": {"c": "d"}})
+
+    assert text == '{"a":[1,2],"b":{"c":"d"}}'
+
+
+def test_escape_non_ascii_same_as_ensure_ascii() -> None:
+    """UTF-8のまま出力したjsonをエスケープすると、ensure_ascii=Trueの出力と同じになるテスト."""
+    rand = random.Random(0)
+    chars = ["a", " ", '"', "\\", "\n", "\x01", "\x7f", "é", "あ", "\U0001f600", "\uffff"]
+
+    for _ in range(200):
+        data = {"".join(rand.choices(chars, k=3)): ["".join(rand.choices(chars, k=rand.randint(0, 8)))]}
+
+        assert escape_non_ascii(json.dumps(data, ensure_ascii=False, indent=2)) == json.dumps(data, indent=2)
+
+
+def test_from_setting_unknown_values() -> None:
+    """不明な設定値の場合は既定値が使用されるテスト."""
+    serializer = JsonSerializer.from_setting({"json_backend": "unknown", "json_format": "unknown"})
+
+    assert serializer.format == JSON_FORMAT_PRETTY
+    assert serializer.dumps({"a": 1}) == json.dumps({"a": 1}, indent=2)
+
+
+def test_orjson_same_as_stdlib() -> None:
+    """orjsonを使用した場合も標準ライブラリと同じ文字列になるテスト."""
+    pytest.importorskip("orjson", reason="orjson is not installed (install with the fast-json extra)")
+
+    for json_format in (JSON_FORMAT_PRETTY, JSON_FORMAT_COMPACT):
+        orjson_text = JsonSerializer(backend=JSON_BACKEND_ORJSON, format=json_format).dumps(SNIPPET_DATA)
+        stdlib_text = JsonSerializer(backend=JSON_BACKEND_STDLIB, format=json_format).dumps(SNIPPET_DATA)
+        assert orjson_text == stdlib_text
@@ -0,0 +1,184 @@
+"""lib_loader.cacheモジュールのユニットテスト."""
+
+import logging
+import os
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from snippet.src.common.file_helper import read_json
+from snippet.src.lib_loader.cache import ScanCache
+from snippet.src.lib_loader.load import load_library_code
+from tests.helper import create_lib_setting
+
+
+def write_library_code(code_path: Path, snippet_key: str) -> None:
+    """テスト用のライブラリコードファイルを作成する."""
+    code_path.write_text(
+        "\n".join(
+            [
+                "# lib:begin",
+                f"# [snippet_key] {snippet_key}",
+                "# [snippet_prefix] prefix",
+                "# [description] description",
+                "print('hello')",
+                "# lib:end",
+            ]
+        )
+        + "\n"
+    )
+
+
+def test_scan_cache_reuse_unchanged_file() -> None:
+    """変更されていないファイルはキャッシュから読み込まれるテスト."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmpdir_path = Path(tmpdir)
+        lib_dir = tmpdir_path / "lib"
+        lib_dir.mkdir()
+        write_library_code(lib_dir / "sample.py", "sample")
+        cache_path = tmpdir_path / "scan_cache.json"
+        lib_setting = create_lib_setting(str(lib_dir))
+
+        scan_cache = ScanCache.load(cache_path)
+        first_codes = load_library_code("test_lib", lib_setting, scan_cache)
+        scan_cache.save(cache_path)
+        assert scan_cache.miss_count == 1
+
+        scan_cache = ScanCache.load(cache_path)
+        second_codes = load_library_code("test_lib", lib_setting, scan_cache)
+        assert scan_cache.hit_count == 1
+        assert scan_cache.miss_count == 0
+        assert second_codes == first_codes
+
+
+def test_scan_cache_warn_missing_prefix_every_run(caplog: pytest.LogCaptureFixture) -> None:
+    """必須プレフィックスが欠けたブロックを含むファイルはキャッシュされず、毎回警告が出力されるテスト."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmpdir_path = Path(tmpdir)
+        lib_dir = tmpdir_path / "lib"
+        lib_dir.mkdir()
+        write_library_code(lib_dir / "sample.py", "sample")
+        (lib_dir / "missing_prefix.py").write_text("# lib:begin\n# [snippet_key] key\nprint(0)\n# lib:end\n")
+        cache_path = tmpdir_path / "scan_cache.json"
+        lib_setting = create_lib_setting(str(lib_dir))
+
+        for _ in range(2):
+            caplog.clear()
+            scan_cache = ScanCache.load(cache_path)
+            with caplog.at_level(logging.WARNING, logger="snippet"):
+                lib_codes = load_library_code("test_lib", lib_setting, scan_cache)
+            scan_cache.save(cache_path)
+
+            assert [code.snippet_key for code in lib_codes] == ["sample"]
+            assert [
+                record.getMessage() for record in caplog.records if "Missing required prefix" in record.getMessage()
+            ]
+
+        # 正常なファイルのみキャッシュから読み込まれる
+        assert (scan_cache.hit_count, scan_cache.miss_count) == (1, 1)
+
+
+def test_scan_cache_reload_modified_file() -> None:
+    """変更されたファイルは再読み込みされるテスト."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmpdir_path = Path(tmpdir)
+        lib_dir = tmpdir_path / "lib"
+        lib_dir.mkdir()
+        code_path = lib_dir / "sample.py"
+        write_library_code(code_path, "sample")
+        cache_path = tmpdir_path / "scan_cache.json"
+        lib_setting = create_lib_setting(str(lib_dir))
+
+        scan_cache = ScanCache.load(cache_path)
+        load_library_code("test_lib", lib_setting, scan_cache)
+        scan_cache.save(cache_path)
+
+        write_library_code(code_path, "modified_sample")
+        stat = os.stat(code_path)
+        os.utime(code_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        scan_cache = ScanCache.load(cache_path)
+        lib_codes = load_library_code("test_lib", lib_setting, scan_cache)
+        assert scan_cache.miss_count == 1
+        assert lib_codes[0].snippet_key == "modified_sample"
+
+
+def test_scan_cache_use_hash_with_touched_file() -> None:
+    """更新時刻のみ変化したファイルはハッシュ比較でキャッシュが再利用されるテスト."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmpdir_path = Path(tmpdir)
+        lib_dir = tmpdir_path / "lib"
+        lib_dir.mkdir()
+        code_path = lib_dir / "sample.py"
+        write_library_code(code_path, "sample")
+        cache_path = tmpdir_path / "scan_cache.json"
+        lib_setting = create_lib_setting(str(lib_dir))
+
+        scan_cache = ScanCache.load(cache_path, use_hash=True)
+        load_library_code("test_lib", lib_setting, scan_cache)
+        scan_cache.save(cache_path)
+
+        stat = os.stat(code_path)
+        os.utime(code_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        scan_cache = ScanCache.load(cache_path, use_hash=True)
+        lib_codes = load_library_code("test_lib", lib_setting, scan_cache)
+        assert scan_cache.hit_count == 1
+        assert lib_codes[0].snippet_key == "sample"
+
+
+def test_scan_cache_invalidate_by_setting_change() -> None:
+    """ライブラリ設定が変更された場合はキャッシュが破棄されるテスト."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmpdir_path = Path(tmpdir)
+        lib_dir = tmpdir_path / "lib"
+        lib_dir.mkdir()
+        write_library_code(lib_dir / "sample.py", "sample")
+        cache_path = tmpdir_path / "scan_cache.json"
+
+        scan_cache = ScanCache.load(cache_path)
+        load_library_code("test_lib", create_lib_setting(str(lib_dir)), scan_cache)
+        scan_cache.save(cache_path)
+
+        scan_cache = ScanCache.load(cache_path)
+        lib_codes = load_library_code("test_lib", create_lib_setting(str(lib_dir), begin="other:begin"), scan_cache)
+        assert scan_cache.miss_count == 1
+        assert lib_codes == []
+
+
+def test_scan_cache_drop_deleted_file() -> None:
+    """削除されたファイルのキャッシュは保存されないテスト."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmpdir_path = Path(tmpdir)
+        lib_dir = tmpdir_path / "lib"
+        lib_dir.mkdir()
+        write_library_code(lib_dir / "sample1.py", "sample1")
+        write_library_code(lib_dir / "sample2.py", "sample2")
+        cache_path = tmpdir_path / "scan_cache.json"
+        lib_setting = create_lib_setting(str(lib_dir))
+
+        scan_cache = ScanCache.load(cache_path)
+        load_library_code("test_lib", lib_setting, scan_cache)
+        scan_cache.save(cache_path)
+
+        (lib_dir / "sample2.py").unlink()
+        scan_cache = ScanCache.load(cache_path)
+        load_library_code("test_lib", lib_setting, scan_cache)
+        scan_cache.save(cache_path)
+
+        cached_files = read_json(cache_path)["libraries"]["test_lib"]["files"]
+        assert str(lib_dir / "sample1.py") in cached_files
+        assert str(lib_dir / "sample2.py") not in cached_files
+
+
+def test_scan_cache_load_broken_file() -> None:
+    """壊れたキャッシュファイルの場合は空のキャッシュになるテスト."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cache_path = Path(tmpdir) / "scan_cache.json"
+        cache_path.write_text("{broken")
+
+        scan_cache = ScanCache.load(cache_path)
+
+        assert scan_cache.hit_count == 0
+        assert scan_cache.miss_count == 0
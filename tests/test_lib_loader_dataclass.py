@@ -1,9 +1,15 @@
 """dataclassモジュールのユニットテスト."""
 
+import pickle
+import random
+from dataclasses import asdict
+
 from snippet.src.lib_loader.dataclass import LanguageData
 from snippet.src.lib_loader.dataclass import LibraryCode
 from snippet.src.lib_loader.dataclass import LibraryRuleData
+from snippet.src.lib_loader.dataclass import LibraryRuleMatcher
 from snippet.src.lib_loader.dataclass import LibrarySettingData
+from snippet.src.lib_loader.dataclass import clear_library_descriptor_cache
 
 
 def test_library_rule_data_from_setting() -> None:
@@ -26,6 +32,90 @@ def test_library_rule_data_from_setting() -> None:
     assert rule_data.lib_desc_prefix_description == "[description]"
 
 
+def create_rule_data(begin: str = "lib:begin", snippet_key: str = "[snippet_key]") -> LibraryRuleData:
+    """テスト用のLibraryRuleDataを作成する."""
+    return LibraryRuleData(
+        lib_code_block_begin=begin,
+        lib_code_block_end="lib:end",
+        lib_desc_prefix_snippet_key=snippet_key,
+        lib_desc_prefix_snippet_prefix="[snippet_prefix]",
+        lib_desc_prefix_description="[description]",
+    )
+
+
+def test_library_rule_matcher_classify() -> None:
+    """行に含まれるマークとプレフィックスのフラグが取得されるテスト."""
+    matcher = create_rule_data().matcher
+
+    assert matcher.classify("# lib:begin") == LibraryRuleMatcher.BEGIN
+    assert matcher.classify("# [snippet_key] key") == LibraryRuleMatcher.SNIPPET_KEY
+    assert matcher.classify("# [snippet_key] [description] both") == (
+        LibraryRuleMatcher.SNIPPET_KEY | LibraryRuleMatcher.DESCRIPTION
+    )
+    assert matcher.classify("# lib:begin lib:end") == LibraryRuleMatcher.BEGIN | LibraryRuleMatcher.END
+    assert matcher.classify("print('[snippet]')") == 0
+
+
+def test_library_rule_matcher_overlapping_tokens() -> None:
+    """マークが他のプレフィックスを含む場合や、特殊文字を含む場合も分類されるテスト."""
+    matcher = create_rule_data(begin="[key].*begin", snippet_key="[key]").matcher
+
+    assert matcher.classify("# [key].*begin") == LibraryRuleMatcher.BEGIN | LibraryRuleMatcher.SNIPPET_KEY
+    assert matcher.classify("# [key] value") == LibraryRuleMatcher.SNIPPET_KEY
+    assert matcher.classify("# [key]xxbegin") == LibraryRuleMatcher.SNIPPET_KEY
+    assert matcher.classify("# key begin") == 0
+
+
+def test_library_rule_matcher_iter_marked_lines() -> None:
+    """ランダムな入力に対して、マーク・プレフィックスを含む行のみが正しいフラグで取得されるテスト."""
+    candidates = [
+        "# lib:begin",
+        "# lib:end",
+        "# [snippet_key] key",
+        "# [snippet_prefix] prefix",
+        "# [description] description",
+        "# [snippet_key] [description] lib:end",
+        "print('hello')",
+        "",
+    ]
+    rule_data = create_rule_data()
+    flag_tokens = [
+        (LibraryRuleMatcher.BEGIN, rule_data.lib_code_block_begin),
+        (LibraryRuleMatcher.END, rule_data.lib_code_block_end),
+        (LibraryRuleMatcher.SNIPPET_KEY, rule_data.lib_desc_prefix_snippet_key),
+        (LibraryRuleMatcher.SNIPPET_PREFIX, rule_data.lib_desc_prefix_snippet_prefix),
+        (LibraryRuleMatcher.DESCRIPTION, rule_data.lib_desc_prefix_description),
+    ]
+    rand = random.Random(0)
+
+    for _ in range(300):
+        lines = [rand.choice(candidates) for _ in range(rand.randint(0, 12))]
+        line_flags = [sum(flag for flag, token in flag_tokens if token in line) for line in lines]
+        expected = [(idx, flags) for idx, flags in enumerate(line_flags) if flags]
+
+        assert list(rule_data.matcher.iter_marked_lines(lines)) == expected
+
+
+def test_library_rule_matcher_empty_token() -> None:
+    """空のマークを設定した場合、空の行リストでは何も取得されず、すべての行にフラグが付くテスト."""
+    matcher = create_rule_data(begin="").matcher
+
+    assert list(matcher.iter_marked_lines([])) == []
+    assert list(matcher.iter_marked_lines(["", "# lib:end"])) == [
+        (0, LibraryRuleMatcher.BEGIN),
+        (1, LibraryRuleMatcher.BEGIN | LibraryRuleMatcher.END),
+    ]
+
+
+def test_library_rule_data_matcher_cached() -> None:
+    """行分類器が1回だけ生成され、asdictやpickleに影響しないテスト."""
+    rule_data = create_rule_data()
+
+    assert rule_data.matcher is rule_data.matcher
+    assert "matcher" not in asdict(rule_data)
+    assert pickle.loads(pickle.dumps(rule_data)).matcher.classify("# lib:end") == LibraryRuleMatcher.END
+
+
 def test_language_data_from_setting_with_all_fields() -> None:
     """すべてのフィールドが存在する場合のLanguageData.from_settingテスト."""
     lib_setting = {
@@ -174,3 +264,67 @@ def test_library_code_from_lines_empty() -> None:
     assert lib_code.snippet_prefix == ""
     assert lib_code.description == ""
     assert len(lib_code.code_lines) == 0
+
+
+def create_library_code(library_name: str, code_lines: list[str]) -> LibraryCode:
+    """テスト用のライブラリコードを作成する."""
+    return LibraryCode(
+        enable=True,
+        library_name=library_name,
+        relative_path=f"./{library_name}",
+        language="python",
+        snippet_key="key",
+        snippet_prefix="prefix",
+        description="description",
+        code_lines=code_lines,
+    )
+
+
+def test_library_code_code_lines_roundtrip() -> None:
+    """コード行を1つの文字列で保持し、code_linesで同じリストに分割されるテスト."""
+    for code_lines in [[], [""], ["", ""], ["def f():", "", "    return 0\f"], ["    "]]:
+        lib_code = create_library_code("test_lib", code_lines)
+
+        assert lib_code.code_lines == code_lines
+        assert isinstance(lib_code.body, str)
+
+
+def test_library_code_share_library_descriptor() -> None:
+    """同じライブラリのコードがライブラリの情報を共有し、インスタンス辞書を持たないテスト."""
+    first = create_library_code("test_lib", ["print(0)"])
+    second = create_library_code("test_lib", ["print(1)"])
+    other = create_library_code("other_lib", ["print(0)"])
+
+    assert first.library is second.library
+    assert first.library is not other.library
+    assert (first.enable, first.library_name, first.relative_path, first.language) == (
+        True,
+        "test_lib",
+        "./test_lib",
+        "python",
+    )
+    assert not hasattr(first, "__dict__")
+
+
+def test_clear_library_descriptor_cache() -> None:
+    """共有オブジェクトを破棄した後は新しい共有オブジェクトが生成され、値による比較は変わらないテスト."""
+    before = create_library_code("test_lib", ["print(0)"])
+
+    clear_library_descriptor_cache()
+    after = create_library_code("test_lib", ["print(0)"])
+
+    assert after.library is not before.library
+    assert after == before
+    assert create_library_code("test_lib", ["print(1)"]).library is after.library
+
+
+def test_library_code_equality_and_pickle() -> None:
+    """値による比較と、プロセス間の受け渡し後もライブラリの情報が共有されるテスト."""
+    lib_code = create_library_code("test_lib", ["print(0)"])
+
+    restored = pickle.loads(pickle.dumps([lib_code, lib_code]))
+
+    assert restored == [lib_code, lib_code]
+    assert restored[0].library is lib_code.library
+    assert lib_code != create_library_code("test_lib", ["print(1)"])
+    assert "code_lines=['print(0)']" in repr(lib_code)
@@ -0,0 +1,106 @@
+"""lib_loader.discoveryモジュールのユニットテスト."""
+
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from snippet.src.lib_loader.dataclass import LanguageData
+from snippet.src.lib_loader.discovery import FILE_DISCOVERY_GIT
+from snippet.src.lib_loader.discovery import FILE_DISCOVERY_WALK
+from snippet.src.lib_loader.discovery import FileDiscoveryData
+from snippet.src.lib_loader.discovery import list_git_files
+from snippet.src.lib_loader.load import get_library_code_path
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="git command is not installed")
+
+LANG_DATA = LanguageData(name="python", extensions=[".py"], excludes=["__pycache__", "_old"])
+GIT_DISCOVERY = FileDiscoveryData(method=FILE_DISCOVERY_GIT)
+
+
+def run_git(repo_dir: Path, *args: str) -> None:
+    """テスト用のリポジトリでgitコマンドを実行する."""
+    subprocess.run(["git", "-C", str(repo_dir), *args], check=True, capture_output=True)
+
+
+def create_repository(repo_dir: Path) -> Path:
+    """テスト用のライブラリを含むgitリポジトリを作成し、ライブラリディレクトリを返す."""
+    lib_dir = repo_dir / "lib"
+    for relative_path in [
+        "a.py",
+        "a/b.py",
+        "a/c/d.py",
+        "a_old/e.py",
+        "__pycache__/f.py",
+        ".hidden/g.py",
+        "h.txt",
+        "z.py",
+    ]:
+        file_path = lib_dir / relative_path
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.write_text("print(0)\n")
+    run_git(repo_dir, "init", "-q")
+    run_git(repo_dir, "add", "-A")
+    return lib_dir
+
+
+def test_git_discovery_same_as_walk() -> None:
+    """すべてのファイルが追跡されている場合、ディレクトリの走査と同じパスが同じ順序で取得されるテスト."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        lib_dir = create_repository(Path(tmpdir))
+
+        git_paths = list(get_library_code_path(str(lib_dir), LANG_DATA, GIT_DISCOVERY))
+        walk_paths = list(get_library_code_path(str(lib_dir), LANG_DATA))
+
+        assert git_paths == walk_paths
+        assert [Path(path).relative_to(lib_dir).as_posix() for path in git_paths] == [
+            "a/b.py",
+            "a/c/d.py",
+            "a.py",
+            "z.py",
+        ]
+
+
+def test_git_discovery_untracked_and_ignored() -> None:
+    """未追跡ファイルはinclude_untrackedの場合のみ含まれ、.gitignoreで除外されたファイルと削除されたファイルは含まれないテスト."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        repo_dir = Path(tmpdir)
+        lib_dir = create_repository(repo_dir)
+        (repo_dir / ".gitignore").write_text("build/\n")
+        (lib_dir / "build").mkdir()
+        (lib_dir / "build" / "generated.py").write_text("print(0)\n")
+        (lib_dir / "untracked.py").write_text("print(0)\n")
+        (lib_dir / "z.py").unlink()
+
+        tracked_paths = list(get_library_code_path(str(lib_dir), LANG_DATA, GIT_DISCOVERY))
+        all_paths = list(
+            get_library_code_path(
+                str(lib_dir), LANG_DATA, FileDiscoveryData(method=FILE_DISCOVERY_GIT, include_untracked=True)
+            )
+        )
+
+        assert [Path(path).name for path in tracked_paths] == ["b.py", "d.py", "a.py"]
+        assert [Path(path).name for path in all_paths] == ["b.py", "d.py", "a.py", "untracked.py"]
+
+
+def test_git_discovery_fallback_to_walk() -> None:
+    """gitリポジトリ外のディレクトリは、ディレクトリの走査で探索されるテスト."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        lib_dir = Path(tmpdir) / "lib"
+        lib_dir.mkdir()
+        (lib_dir / "a.py").write_text("print(0)\n")
+
+        assert list_git_files(str(lib_dir)) is None
+        assert list_git_files(str(lib_dir / "missing")) is None
+        assert list(get_library_code_path(str(lib_dir), LANG_DATA, GIT_DISCOVERY)) == [str(lib_dir / "a.py")]
+
+
+def test_file_discovery_data_from_setting() -> None:
+    """ツール設定から探索方法が読み込まれ、不明な探索方法はwalkになるテスト."""
+    assert FileDiscoveryData.from_setting({}) == FileDiscoveryData(method=FILE_DISCOVERY_WALK)
+    assert FileDiscoveryData.from_setting({"file_discovery": "git", "git_include_untracked": True}) == (
+        FileDiscoveryData(method=FILE_DISCOVERY_GIT, include_untracked=True)
+    )
+    assert FileDiscoveryData.from_setting({"file_discovery": "unknown"}).method == FILE_DISCOVERY_WALK
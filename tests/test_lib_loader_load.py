@@ -0,0 +1,245 @@
+"""lib_loader.loadモジュールのユニットテスト."""
+
+import os
+import random
+import tempfile
+from glob import glob
+from pathlib import Path
+from typing import Optional
+
+from snippet.src.common.file_helper import read_text
+from snippet.src.common.metrics import Metrics
+from snippet.src.lib_loader.check import check_library_code_block
+from snippet.src.lib_loader.check import check_library_code_prefix
+from snippet.src.lib_loader.dataclass import LanguageData
+from snippet.src.lib_loader.dataclass import LibraryCode
+from snippet.src.lib_loader.dataclass import LibrarySettingData
+from snippet.src.lib_loader.load import EXECUTOR_PROCESS
+from snippet.src.lib_loader.load import EXECUTOR_THREAD
+from snippet.src.lib_loader.load import create_library_executor
+from snippet.src.lib_loader.load import extract_library_code
+from snippet.src.lib_loader.load import get_library_code_path
+from snippet.src.lib_loader.load import load_library
+from tests.helper import create_lib_setting
+
+
+def create_library(lib_dir: Path, file_count: int, block_count: int) -> None:
+    """テスト用のライブラリディレクトリを作成する."""
+    lib_dir.mkdir()
+    for file_idx in range(file_count):
+        lines = []
+        for block_idx in range(block_count):
+            lines += [
+                "# lib:begin",
+                f"# [snippet_key] key_{file_idx}_{block_idx}",
+                f"# [snippet_prefix] prefix_{file_idx}_{block_idx}",
+                "# [description] description",
+                f"print({file_idx}, {block_idx})",
+                "# lib:end",
+            ]
+        (lib_dir / f"sample_{file_idx}.py").write_text("\n".join(lines) + "\n")
+
+
+def extract_library_code_reference(lines: list[str], setting_data: LibrarySettingData) -> Optional[list[LibraryCode]]:
+    """check/from_linesを組み合わせた、複数回走査によるコードブロック抽出 (比較用)."""
+    rule = setting_data.rule
+    if not check_library_code_block(lines, rule.lib_code_block_begin, rule.lib_code_block_end):
+        return None
+    begin_index_list = [idx for idx, line in enumerate(lines) if rule.lib_code_block_begin in line]
+    end_index_list = [idx for idx, line in enumerate(lines) if rule.lib_code_block_end in line]
+    prefix_list = [
+        rule.lib_desc_prefix_snippet_key,
+        rule.lib_desc_prefix_snippet_prefix,
+        rule.lib_desc_prefix_description,
+    ]
+    lib_lines_list = [lines[begin + 1 : end] for begin, end in zip(begin_index_list, end_index_list)]
+    return [
+        LibraryCode.from_lines(lib_lines, setting_data)
+        for lib_lines in lib_lines_list
+        if check_library_code_prefix(lib_lines, prefix_list)
+    ]
+
+
+def test_extract_library_code_valid_blocks() -> None:
+    """正しいコードブロックが抽出されるテスト."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        lib_dir = Path(tmpdir) / "lib"
+        create_library(lib_dir, file_count=1, block_count=2)
+        setting_data = LibrarySettingData.from_setting("test_lib", create_lib_setting(str(lib_dir)))
+
+        lib_codes = extract_library_code(str(lib_dir / "sample_0.py"), setting_data)
+
+        assert lib_codes is not None
+        assert [code.snippet_key for code in lib_codes] == ["key_0_0", "key_0_1"]
+        assert lib_codes[1].code_lines == ["print(0, 1)"]
+
+
+def test_extract_library_code_incorrect_placement() -> None:
+    """マーク配置が不正な場合はNoneが返されるテスト."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        code_path = Path(tmpdir) / "sample.py"
+        code_path.write_text("# lib:begin\n# lib:begin\n# lib:end\n# lib:end\n")
+        setting_data = LibrarySettingData.from_setting("test_lib", create_lib_setting(tmpdir))
+
+        assert extract_library_code(str(code_path), setting_data) is None
+
+
+def test_extract_library_code_skip_missing_prefix() -> None:
+    """必須プレフィックスが欠けているブロックがスキップされるテスト."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        code_path = Path(tmpdir) / "sample.py"
+        code_path.write_text(
+            "# lib:begin\n# [snippet_key] key\nprint(0)\n# lib:end\n"
+            "# lib:begin\n# [snippet_key] key2\n# [snippet_prefix] p\n# [description] d\nprint(1)\n# lib:end\n"
+        )
+        setting_data = LibrarySettingData.from_setting("test_lib", create_lib_setting(tmpdir))
+
+        lib_codes = extract_library_code(str(code_path), setting_data)
+
+        assert lib_codes is not None
+        assert [code.snippet_key for code in lib_codes] == ["key2"]
+
+
+def test_extract_library_code_same_as_reference() -> None:
+    """ランダムな入力に対して、複数回走査による抽出と同じ結果になるテスト."""
+    candidates = [
+        "# lib:begin",
+        "# lib:end",
+        "# [snippet_key] key",
+        "# [snippet_prefix] prefix",
+        "# [description] description",
+        "# [snippet_key] [description] both",
+        "print('hello')",
+        "",
+    ]
+    rand = random.Random(0)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        code_path = Path(tmpdir) / "sample.py"
+        setting_data = LibrarySettingData.from_setting("test_lib", create_lib_setting(tmpdir))
+
+        for _ in range(300):
+            lines = [rand.choice(candidates) for _ in range(rand.randint(0, 12))]
+            code_path.write_text("".join(f"{line}\n" for line in lines))
+
+            result = extract_library_code(str(code_path), setting_data)
+
+            assert result == extract_library_code_reference(lines, setting_data)
+
+
+def test_extract_library_code_prefilter_same_as_reference() -> None:
+    """改行の種類やマークの位置によらず、全行を読み込む抽出と同じ結果になるテスト."""
+    candidates = [
+        "# lib:begin",
+        "# lib:end",
+        "# [snippet_key] key",
+        "# [snippet_prefix] prefix",
+        "# [description] description",
+        "print('こんにちは')",
+        "",
+    ]
+    newlines = ["\n", "\r\n", "\r"]
+    rand = random.Random(1)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        code_path = Path(tmpdir) / "sample.py"
+        setting_data = LibrarySettingData.from_setting("test_lib", create_lib_setting(tmpdir))
+
+        for _ in range(300):
+            lines = [rand.choice(candidates) for _ in range(rand.randint(0, 12))]
+            code_path.write_bytes("".join(f"{line}{rand.choice(newlines)}" for line in lines).encode("utf-8"))
+
+            result = extract_library_code(str(code_path), setting_data)
+
+            # テキストモードでの読み込み (改行の種類によらず行に分割される)
+            expected = extract_library_code_reference(read_text(code_path), setting_data)
+            assert result == expected
+
+
+def test_create_library_executor_serial() -> None:
+    """ワーカー数が1の場合はExecutorを生成しないテスト."""
+    assert create_library_executor(1) is None
+
+
+def test_create_library_executor_thread() -> None:
+    """スレッド並列のExecutorを生成するテスト."""
+    executor = create_library_executor(2, EXECUTOR_THREAD)
+    assert executor is not None
+    executor.shutdown()
+
+
+def test_load_library_parallel_keeps_order() -> None:
+    """並列実行した場合も逐次実行と同じ順序で読み込まれるテスト."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmpdir_path = Path(tmpdir)
+        create_library(tmpdir_path / "lib1", file_count=8, block_count=3)
+        create_library(tmpdir_path / "lib2", file_count=4, block_count=2)
+        library_settings = {
+            "lib1": create_lib_setting(str(tmpdir_path / "lib1")),
+            "lib2": create_lib_setting(str(tmpdir_path / "lib2")),
+        }
+
+        serial_codes = load_library(library_settings)
+        thread_codes = load_library(library_settings, max_workers=4, executor_type=EXECUTOR_THREAD)
+        process_codes = load_library(library_settings, max_workers=2, executor_type=EXECUTOR_PROCESS)
+
+        assert len(serial_codes) == 8 * 3 + 4 * 2
+        assert thread_codes == serial_codes
+        assert process_codes == serial_codes
+
+
+def test_get_library_code_path_filter() -> None:
+    """拡張子と除外設定でファイルが絞り込まれるテスト."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        lib_dir = Path(tmpdir)
+        (lib_dir / "pkg" / "__pycache__").mkdir(parents=True)
+        (lib_dir / ".git").mkdir()
+        (lib_dir / "b.py").write_text("")
+        (lib_dir / "a.py").write_text("")
+        (lib_dir / "note.txt").write_text("")
+        (lib_dir / ".hidden.py").write_text("")
+        (lib_dir / "pkg" / "c.py").write_text("")
+        (lib_dir / "pkg" / "c_old.py").write_text("")
+        (lib_dir / "pkg" / "__pycache__" / "c.py").write_text("")
+        (lib_dir / ".git" / "d.py").write_text("")
+        lang_data = LanguageData(name="python", extensions=[".py"], excludes=["__pycache__", "_old"])
+
+        code_path_list = list(get_library_code_path(str(lib_dir), lang_data))
+
+        assert code_path_list == [
+            os.path.join(str(lib_dir), "a.py"),
+            os.path.join(str(lib_dir), "b.py"),
+            os.path.join(str(lib_dir), "pkg", "c.py"),
+        ]
+
+
+def test_get_library_code_path_same_as_glob() -> None:
+    """globによる探索と同じファイルが取得されるテスト."""
+    lib_dirpath = str(Path(__file__).parent / "sample_data")
+    lang_data = LanguageData(name="python", extensions=[".py"], excludes=["__pycache__"])
+
+    code_path_list = list(get_library_code_path(lib_dirpath, lang_data))
+
+    expected = [
+        path
+        for path in glob(os.path.join(lib_dirpath, "**"), recursive=True)
+        if os.path.splitext(path)[-1] == ".py" and "__pycache__" not in path
+    ]
+    assert sorted(code_path_list) == sorted(expected)
+    assert len(code_path_list) > 0
+
+
+def test_load_library_disabled_skips_scan() -> None:
+    """無効なライブラリはファイルを走査せず、削除用のコードのみ返されるテスト."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        lib_setting = create_lib_setting(os.path.join(tmpdir, "missing"))
+        lib_setting["enable"] = False
+        metrics = Metrics()
+
+        lib_codes = load_library({"disabled_lib": lib_setting}, metrics=metrics)
+
+        assert [(code.enable, code.library_name, code.language) for code in lib_codes] == [
+            (False, "disabled_lib", "python")
+        ]
+        assert metrics.stages["discover"].counters == {"libraries_skipped": 1}
+        assert "extract" not in metrics.stages
@@ -0,0 +1,66 @@
+"""common.metricsモジュールのユニットテスト."""
+
+import tempfile
+from pathlib import Path
+
+from snippet.src.common.file_helper import read_json
+from snippet.src.common.metrics import Metrics
+from snippet.src.common.metrics import count_metrics
+from snippet.src.common.metrics import measure_stage
+from snippet.src.lib_loader.load import load_library
+from tests.helper import create_lib_setting
+
+
+def test_metrics_accumulate_stage() -> None:
+    """同じ段階の処理時間とカウンタが加算されるテスト."""
+    metrics = Metrics()
+    with metrics.stage("extract"):
+        pass
+    with metrics.stage("extract"):
+        pass
+    metrics.count("extract", "files_read", 2)
+    metrics.count("extract", "files_read")
+
+    result = metrics.to_dict()
+
+    assert [stage["name"] for stage in result["stages"]] == ["extract"]
+    assert result["stages"][0]["counters"] == {"files_read": 3}
+    assert result["stages"][0]["seconds"] >= 0.0
+
+
+def test_metrics_disabled() -> None:
+    """metricsがNoneの場合は何も記録されないテスト."""
+    with measure_stage(None, "extract"):
+        count_metrics(None, "extract", "files_read")
+
+
+def test_metrics_write_json() -> None:
+    """計測結果がjsonファイルに書き込まれるテスト."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        json_path = Path(tmpdir) / "out" / "metrics.json"
+        metrics = Metrics()
+        with measure_stage(metrics, "setting"):
+            pass
+
+        metrics.write_json(json_path)
+
+        assert read_json(json_path)["stages"][0]["name"] == "setting"
+
+
+def test_load_library_metrics_counters() -> None:
+    """ライブラリ読み込みの段階でカウンタが記録されるテスト."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        lib_dir = Path(tmpdir)
+        (lib_dir / "sample.py").write_text(
+            "# lib:begin\n# [snippet_key] key\n# [snippet_prefix] p\n# [description] d\nprint(0)\n# lib:end\n"
+        )
+        (lib_dir / "empty.py").write_text("")
+        metrics = Metrics()
+
+        load_library({"test_lib": create_lib_setting(tmpdir)}, metrics=metrics)
+
+        stages = {stage.name: stage for stage in metrics.stages.values()}
+        assert stages["discover"].counters["files_scanned"] == 2
+        assert stages["extract"].counters["files_read"] == 2
+        assert stages["extract"].counters["blocks_extracted"] == 1
+        assert stages["extract"].counters["bytes_read"] == (lib_dir / "sample.py").stat().st_size
@@ -1,7 +1,10 @@
 """パス展開機能のユニットテスト"""
 
+import shutil
+import tempfile
 from pathlib import Path
 
+from snippet.src.common.file_helper import clear_repo_root_cache
 from snippet.src.common.file_helper import expand_yaml_templates
 from snippet.src.common.file_helper import find_repo_root
 
@@ -105,3 +108,24 @@ def test_expand_yaml_templates_with_complex_structure() -> None:
     assert expanded["libraries"]["lib1"]["excludes"] == ["__pycache__"]
     assert expanded["libraries"]["lib2"]["enabled"] is True
     assert expanded["count"] == 2
+
+
+def test_find_repo_root_cache_sibling_directory() -> None:
+    """兄弟ディレクトリからの検索でキャッシュが利用されることを確認"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        repo_dir = Path(tmpdir).resolve() / "repo"
+        (repo_dir / ".git").mkdir(parents=True)
+        (repo_dir / "src" / "lib1").mkdir(parents=True)
+        (repo_dir / "src" / "lib2").mkdir(parents=True)
+        clear_repo_root_cache()
+
+        assert find_repo_root(repo_dir / "src" / "lib1") == repo_dir
+
+        # 一度遡ったディレクトリは.gitを確認せずに結果を返す
+        shutil.rmtree(repo_dir / ".git")
+        assert find_repo_root(repo_dir / "src") == repo_dir
+        assert find_repo_root(repo_dir / "src" / "lib2") == repo_dir
+
+        # キャッシュを破棄すると再検索される
+        clear_repo_root_cache()
+        assert find_repo_root(repo_dir / "src" / "lib2") != repo_dir
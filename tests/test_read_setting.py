@@ -0,0 +1,62 @@
+"""io.read_settingモジュールのデバイス選択のユニットテスト."""
+
+import os
+
+from snippet.src.io.read_setting import DEVICE_ENV
+from snippet.src.io.read_setting import match_device_hostname
+from snippet.src.io.read_setting import resolve_device
+
+
+def create_setting_data(**device_hostnames: object) -> dict:
+    """テスト用の設定データを作成する (デバイス名: hostnameの値)."""
+    devices = {}
+    for device_name, hostname in device_hostnames.items():
+        device_setting: dict = {"snippet_path": {"vscode": "none"}}
+        if hostname is not None:
+            device_setting["hostname"] = hostname
+        devices[device_name] = device_setting
+    return {"devices": devices}
+
+
+def test_match_device_hostname() -> None:
+    """hostnameの文字列、リスト、ワイルドカードが一致するテスト."""
+    hostnames = {"my-laptop.example.com", "my-laptop"}
+
+    assert match_device_hostname({"hostname": "MY-LAPTOP"}, hostnames)
+    assert match_device_hostname({"hostname": ["desktop", "my-*"]}, hostnames)
+    assert not match_device_hostname({"hostname": "desktop"}, hostnames)
+    assert not match_device_hostname({}, hostnames)
+
+
+def test_resolve_device_argument_and_env() -> None:
+    """--deviceの指定が環境変数より優先され、存在しないデバイスはNoneになるテスト."""
+    setting_data = create_setting_data(laptop=None, desktop=None)
+    prev_env = os.environ.get(DEVICE_ENV)
+    try:
+        os.environ[DEVICE_ENV] = "desktop"
+        assert resolve_device(setting_data) == "desktop"
+        assert resolve_device(setting_data, "laptop") == "laptop"
+        assert resolve_device(setting_data, "unknown") is None
+
+        os.environ[DEVICE_ENV] = "unknown"
+        assert resolve_device(setting_data) is None
+    finally:
+        if prev_env is None:
+            os.environ.pop(DEVICE_ENV, None)
+        else:
+            os.environ[DEVICE_ENV] = prev_env
+
+
+def test_resolve_device_hostname() -> None:
+    """hostnameが1つのデバイスのみに一致する場合にそのデバイスが選択されるテスト."""
+    prev_env = os.environ.pop(DEVICE_ENV, None)
+    try:
+        assert resolve_device(create_setting_data(laptop="*", desktop="no-such-host-*")) == "laptop"
+        assert resolve_device(create_setting_data(laptop=None)) == "laptop"
+        # 複数一致、または一致しない場合は、端末がなければ選択できない (pytestの標準入力は端末ではない)
+        assert resolve_device(create_setting_data(laptop="*", desktop="*")) is None
+        assert resolve_device(create_setting_data(laptop=None, desktop=None)) is None
+        assert resolve_device({"devices": {}}) is None
+    finally:
+        if prev_env is not None:
+            os.environ[DEVICE_ENV] = prev_env
@@ -0,0 +1,53 @@
+"""CLIの起動時にインポートされるモジュールのテスト (-X importtimeで計測)."""
+
+import tempfile
+from pathlib import Path
+
+from benchmarks.startup import measure_startup
+from benchmarks.startup import parse_importtime
+
+# 使用方法の表示やclientモードでは不要な、インポートに時間がかかるモジュール
+HEAVY_MODULES = {
+    "yaml",
+    "jinja2",
+    "concurrent.futures",
+    "snippet.src.io.read_setting",
+    "snippet.src.lib_loader.load",
+    "snippet.src.update_snippet.update",
+    "snippet.src.watch.session",
+}
+
+
+def test_parse_importtime() -> None:
+    """-X importtimeの出力からモジュール名と累積インポート時間を取得するテスト."""
+    stderr = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       100 |        100 |   snippet.setting\n"
+        "import time:       200 |        300 | snippet\n"
+        "other output\n"
+    )
+
+    imported_modules, top_level_modules = parse_importtime(stderr)
+
+    assert imported_modules == {"snippet.setting": 100, "snippet": 300}
+    assert top_level_modules == ("snippet",)
+
+
+def test_usage_startup_skips_heavy_modules() -> None:
+    """使用方法の表示ではyaml, jinja2, ライブラリ読み込み等がインポートされないテスト."""
+    result = measure_startup([])
+
+    assert result.returncode == 0
+    assert "snippet.src.main" in result.imported_modules
+    assert HEAVY_MODULES.isdisjoint(result.imported_modules)
+
+
+def test_client_startup_skips_heavy_modules() -> None:
+    """clientモードではyaml, jinja2, ライブラリ読み込み等がインポートされないテスト."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        socket_path = Path(tmpdir) / "daemon.sock"
+        result = measure_startup(["client", "status"], env={"SNIPPET_DAEMON_SOCKET": str(socket_path)})
+
+    assert result.returncode != 0
+    assert "snippet.src.daemon.client" in result.imported_modules
+    assert HEAVY_MODULES.isdisjoint(result.imported_modules)
@@ -3,6 +3,8 @@
 import tempfile
 from pathlib import Path
 
+from freezegun import freeze_time
+
 from snippet.src.update_snippet.backup import backup_snippet_files
 
 
@@ -261,3 +263,214 @@ def test_backup_snippet_files_overwrites_existing_backup() -> None:
 
         finally:
             backup_module.WORKSPACE_DIRPATH = original_workspace
+
+
+def test_backup_snippet_files_incremental() -> None:
+    """incremental方式で変化したファイルのみコピーされるテスト."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmpdir_path = Path(tmpdir)
+
+        # テスト用のスニペットディレクトリを作成
+        vscode_snippet_dir = tmpdir_path / "vscode_snippets"
+        vscode_snippet_dir.mkdir()
+        (vscode_snippet_dir / "python.json").write_text('{"test": "data"}')
+        (vscode_snippet_dir / "cpp.json").write_text('{"test": "data"}')
+
+        # ワークスペースディレクトリを作成
+        workspace_dir = tmpdir_path / "workspace"
+        workspace_dir.mkdir()
+
+        # 設定を準備
+        tool_setting = {"backup_snippet_dirpath": ".backup_snippet", "backup_mode": "incremental"}
+        device_setting = {"snippet_path": {"vscode": str(vscode_snippet_dir)}}
+
+        # バックアップディレクトリのパスを変更するため、一時的にモジュールの設定を変更
+        import snippet.src.update_snippet.backup as backup_module
+
+        original_workspace = backup_module.WORKSPACE_DIRPATH
+        try:
+            backup_module.WORKSPACE_DIRPATH = workspace_dir
+            backup_dir = workspace_dir / ".backup_snippet" / "vscode"
+
+            backup_snippet_files(tool_setting, device_setting)
+            assert (backup_dir / "cpp.json").exists()
+
+            # python.jsonのみ変更し、cpp.jsonは削除する
+            (vscode_snippet_dir / "python.json").write_text('{"test": "new_data!"}')
+            (vscode_snippet_dir / "cpp.json").unlink()
+            (vscode_snippet_dir / "rust.json").write_text('{"test": "data"}')
+            backup_snippet_files(tool_setting, device_setting)
+
+            assert "new_data" in (backup_dir / "python.json").read_text()
+            assert (backup_dir / "rust.json").exists()
+            assert not (backup_dir / "cpp.json").exists()
+
+        finally:
+            backup_module.WORKSPACE_DIRPATH = original_workspace
+
+
+def test_backup_snippet_files_incremental_missing_snippet_dir() -> None:
+    """incremental方式でスニペットディレクトリが存在しない場合はバックアップが残り、空になったディレクトリは削除されるテスト."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmpdir_path = Path(tmpdir)
+
+        # テスト用のスニペットディレクトリを作成
+        vscode_snippet_dir = tmpdir_path / "vscode_snippets"
+        (vscode_snippet_dir / "snippets").mkdir(parents=True)
+        (vscode_snippet_dir / "python.json").write_text('{"test": "data"}')
+        (vscode_snippet_dir / "snippets" / "cpp.json").write_text('{"test": "data"}')
+
+        # ワークスペースディレクトリを作成
+        workspace_dir = tmpdir_path / "workspace"
+        workspace_dir.mkdir()
+
+        # 設定を準備
+        tool_setting = {"backup_snippet_dirpath": ".backup_snippet", "backup_mode": "incremental"}
+        device_setting = {"snippet_path": {"vscode": str(vscode_snippet_dir)}}
+
+        # バックアップディレクトリのパスを変更するため、一時的にモジュールの設定を変更
+        import snippet.src.update_snippet.backup as backup_module
+
+        original_workspace = backup_module.WORKSPACE_DIRPATH
+        try:
+            backup_module.WORKSPACE_DIRPATH = workspace_dir
+            backup_dir = workspace_dir / ".backup_snippet" / "vscode"
+
+            backup_snippet_files(tool_setting, device_setting)
+            assert (backup_dir / "snippets" / "cpp.json").exists()
+
+            # サブディレクトリのファイルを削除すると、空になったディレクトリもバックアップから削除される
+            (vscode_snippet_dir / "snippets" / "cpp.json").unlink()
+            backup_snippet_files(tool_setting, device_setting)
+            assert not (backup_dir / "snippets").exists()
+            assert (backup_dir / "python.json").exists()
+
+            # スニペットディレクトリが存在しない場合は、前回のバックアップを残す
+            (vscode_snippet_dir / "python.json").unlink()
+            (vscode_snippet_dir / "snippets").rmdir()
+            vscode_snippet_dir.rmdir()
+            backup_snippet_files(tool_setting, device_setting)
+            assert (backup_dir / "python.json").exists()
+
+        finally:
+            backup_module.WORKSPACE_DIRPATH = original_workspace
+
+
+def test_backup_snippet_files_only_targets() -> None:
+    """backup_only_targetsが有効な場合に更新対象の言語のみバックアップされるテスト."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmpdir_path = Path(tmpdir)
+
+        # テスト用のスニペットディレクトリを作成
+        vscode_snippet_dir = tmpdir_path / "vscode_snippets"
+        vscode_snippet_dir.mkdir()
+        (vscode_snippet_dir / "python.json").write_text('{"test": "data"}')
+        (vscode_snippet_dir / "cpp.json").write_text('{"test": "data"}')
+
+        # ワークスペースディレクトリを作成
+        workspace_dir = tmpdir_path / "workspace"
+        workspace_dir.mkdir()
+
+        # 設定を準備
+        tool_setting = {"backup_snippet_dirpath": ".backup_snippet", "backup_only_targets": True}
+        device_setting = {"snippet_path": {"vscode": str(vscode_snippet_dir)}}
+
+        # バックアップディレクトリのパスを変更するため、一時的にモジュールの設定を変更
+        import snippet.src.update_snippet.backup as backup_module
+
+        original_workspace = backup_module.WORKSPACE_DIRPATH
+        try:
+            backup_module.WORKSPACE_DIRPATH = workspace_dir
+            backup_snippet_files(tool_setting, device_setting, ["python", "javascript"])
+
+            backup_dir = workspace_dir / ".backup_snippet" / "vscode"
+            assert (backup_dir / "python.json").exists()
+            assert not (backup_dir / "cpp.json").exists()
+            assert not (backup_dir / "javascript.json").exists()
+
+        finally:
+            backup_module.WORKSPACE_DIRPATH = original_workspace
+
+
+def test_backup_snippet_files_generation() -> None:
+    """generation方式で世代ごとにバックアップされ、変化していないファイルはハードリンクされるテスト."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmpdir_path = Path(tmpdir)
+
+        # テスト用のスニペットディレクトリを作成
+        vscode_snippet_dir = tmpdir_path / "vscode_snippets"
+        vscode_snippet_dir.mkdir()
+        (vscode_snippet_dir / "python.json").write_text('{"test": "data"}')
+        (vscode_snippet_dir / "cpp.json").write_text('{"test": "data"}')
+
+        # ワークスペースディレクトリを作成
+        workspace_dir = tmpdir_path / "workspace"
+        workspace_dir.mkdir()
+
+        # 設定を準備
+        tool_setting = {
+            "backup_snippet_dirpath": ".backup_snippet",
+            "backup_mode": "generation",
+            "backup_generations": 2,
+        }
+        device_setting = {"snippet_path": {"vscode": str(vscode_snippet_dir)}}
+
+        # バックアップディレクトリのパスを変更するため、一時的にモジュールの設定を変更
+        import snippet.src.update_snippet.backup as backup_module
+
+        original_workspace = backup_module.WORKSPACE_DIRPATH
+        try:
+            backup_module.WORKSPACE_DIRPATH = workspace_dir
+            backup_dir = workspace_dir / ".backup_snippet"
+
+            with freeze_time("2026-01-01 00:00:00"):
+                backup_snippet_files(tool_setting, device_setting)
+            (vscode_snippet_dir / "python.json").write_text('{"test": "new_data!"}')
+            with freeze_time("2026-01-02 00:00:00"):
+                backup_snippet_files(tool_setting, device_setting)
+
+            first_dir = backup_dir / "20260101-000000-000000" / "vscode"
+            second_dir = backup_dir / "20260102-000000-000000" / "vscode"
+            assert "new_data" not in (first_dir / "python.json").read_text()
+            assert "new_data" in (second_dir / "python.json").read_text()
+            # 変化していないファイルは前世代とハードリンクされている
+            assert (first_dir / "cpp.json").stat().st_ino == (second_dir / "cpp.json").stat().st_ino
+
+            # 保持する世代数を超えた古い世代は削除される
+            with freeze_time("2026-01-03 00:00:00"):
+                backup_snippet_files(tool_setting, device_setting)
+            assert sorted(path.name for path in backup_dir.iterdir()) == [
+                "20260102-000000-000000",
+                "20260103-000000-000000",
+            ]
+
+        finally:
+            backup_module.WORKSPACE_DIRPATH = original_workspace
+
+
+def test_backup_snippet_files_mode_none() -> None:
+    """backup_modeがnoneの場合はバックアップが作成されないテスト."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmpdir_path = Path(tmpdir)
+
+        vscode_snippet_dir = tmpdir_path / "vscode_snippets"
+        vscode_snippet_dir.mkdir()
+        (vscode_snippet_dir / "python.json").write_text('{"test": "data"}')
+
+        workspace_dir = tmpdir_path / "workspace"
+        workspace_dir.mkdir()
+
+        tool_setting = {"backup_snippet_dirpath": ".backup_snippet", "backup_mode": "none"}
+        device_setting = {"snippet_path": {"vscode": str(vscode_snippet_dir)}}
+
+        import snippet.src.update_snippet.backup as backup_module
+
+        original_workspace = backup_module.WORKSPACE_DIRPATH
+        try:
+            backup_module.WORKSPACE_DIRPATH = workspace_dir
+            backup_snippet_files(tool_setting, device_setting)
+
+            assert not (workspace_dir / ".backup_snippet").exists()
+
+        finally:
+            backup_module.WORKSPACE_DIRPATH = original_workspace
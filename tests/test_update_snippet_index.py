@@ -0,0 +1,50 @@
+"""update_snippet.indexモジュールのユニットテスト."""
+
+from snippet.src.update_snippet.index import IndexedSnippetData
+from snippet.src.update_snippet.index import get_key_owner
+
+
+def test_get_key_owner() -> None:
+    """最初の"@"より前の部分が所有者になるテスト."""
+    assert get_key_owner("my_lib@func") == "my_lib"
+    assert get_key_owner("my_lib@sub@func") == "my_lib"
+    assert get_key_owner("user_snippet") == ""
+
+
+def test_remove_library_only_target_keys() -> None:
+    """指定したライブラリのスニペットのみ削除されるテスト."""
+    snippet_data = {
+        "lib_a@func1": {"prefix": "f1"},
+        "lib_b@func": {"prefix": "f"},
+        "lib_a@func2": {"prefix": "f2"},
+        "user_snippet": {"prefix": "u"},
+    }
+    indexed_snippet_data = IndexedSnippetData(snippet_data)
+
+    removed_count = indexed_snippet_data.remove_library("lib_a")
+
+    assert removed_count == 2
+    assert list(snippet_data.keys()) == ["lib_b@func", "user_snippet"]
+    assert indexed_snippet_data.library_keys("lib_a") == []
+
+
+def test_remove_library_name_with_separator() -> None:
+    """区切り文字を含むライブラリ名でも前方一致するキーのみ削除されるテスト."""
+    snippet_data = {"lib@sub@func": {}, "lib@func": {}, "lib@subx@func": {}}
+    indexed_snippet_data = IndexedSnippetData(snippet_data)
+
+    assert indexed_snippet_data.remove_library("lib@sub") == 1
+    assert list(snippet_data.keys()) == ["lib@func", "lib@subx@func"]
+    assert indexed_snippet_data.library_keys("lib") == ["lib@func", "lib@subx@func"]
+
+
+def test_set_snippet_updates_index() -> None:
+    """追加したスニペットが索引に反映されるテスト."""
+    indexed_snippet_data = IndexedSnippetData({})
+
+    indexed_snippet_data.set_snippet("lib_a@func", {"prefix": "f"})
+    indexed_snippet_data.set_snippet("lib_a@func", {"prefix": "g"})
+
+    assert indexed_snippet_data.library_keys("lib_a") == ["lib_a@func"]
+    assert indexed_snippet_data.remove_library("lib_a") == 1
+    assert indexed_snippet_data.data == {}
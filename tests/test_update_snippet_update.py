@@ -1,9 +1,20 @@
 """update_snippet.updateモジュールのユニットテスト."""
 
+import json
+import os
+import random
 import tempfile
+from collections import defaultdict
+from copy import deepcopy
 from pathlib import Path
 
+from snippet.src.common.groupby import groupby
 from snippet.src.lib_loader.dataclass import LibraryCode
+from snippet.src.lib_loader.dataclass import LibrarySettingData
+from snippet.src.update_snippet.update import delete_latest_library_snippet
+from snippet.src.update_snippet.update import plan_snippet_targets
+from snippet.src.update_snippet.update import update_language_snippet
+from snippet.src.update_snippet.update import update_library_snippet
 from snippet.src.update_snippet.update import update_snippet
 
 
@@ -257,3 +268,232 @@ def test_update_snippet_multiple_languages() -> None:
         # 両方のファイルが更新されたことを確認
         assert (vscode_snippet_dir / "python.json").exists()
         assert (vscode_snippet_dir / "javascript.json").exists()
+
+
+def test_update_snippet_skip_unchanged_file() -> None:
+    """内容が変化しない場合はスニペットファイルの書き込みがスキップされるテスト."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmpdir_path = Path(tmpdir)
+
+        # テスト用のスニペットディレクトリを作成
+        vscode_snippet_dir = tmpdir_path / "vscode_snippets"
+        vscode_snippet_dir.mkdir()
+        (vscode_snippet_dir / "python.json").write_text("{}")
+
+        # 設定を準備
+        device_setting = {"snippet_path": {"vscode": str(vscode_snippet_dir)}}
+
+        # テスト用のライブラリコードを作成
+        lib_codes = [
+            LibraryCode(
+                enable=True,
+                library_name="test_lib",
+                relative_path="./test_lib",
+                language="python",
+                snippet_key="test_snippet",
+                snippet_prefix="ts",
+                description="Test snippet",
+                code_lines=["print('hello')"],
+            )
+        ]
+
+        # 1回目は書き込まれ、2回目は内容が同じためスキップされることを確認
+        first_result = update_snippet(device_setting, lib_codes)
+        first_mtime_ns = (vscode_snippet_dir / "python.json").stat().st_mtime_ns
+        second_result = update_snippet(device_setting, lib_codes)
+
+        assert first_result.updated == 1
+        assert first_result.unchanged == 0
+        assert second_result.updated == 0
+        assert second_result.unchanged == 1
+        assert (vscode_snippet_dir / "python.json").stat().st_mtime_ns == first_mtime_ns
+
+
+def create_library_code(library_name: str, snippet_key: str, enable: bool = True) -> LibraryCode:
+    """テスト用のライブラリコードを作成する."""
+    return LibraryCode(
+        enable=enable,
+        library_name=library_name,
+        relative_path=f"./{library_name}",
+        language="python",
+        snippet_key=snippet_key,
+        snippet_prefix=snippet_key,
+        description=f"{library_name} {snippet_key}",
+        code_lines=[f"print('{snippet_key}')"],
+    )
+
+
+def update_language_snippet_reference(snippet_data: defaultdict, lang_codes: list[LibraryCode]) -> defaultdict:
+    """ライブラリごとに削除と追加を繰り返す更新処理 (比較用)."""
+    snippet_data = deepcopy(snippet_data)
+    lib_groupby_codes = groupby(lang_codes, lambda code: code.library_name)
+    for lib_name in lib_groupby_codes.keys():
+        snippet_data = delete_latest_library_snippet(snippet_data, lib_name)
+    for lib_codes in lib_groupby_codes.values():
+        snippet_data = update_library_snippet(deepcopy(snippet_data), lib_codes)
+    return snippet_data
+
+
+def test_update_language_snippet_same_as_reference() -> None:
+    """ランダムな入力に対して、ライブラリごとの削除と追加を繰り返す更新処理と同じ結果になるテスト."""
+    rand = random.Random(0)
+    library_names = ["lib_a", "lib_b", "lib_c", "lib"]
+
+    for _ in range(200):
+        snippet_data = defaultdict(
+            dict,
+            {
+                f"{rand.choice(library_names + ['user'])}@key_{idx}": {"prefix": str(idx), "body": [str(idx)]}
+                for idx in range(rand.randint(0, 10))
+            },
+        )
+        lang_codes = [
+            create_library_code(rand.choice(library_names), f"key_{rand.randint(0, 10)}", rand.random() > 0.2)
+            for _ in range(rand.randint(0, 8))
+        ]
+        original = deepcopy(snippet_data)
+
+        result = update_language_snippet(snippet_data, lang_codes)
+
+        expected = update_language_snippet_reference(snippet_data, lang_codes)
+        assert list(result.items()) == list(expected.items())
+        assert snippet_data == original
+
+
+def test_update_language_snippet_replace_library() -> None:
+    """更新対象のライブラリのスニペットのみ置き換えられるテスト."""
+    snippet_data = defaultdict(
+        dict,
+        {
+            "lib_a@old": {"prefix": "old"},
+            "user@mine": {"prefix": "mine"},
+            "lib_b@keep": {"prefix": "keep"},
+        },
+    )
+
+    result = update_language_snippet(snippet_data, [create_library_code("lib_a", "new")])
+
+    assert list(result.keys()) == ["user@mine", "lib_b@keep", "lib_a@new"]
+    assert result["lib_a@new"]["body"] == ["print('new')"]
+
+
+def test_update_language_snippet_purge_library() -> None:
+    """削除用のコードで無効なライブラリのスニペットのみ削除されるテスト."""
+    setting_data = LibrarySettingData.from_setting(
+        "lib_a",
+        {
+            "enable": False,
+            "description": "",
+            "relative_path": "./lib_a",
+            "language": {"name": "python", "extensions": [".py"], "excludes": []},
+            "library_code_block": {"begin": "lib:begin", "end": "lib:end"},
+            "library_description_prefix": {"snippet_key": "[k]", "snippet_prefix": "[p]", "description": "[d]"},
+        },
+    )
+    snippet_data = defaultdict(dict, {"lib_a@old": {"prefix": "old"}, "user@mine": {"prefix": "mine"}})
+
+    result = update_language_snippet(snippet_data, [LibraryCode.purge(setting_data)])
+
+    assert list(result.keys()) == ["user@mine"]
+
+
+def test_plan_snippet_targets() -> None:
+    """言語とエディタの組み合わせごとに更新対象が列挙され、同じファイルはまとめられるテスト."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        device_setting = {
+            "snippet_path": {
+                "vscode": str(Path(tmpdir) / "vscode"),
+                "cursor": str(Path(tmpdir) / "cursor"),
+                "windsurf": str(Path(tmpdir) / "vscode"),
+                "other": "none",
+            }
+        }
+        lib_codes = [create_library_code("lib_a", "py"), create_library_code("lib_a", "py2")]
+        lib_codes.append(
+            LibraryCode(
+                enable=True,
+                library_name="lib_a",
+                relative_path="./lib_a",
+                language="javascript",
+                snippet_key="js",
+                snippet_prefix="js",
+                description="js",
+                code_lines=["console.log(0)"],
+            )
+        )
+
+        targets = plan_snippet_targets(device_setting, lib_codes)
+
+        assert [(target.editor_names, target.snippet_path.name) for target in targets] == [
+            (["vscode", "windsurf"], "python.json"),
+            (["cursor"], "python.json"),
+            (["vscode", "windsurf"], "javascript.json"),
+            (["cursor"], "javascript.json"),
+        ]
+        assert [len(target.lang_codes) for target in targets] == [2, 2, 1, 1]
+
+
+def test_update_snippet_concurrent_same_as_serial() -> None:
+    """並行して更新した場合も逐次更新と同じ内容になるテスト."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmpdir_path = Path(tmpdir)
+        lib_codes = [create_library_code(f"lib_{idx % 3}", f"key_{idx}") for idx in range(10)]
+        results = {}
+        for max_workers in (1, 4):
+            snippet_dirs = {name: tmpdir_path / f"{name}_{max_workers}" for name in ("vscode", "cursor", "windsurf")}
+            for snippet_dir in snippet_dirs.values():
+                snippet_dir.mkdir()
+                (snippet_dir / "python.json").write_text('{"user@mine": {"prefix": "mine"}}')
+            device_setting = {"snippet_path": {name: str(path) for name, path in snippet_dirs.items()}}
+
+            update_result = update_snippet(device_setting, lib_codes, max_workers=max_workers)
+
+            assert update_result.updated == 3
+            assert [target.target.editor_names for target in update_result.targets] == [
+                ["vscode"],
+                ["cursor"],
+                ["windsurf"],
+            ]
+            results[max_workers] = [(path / "python.json").read_text() for path in snippet_dirs.values()]
+
+        assert results[1] == results[4]
+
+
+def test_update_snippet_fsync_symlink() -> None:
+    """fsyncを有効にした場合も更新され、シンボリックリンクのスニペットファイルはリンク先が更新されるテスト."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmpdir_path = Path(tmpdir)
+        (tmpdir_path / "dotfiles").mkdir()
+        (tmpdir_path / "dotfiles" / "python.json").write_text('{"user@mine": {"prefix": "mine"}}')
+        (tmpdir_path / "vscode").mkdir()
+        (tmpdir_path / "vscode" / "python.json").symlink_to(tmpdir_path / "dotfiles" / "python.json")
+        device_setting = {"snippet_path": {"vscode": str(tmpdir_path / "vscode")}}
+
+        update_result = update_snippet(device_setting, [create_library_code("lib", "key")], fsync=True)
+
+        assert update_result.updated == 1
+        assert update_result.is_success
+        assert (tmpdir_path / "vscode" / "python.json").is_symlink()
+        assert sorted(json.loads((tmpdir_path / "dotfiles" / "python.json").read_text())) == ["lib@key", "user@mine"]
+        assert os.listdir(tmpdir_path / "dotfiles") == ["python.json"]
+
+
+def test_update_snippet_report_failed_target() -> None:
+    """読み込みに失敗したスニペットファイルがあっても他のファイルが更新されるテスト."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmpdir_path = Path(tmpdir)
+        (tmpdir_path / "vscode").mkdir()
+        (tmpdir_path / "vscode" / "python.json").write_text("{broken")
+        (tmpdir_path / "cursor").mkdir()
+        (tmpdir_path / "cursor" / "python.json").write_text("{}")
+        device_setting = {
+            "snippet_path": {"vscode": str(tmpdir_path / "vscode"), "cursor": str(tmpdir_path / "cursor")}
+        }
+
+        result = update_snippet(device_setting, [create_library_code("lib_a", "key")], max_workers=2)
+
+        assert (result.updated, result.unchanged, result.failed) == (1, 0, 1)
+        assert not result.is_success
+        assert result.targets[0].error is not None
+        assert (tmpdir_path / "vscode" / "python.json").read_text() == "{broken"
+        assert "lib_a@key" in (tmpdir_path / "cursor" / "python.json").read_text()
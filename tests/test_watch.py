@@ -0,0 +1,172 @@
+"""watchモジュールのユニットテスト."""
+
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+from snippet.src.watch.session import LibraryWatchSession
+from snippet.src.watch.watcher import PollingWatcher
+from snippet.src.watch.watcher import run_watch_loop
+from tests.helper import create_code
+from tests.helper import create_lib_setting
+
+
+def bump_mtime(file_path: Path) -> None:
+    """ファイルの更新時刻を確実に変化させる."""
+    stat = file_path.stat()
+    os.utime(file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+class StaticWatcher:
+    """事前に設定した変更を順に返すテスト用のWatcher."""
+
+    def __init__(self, changes: list[set[str]], stop_event: threading.Event) -> None:
+        self.changes = changes
+        self.stop_event = stop_event
+
+    def wait_changes(self, timeout: float) -> set[str]:
+        """次の変更を返す (変更がなくなった場合は監視を終了する)."""
+        if not self.changes:
+            self.stop_event.set()
+            return set()
+        return self.changes.pop(0)
+
+    def close(self) -> None:
+        """監視を終了する."""
+
+
+def test_session_refresh_edited_file() -> None:
+    """編集されたファイルのコードブロックのみ再読み込みされるテスト."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        lib_dir = Path(tmpdir)
+        (lib_dir / "a.py").write_text(create_code("a"))
+        (lib_dir / "b.py").write_text(create_code("b"))
+        session = LibraryWatchSession({"test_lib": create_lib_setting(tmpdir)})
+        assert [code.snippet_key for code in session.get_library_codes()] == ["a", "b"]
+
+        (lib_dir / "b.py").write_text(create_code("b", "print(1)"))
+        bump_mtime(lib_dir / "b.py")
+
+        assert session.refresh([str(lib_dir / "b.py")]) == {"python"}
+        assert session.get_library_codes()[1].code_lines == ["print(1)"]
+
+
+def test_session_refresh_unchanged_code() -> None:
+    """コードブロックが変化しない変更では言語が返されないテスト."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        lib_dir = Path(tmpdir)
+        (lib_dir / "a.py").write_text(create_code("a"))
+        session = LibraryWatchSession({"test_lib": create_lib_setting(tmpdir)})
+
+        bump_mtime(lib_dir / "a.py")
+        (lib_dir / "note.txt").write_text("not a library code")
+
+        assert session.refresh([str(lib_dir / "a.py"), str(lib_dir / "note.txt")]) == set()
+        assert session.refresh(["/outside/of/library.py"]) == set()
+
+
+def test_session_refresh_added_and_deleted_file() -> None:
+    """ファイルの追加と削除が反映されるテスト."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        lib_dir = Path(tmpdir)
+        (lib_dir / "a.py").write_text(create_code("a"))
+        session = LibraryWatchSession({"test_lib": create_lib_setting(tmpdir)})
+
+        (lib_dir / "b.py").write_text(create_code("b"))
+        assert session.refresh([str(lib_dir / "b.py")]) == {"python"}
+        assert {code.snippet_key for code in session.get_library_codes()} == {"a", "b"}
+
+        (lib_dir / "a.py").unlink()
+        assert session.refresh([str(lib_dir / "a.py")]) == {"python"}
+        assert [code.snippet_key for code in session.get_library_codes()] == ["b"]
+        assert session.get_library_codes(["cpp"]) == []
+
+
+def test_session_purge_library() -> None:
+    """無効なライブラリと、コードブロックがすべて削除されたライブラリが削除用のコードを返すテスト."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        lib_dir = Path(tmpdir)
+        (lib_dir / "a.py").write_text(create_code("a"))
+        disabled_setting = create_lib_setting(str(lib_dir / "missing"))
+        disabled_setting["enable"] = False
+        session = LibraryWatchSession({"test_lib": create_lib_setting(tmpdir), "disabled_lib": disabled_setting})
+        assert session.watch_dirpaths == [os.path.abspath(tmpdir)]
+
+        (lib_dir / "a.py").unlink()
+        assert session.refresh([str(lib_dir / "a.py")]) == {"python"}
+
+        lib_codes = session.get_library_codes(["python"])
+        assert [(code.enable, code.library_name) for code in lib_codes] == [
+            (False, "test_lib"),
+            (False, "disabled_lib"),
+        ]
+
+
+def test_polling_watcher_detects_changes() -> None:
+    """PollingWatcherがファイルの追加・変更を検出するテスト."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        lib_dir = Path(tmpdir)
+        (lib_dir / "a.py").write_text("a")
+        watcher = PollingWatcher([tmpdir])
+        try:
+            assert watcher.wait_changes(0) == set()
+
+            bump_mtime(lib_dir / "a.py")
+            (lib_dir / "b.py").write_text("b")
+            (lib_dir / ".hidden").write_text("hidden")
+
+            assert watcher.wait_changes(0) == {str(lib_dir / "a.py"), str(lib_dir / "b.py")}
+            assert watcher.wait_changes(0) == set()
+        finally:
+            watcher.close()
+
+
+def test_polling_watcher_with_session_paths() -> None:
+    """セッションのファイル列挙を使用した場合、除外フィルタと拡張子フィルタに合致するファイルのみ監視されるテスト."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        lib_dir = Path(tmpdir)
+        (lib_dir / "a.py").write_text(create_code("a"))
+        (lib_dir / "__pycache__").mkdir()
+        (lib_dir / "__pycache__" / "a.py").write_text("cache")
+        session = LibraryWatchSession({"test_lib": create_lib_setting(tmpdir)})
+        watcher = PollingWatcher(session.watch_dirpaths, session.iter_watch_file_paths)
+        try:
+            assert list(watcher._snapshot) == [os.path.abspath(lib_dir / "a.py")]
+
+            bump_mtime(lib_dir / "__pycache__" / "a.py")
+            (lib_dir / "b.txt").write_text("b")
+            (lib_dir / "c.py").write_text(create_code("c"))
+
+            assert watcher.wait_changes(0) == {os.path.abspath(lib_dir / "c.py")}
+        finally:
+            watcher.close()
+
+
+def test_run_watch_loop_debounce() -> None:
+    """連続した変更が1回のコールバックにまとめられるテスト."""
+    stop_event = threading.Event()
+    watcher = StaticWatcher([{"a"}, {"b"}, set(), {"c"}], stop_event)
+    calls: list[set[str]] = []
+
+    run_watch_loop(watcher, calls.append, stop_event, interval=0, debounce=0)
+
+    assert calls == [{"a", "b"}, {"c"}]
+
+
+def test_run_watch_loop_continue_after_error() -> None:
+    """コールバックが例外を送出しても監視が継続されるテスト."""
+    stop_event = threading.Event()
+    watcher = StaticWatcher([{"a"}, set(), {"b"}, set(), {"c"}], stop_event)
+    calls: list[set[str]] = []
+
+    def on_change(changed_paths: set[str]) -> None:
+        calls.append(changed_paths)
+        if changed_paths == {"a"}:
+            raise UnicodeDecodeError("utf-8", b"\xff", 0, 1, "invalid start byte")
+        if changed_paths == {"b"}:
+            raise FileNotFoundError("deleted")
+
+    run_watch_loop(watcher, on_change, stop_event, interval=0, debounce=0)
+
+    assert calls == [{"a"}, {"b"}, {"c"}]